@@ -4,6 +4,9 @@ API 路由层
 本模块包含所有 API 路由定义，类似前端的 views 层
 每个文件对应一组相关的 API 端点
 
+路由均为 async def：阻塞调用通过 core.bulkhead.offload 在对应分舱
+（local / market / compute / llm）的线程池中执行，AI 分析为原生异步
+
 路由分组：
 - health: 健康检查
 - stocks: 股票列表管理（/stocks）
@@ -16,6 +19,9 @@ API 路由层
 - simulation: 模拟交易
 - notes: 笔记管理
 - data: 数据导入导出
+- stream: 实时推送（SSE）
+- portfolio: 组合盈亏（/portfolio）
+- backtest: 策略回测（/backtest）
 """
 
 from .health import router as health_router
@@ -29,6 +35,9 @@ from .records import router as records_router
 from .simulation import router as simulation_router
 from .notes import router as notes_router
 from .data import router as data_router
+from .stream import router as stream_router
+from .portfolio import router as portfolio_router
+from .backtest import router as backtest_router
 
 __all__ = [
     "health_router",
@@ -42,4 +51,7 @@ __all__ = [
     "simulation_router",
     "notes_router",
     "data_router",
+    "stream_router",
+    "portfolio_router",
+    "backtest_router",
 ]
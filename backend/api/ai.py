@@ -2,13 +2,18 @@
 AI 分析 API
 
 提供 AI 模型列表获取、股票分析等端点
+
+分析请求为原生异步：数据获取在 market 分舱的线程池中执行，
+模型调用使用共享的异步 HTTP 客户端，只占用 llm 分舱的并发名额
 """
 
 from fastapi import APIRouter
 from datetime import datetime, timedelta
 
+from core.bulkhead import offload, get_bulkhead, run_in_bulkhead
 from schemas.ai import AnalyzeRequest, ModelsRequest
 from services.ai_service import AIService
+from services.analysis_context import AnalysisContext, FAST_RESOURCES, PRECISE_RESOURCES
 from providers import get_provider_list
 
 router = APIRouter(tags=["AI 分析"])
@@ -26,12 +31,13 @@ def set_dependencies(m, r):
 
 
 @router.get("/ai/providers")
-def get_ai_providers():
+async def get_ai_providers():
     """获取支持的 AI 提供商列表"""
     return {"status": "success", "providers": get_provider_list()}
 
 
 @router.post("/ai/models")
+@offload("llm")
 def get_ai_models(req: ModelsRequest):
     """获取指定提供商的可用模型列表"""
     try:
@@ -42,29 +48,23 @@ def get_ai_models(req: ModelsRequest):
 
 
 @router.post("/analyze")
-def analyze_stock(req: AnalyzeRequest):
+async def analyze_stock(req: AnalyzeRequest):
     """AI 分析股票"""
-    # 获取股票数据
-    stock_detail = monitor.get_stock_detail(req.code)
-    basic = stock_detail.get("basic", {})
+    # 实时行情只读本地快照，无行情时不再请求其余数据
+    context = AnalysisContext(monitor, records_manager, req.code)
+    basic = context.basic()
     
     if not basic:
         return {"status": "error", "message": "无法获取股票基本信息"}
     
-    # 获取历史记录
+    # 根据分析类型并发获取不同范围的数据（每项只请求一次）
     trade_history = []
     ai_history = []
-    
-    # 获取资金流向数据
-    money_flow = monitor.get_money_flow(req.code).get("data", [])
-    
-    # 根据分析类型获取不同范围的数据
     extra_data = None
     dragon_tiger = None
     
     if req.type == "fast":
-        minute = monitor.get_minute_data(req.code).get("data", [])
-        kline = monitor.get_kline_data(req.code, "day", 120).get("data", [])
+        data = await run_in_bulkhead("market", context.load, FAST_RESOURCES, kline_count=120)
         market_data = {
             "index": monitor.index_data,
             "stats": monitor.market_stats,
@@ -72,20 +72,22 @@ def analyze_stock(req: AnalyzeRequest):
         }
         money_flow_days = 2
     else:
-        minute = monitor.get_minute_data(req.code).get("data", [])
-        kline = monitor.get_kline_data(req.code, "day", 240).get("data", [])
-        stats_history = monitor.get_market_stats_history(3).get("data", [])
+        data = await run_in_bulkhead("market", context.load, PRECISE_RESOURCES, kline_count=240)
         market_data = {
             "index": monitor.index_data,
             "stats": monitor.market_stats,
-            "stats_history": stats_history,
+            "stats_history": data["stats_history"],
             "days": 3
         }
-        trade_history = records_manager.get_trade_records_for_analysis(req.code, 10)
-        ai_history = records_manager.get_ai_records_for_analysis(req.code, 5)
+        trade_history = data["trade_history"]
+        ai_history = data["ai_history"]
         money_flow_days = 3
-        extra_data = monitor.get_stock_extra_data(req.code).get("data", {})
-        dragon_tiger = monitor.get_dragon_tiger(req.code).get("data", [])
+        extra_data = data["extra"]
+        dragon_tiger = data["dragon_tiger"]
+    
+    minute = data["minute"]
+    kline = data["kline"]
+    money_flow = data["money_flow"]
     
     # 格式化提示词
     prompt = AIService.format_data_for_prompt(
@@ -111,14 +113,15 @@ def analyze_stock(req: AnalyzeRequest):
                 count += 1
     
     # 调用 LLM
-    llm_result = AIService.call_llm_with_signal(
-        req.provider, req.api_key, req.model, prompt, req.proxy,
-        max_retries=3,
-        is_precise=is_precise,
-        current_price=current_price,
-        future_dates=future_dates,
-        base_url=req.base_url
-    )
+    async with get_bulkhead("llm").acquire():
+        llm_result = await AIService.call_llm_with_signal_async(
+            req.provider, req.api_key, req.model, prompt, req.proxy,
+            max_retries=3,
+            is_precise=is_precise,
+            current_price=current_price,
+            future_dates=future_dates,
+            base_url=req.base_url
+        )
     
     result = llm_result["result"]
     signal = llm_result["signal"]
@@ -127,7 +130,9 @@ def analyze_stock(req: AnalyzeRequest):
     
     # 自动保存 AI 分析记录
     if not result.startswith("分析失败"):
-        records_manager.add_ai_record(
+        await run_in_bulkhead(
+            "local",
+            records_manager.add_ai_record,
             stock_code=req.code,
             signal=signal,
             summary=summary,
@@ -6,6 +6,8 @@
 
 from fastapi import APIRouter
 
+from core.bulkhead import offload
+
 router = APIRouter(prefix="/alerts", tags=["预警管理"])
 
 # monitor 实例将在 main.py 中注入
@@ -19,18 +21,28 @@ def set_monitor(m):
 
 
 @router.post("/{code}")
+@offload("local")
 def set_alert(code: str, alert_config: dict):
     """设置预警"""
     return monitor.set_alert(code, alert_config)
 
 
 @router.delete("/{code}")
+@offload("local")
 def remove_alert(code: str):
     """移除预警"""
     return monitor.remove_alert(code)
 
 
 @router.get("/triggered")
+@offload("local")
 def get_triggered_alerts():
     """获取触发的预警"""
     return monitor.get_triggered_alerts()
+
+
+@router.get("/notifications/status")
+@offload("local")
+def get_notification_status():
+    """获取推送通知分发状态（队列、失败次数、死信）"""
+    return monitor.get_notification_status()
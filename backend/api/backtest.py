@@ -0,0 +1,78 @@
+"""
+策略回测 API
+
+提供基于本地K线历史的多股票策略回测、参数优化（滚动前推）端点
+"""
+
+from fastapi import APIRouter
+
+from core.bulkhead import offload
+from schemas.backtest import BacktestRequest, OptimizeRequest, ApplyOptimizationRequest
+from domain.backtest_engine import STRATEGIES
+
+router = APIRouter(prefix="/backtest", tags=["策略回测"])
+
+# monitor 实例将在 main.py 中注入
+monitor = None
+
+
+def set_monitor(m):
+    """注入 monitor 实例"""
+    global monitor
+    monitor = m
+
+
+@router.get("/strategies")
+async def get_strategies():
+    """获取支持的策略及默认参数"""
+    return {
+        "status": "success",
+        "strategies": {name: defaults for name, (_, defaults) in STRATEGIES.items()},
+    }
+
+
+@router.post("")
+@offload("compute")
+def run_backtest(req: BacktestRequest):
+    """运行回测（不传 codes 时回测全部自选股）"""
+    options = req.dict()
+    codes = options.pop("codes")
+    use_alerts = options.pop("use_alerts")
+    return monitor.run_backtest(codes, use_alerts, **options)
+
+
+@router.post("/optimize")
+@offload("local")
+def start_optimization(req: OptimizeRequest):
+    """启动参数优化（后台运行，返回优化记录 ID）"""
+    options = req.dict()
+    codes = options.pop("codes")
+    return monitor.start_optimization(codes, **options)
+
+
+@router.get("/optimizations")
+@offload("local")
+def get_optimizations():
+    """获取参数优化记录列表"""
+    return monitor.get_optimizations()
+
+
+@router.get("/optimizations/{job_id}")
+@offload("local")
+def get_optimization(job_id: str):
+    """获取参数优化进度或结果"""
+    return monitor.get_optimization(job_id)
+
+
+@router.delete("/optimizations/{job_id}")
+@offload("local")
+def delete_optimization(job_id: str):
+    """删除参数优化记录"""
+    return monitor.delete_optimization(job_id)
+
+
+@router.post("/optimizations/{job_id}/apply")
+@offload("local")
+def apply_optimization(job_id: str, req: ApplyOptimizationRequest):
+    """将最优止盈/止损比例应用到预警配置"""
+    return monitor.apply_optimization(job_id, req.codes)
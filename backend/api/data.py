@@ -5,6 +5,7 @@
 """
 
 from fastapi import APIRouter
+from core.bulkhead import offload
 from schemas.data import ImportDataRequest
 
 router = APIRouter(prefix="/data", tags=["数据管理"])
@@ -20,24 +21,28 @@ def set_monitor(m):
 
 
 @router.get("/export")
+@offload("local")
 def export_data():
     """导出配置数据"""
     return monitor.export_data()
 
 
 @router.post("/import")
+@offload("local")
 def import_data(req: ImportDataRequest):
     """导入配置数据"""
     return monitor.import_data(req.stocks, req.settings, req.alerts)
 
 
 @router.get("/path")
+@offload("local")
 def get_data_path():
     """获取数据存储路径"""
     return monitor.get_data_path()
 
 
 @router.post("/path")
+@offload("local")
 def set_data_path(data: dict):
     """设置数据存储路径"""
     return monitor.set_data_path(data.get("path", ""))
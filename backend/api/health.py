@@ -10,6 +10,6 @@ router = APIRouter(tags=["健康检查"])
 
 
 @router.get("/")
-def read_root():
+async def read_root():
     """健康检查"""
     return {"status": "ok", "message": "Stock Price Monitor Backend Running"}
@@ -6,6 +6,8 @@
 
 from fastapi import APIRouter
 
+from core.bulkhead import offload
+
 router = APIRouter(tags=["大盘市场"])
 
 # monitor 实例将在 main.py 中注入
@@ -19,36 +21,49 @@ def set_monitor(m):
 
 
 @router.get("/groups")
+@offload("local")
 def get_groups():
     """获取所有分组"""
     return monitor.get_groups()
 
 
 @router.post("/groups")
+@offload("local")
 def add_group(data: dict):
     """添加分组"""
     return monitor.add_group(data.get("group", ""))
 
 
 @router.delete("/groups/{group}")
+@offload("local")
 def delete_group(group: str, delete_stocks: bool = False):
     """删除分组"""
     return monitor.delete_group(group, delete_stocks)
 
 
 @router.get("/index/{code}/detail")
+@offload("market")
 def get_index_detail(code: str):
     """获取指数详情"""
     return monitor.get_index_detail(code)
 
 
 @router.get("/market/stats")
+@offload("local")
 def get_market_stats():
     """获取市场统计"""
     return monitor.get_market_stats()
 
 
 @router.get("/market/stats/history")
+@offload("market")
 def get_market_stats_history(days: int = 30):
     """获取市场统计历史"""
     return monitor.get_market_stats_history(days)
+
+
+@router.get("/monitor/status")
+@offload("local")
+def get_monitor_status():
+    """获取各数据源调度状态"""
+    return monitor.get_scheduler_status()
@@ -8,6 +8,7 @@ import re
 import json
 from fastapi import APIRouter
 
+from core.bulkhead import offload, get_bulkhead
 from schemas.notes import NoteRequest, NoteUpdateRequest, NoteRenameRequest, NoteConvertRequest
 from services.ai_service import AIService
 
@@ -24,43 +25,49 @@ def set_notes_manager(n):
 
 
 @router.get("")
+@offload("local")
 def list_notes():
     """获取笔记列表"""
     return notes_manager.list_notes()
 
 
 @router.get("/{filename}")
+@offload("local")
 def get_note(filename: str):
     """获取笔记内容"""
     return notes_manager.get_note(filename)
 
 
 @router.post("")
+@offload("local")
 def create_note(req: NoteRequest):
     """创建笔记"""
     return notes_manager.create_note(req.filename, req.content)
 
 
 @router.put("/{filename}")
+@offload("local")
 def update_note(filename: str, req: NoteUpdateRequest):
     """更新笔记"""
     return notes_manager.update_note(filename, req.content)
 
 
 @router.delete("/{filename}")
+@offload("local")
 def delete_note(filename: str):
     """删除笔记"""
     return notes_manager.delete_note(filename)
 
 
 @router.put("/{filename}/rename")
+@offload("local")
 def rename_note(filename: str, req: NoteRenameRequest):
     """重命名笔记"""
     return notes_manager.rename_note(filename, req.new_name)
 
 
 @router.post("/convert")
-def convert_note_to_trades(req: NoteConvertRequest):
+async def convert_note_to_trades(req: NoteConvertRequest):
     """AI 分析笔记内容，提取交易记录"""
     prompt = f"""请分析以下交易笔记内容，提取出所有交易记录。
 
@@ -98,9 +105,10 @@ def convert_note_to_trades(req: NoteConvertRequest):
 """
     
     try:
-        llm_response = AIService.call_llm(
-            req.provider, req.api_key, req.model, prompt, req.proxy, max_retries=2
-        )
+        async with get_bulkhead("llm").acquire():
+            llm_response = await AIService.call_llm_async(
+                req.provider, req.api_key, req.model, prompt, req.proxy, max_retries=2
+            )
         
         json_match = re.search(r'```json\s*([\s\S]*?)\s*```', llm_response)
         if json_match:
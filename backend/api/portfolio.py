@@ -0,0 +1,34 @@
+"""
+组合盈亏 API
+
+提供组合实时盈亏汇总、持仓明细和当日权益曲线端点
+"""
+
+from fastapi import APIRouter
+
+from core.bulkhead import offload
+
+router = APIRouter(prefix="/portfolio", tags=["组合盈亏"])
+
+# monitor 实例将在 main.py 中注入
+monitor = None
+
+
+def set_monitor(m):
+    """注入 monitor 实例"""
+    global monitor
+    monitor = m
+
+
+@router.get("")
+@offload("local")
+def get_portfolio(include_closed: bool = False):
+    """获取组合汇总和持仓明细"""
+    return monitor.get_portfolio(include_closed)
+
+
+@router.get("/equity")
+@offload("local")
+def get_portfolio_equity():
+    """获取当日权益曲线"""
+    return monitor.get_portfolio_equity()
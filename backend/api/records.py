@@ -7,6 +7,7 @@
 from fastapi import APIRouter
 from typing import Optional
 
+from core.bulkhead import offload
 from schemas.records import TradeRecordRequest, TradeRecordUpdateRequest, ImportMdRequest
 
 router = APIRouter(prefix="/records", tags=["交易记录"])
@@ -23,6 +24,7 @@ def set_records_manager(r):
 
 # ========== 交易记录 ==========
 @router.post("/trade")
+@offload("local")
 def add_trade_record(req: TradeRecordRequest):
     """添加交易记录"""
     return records_manager.add_trade_record(
@@ -39,6 +41,7 @@ def add_trade_record(req: TradeRecordRequest):
 
 
 @router.put("/trade/{record_id}")
+@offload("local")
 def update_trade_record(record_id: str, req: TradeRecordUpdateRequest):
     """更新交易记录"""
     updates = {k: v for k, v in req.model_dump().items() if v is not None}
@@ -46,50 +49,65 @@ def update_trade_record(record_id: str, req: TradeRecordUpdateRequest):
 
 
 @router.delete("/trade/{record_id}")
+@offload("local")
 def delete_trade_record(record_id: str):
     """删除交易记录"""
     return records_manager.delete_trade_record(record_id)
 
 
 @router.get("/trade")
-def get_trade_records(stock_code: Optional[str] = None, limit: int = 100):
+@offload("local")
+def get_trade_records(stock_code: Optional[str] = None, limit: int = 100, offset: int = 0):
     """获取交易记录"""
-    return records_manager.get_trade_records(stock_code, limit)
+    return records_manager.get_trade_records(stock_code, limit, offset)
 
 
 @router.get("/trade/{stock_code}")
-def get_stock_trade_records(stock_code: str, limit: int = 100):
+@offload("local")
+def get_stock_trade_records(stock_code: str, limit: int = 100, offset: int = 0):
     """获取指定股票的交易记录"""
-    return records_manager.get_trade_records(stock_code, limit)
+    return records_manager.get_trade_records(stock_code, limit, offset)
 
 
 # ========== AI 分析记录 ==========
 @router.get("/ai")
-def get_ai_records(stock_code: Optional[str] = None, limit: int = 50):
+@offload("local")
+def get_ai_records(stock_code: Optional[str] = None, limit: int = 50, offset: int = 0):
     """获取 AI 分析记录"""
-    return records_manager.get_ai_records(stock_code, limit)
+    return records_manager.get_ai_records(stock_code, limit, offset)
 
 
 @router.get("/ai/{stock_code}")
-def get_stock_ai_records(stock_code: str, limit: int = 50):
+@offload("local")
+def get_stock_ai_records(stock_code: str, limit: int = 50, offset: int = 0):
     """获取指定股票的 AI 分析记录"""
-    return records_manager.get_ai_records(stock_code, limit)
+    return records_manager.get_ai_records(stock_code, limit, offset)
 
 
 # ========== 持仓和分析 ==========
 @router.get("/position/{stock_code}")
+@offload("local")
 def get_position(stock_code: str):
     """计算持仓"""
     return records_manager.calculate_position(stock_code)
 
 
+@router.get("/positions")
+@offload("local")
+def get_positions(include_closed: bool = False):
+    """获取全部持仓"""
+    return records_manager.get_positions(include_closed)
+
+
 @router.get("/analysis")
+@offload("local")
 def get_trade_style_analysis(stock_code: Optional[str] = None):
     """获取交易风格分析"""
     return records_manager.get_trade_style_analysis(stock_code)
 
 
 @router.get("/stocks")
+@offload("local")
 def get_trade_stock_codes():
     """获取所有有交易记录的股票代码"""
     codes = records_manager.get_all_stock_codes()
@@ -98,6 +116,7 @@ def get_trade_stock_codes():
 
 # ========== 导入导出 ==========
 @router.get("/export/md")
+@offload("local")
 def export_trade_records_md(stock_code: Optional[str] = None):
     """导出交易记录为 Markdown"""
     md_content = records_manager.export_to_markdown(stock_code)
@@ -105,6 +124,7 @@ def export_trade_records_md(stock_code: Optional[str] = None):
 
 
 @router.post("/import/md")
+@offload("local")
 def import_trade_records_md(req: ImportMdRequest):
     """从 Markdown 导入交易记录"""
     return records_manager.import_from_markdown(req.content)
@@ -6,6 +6,8 @@
 
 from fastapi import APIRouter
 
+from core.bulkhead import offload
+
 router = APIRouter(prefix="/settings", tags=["设置管理"])
 
 # monitor 实例将在 main.py 中注入
@@ -19,12 +21,14 @@ def set_monitor(m):
 
 
 @router.get("")
+@offload("local")
 def get_settings():
     """获取设置"""
     return monitor.get_settings()
 
 
 @router.post("")
+@offload("local")
 def update_settings(settings: dict):
     """更新设置"""
     return monitor.update_settings(settings)
@@ -9,6 +9,7 @@ import json
 from fastapi import APIRouter
 from typing import Optional
 
+from core.bulkhead import offload, get_bulkhead, run_in_bulkhead
 from schemas.simulation import (
     SimulationCreateRequest,
     SimulationTradeRequest,
@@ -31,6 +32,7 @@ def set_dependencies(m, s):
 
 
 @router.post("/create")
+@offload("market")
 def create_simulation(req: SimulationCreateRequest):
     """创建模拟会话"""
     if req.total_days < 7 or req.total_days > 50:
@@ -52,18 +54,21 @@ def create_simulation(req: SimulationCreateRequest):
 
 
 @router.get("/sessions")
+@offload("local")
 def get_simulation_sessions(stock_code: Optional[str] = None, status: Optional[str] = None, limit: int = 50):
     """获取模拟会话列表"""
     return simulation_manager.get_sessions(stock_code, status, limit)
 
 
 @router.get("/{session_id}")
+@offload("local")
 def get_simulation_session(session_id: str):
     """获取模拟会话详情"""
     return simulation_manager.get_session(session_id)
 
 
 @router.get("/{session_id}/kline")
+@offload("market")
 def get_simulation_kline(session_id: str):
     """获取模拟会话的K线数据"""
     session_result = simulation_manager.get_session(session_id)
@@ -91,6 +96,7 @@ def get_simulation_kline(session_id: str):
 
 
 @router.get("/{session_id}/minute/{date}")
+@offload("market")
 def get_simulation_minute(session_id: str, date: str):
     """获取模拟会话某一天的分时数据"""
     session_result = simulation_manager.get_session(session_id)
@@ -102,6 +108,7 @@ def get_simulation_minute(session_id: str, date: str):
 
 
 @router.post("/trade")
+@offload("market")
 def execute_simulation_trade(req: SimulationTradeRequest):
     """执行模拟交易"""
     result = simulation_manager.execute_trade(
@@ -130,33 +137,36 @@ def execute_simulation_trade(req: SimulationTradeRequest):
 
 
 @router.post("/{session_id}/pause")
+@offload("local")
 def pause_simulation(session_id: str):
     """暂停模拟"""
     return simulation_manager.pause_session(session_id)
 
 
 @router.post("/{session_id}/resume")
+@offload("local")
 def resume_simulation(session_id: str):
     """继续模拟"""
     return simulation_manager.resume_session(session_id)
 
 
 @router.post("/{session_id}/abandon")
+@offload("local")
 def abandon_simulation(session_id: str):
     """放弃模拟"""
     return simulation_manager.abandon_session(session_id)
 
 
 @router.delete("/{session_id}")
+@offload("local")
 def delete_simulation(session_id: str):
     """删除模拟记录"""
     return simulation_manager.delete_session(session_id)
 
 
-@router.post("/analyze")
-def analyze_simulation(req: SimulationAnalyzeRequest):
-    """AI 分析模拟结果"""
-    session_result = simulation_manager.get_session(req.session_id)
+def _prepare_analysis(session_id: str) -> dict:
+    """读取会话和K线，计算模拟结果并生成提示词（阻塞调用，在 market 分舱中执行）"""
+    session_result = simulation_manager.get_session(session_id)
     if session_result.get("status") != "success":
         return session_result
     
@@ -169,9 +179,25 @@ def analyze_simulation(req: SimulationAnalyzeRequest):
     
     result = simulation_manager.calculate_result(session, final_price)
     prompt = simulation_manager.format_for_ai_analysis(session, kline_data, result)
+    return {"status": "success", "session": session, "result": result, "prompt": prompt}
+
+
+@router.post("/analyze")
+async def analyze_simulation(req: SimulationAnalyzeRequest):
+    """AI 分析模拟结果"""
+    prepared = await run_in_bulkhead("market", _prepare_analysis, req.session_id)
+    if prepared.get("status") != "success":
+        return prepared
+    
+    session = prepared["session"]
+    result = prepared["result"]
+    prompt = prepared["prompt"]
     
     try:
-        llm_response = AIService.call_llm(req.provider, req.api_key, req.model, prompt, req.proxy, max_retries=2)
+        async with get_bulkhead("llm").acquire():
+            llm_response = await AIService.call_llm_async(
+                req.provider, req.api_key, req.model, prompt, req.proxy, max_retries=2
+            )
         
         json_match = re.search(r'```json\s*([\s\S]*?)\s*```', llm_response)
         if json_match:
@@ -8,9 +8,17 @@
 - 资金流向
 - 额外数据（财务指标等）
 - 龙虎榜数据
+- 盘中流式指标、本地记录的盘中快照（不请求上游）
+
+上游数据经 monitor.response_cache 缓存，响应带 ETag，
+客户端携带 If-None-Match 且内容未变化时返回 304
 """
 
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Request, Response
+
+from core.bulkhead import offload
 
 router = APIRouter(prefix="/stock", tags=["股票详情"])
 
@@ -24,37 +32,73 @@ def set_monitor(m):
     monitor = m
 
 
+def _cached_response(request: Request, entry):
+    """
+    将缓存条目转换为响应（支持 ETag / 304）
+
+    Args:
+        request: 请求对象（读取 If-None-Match）
+        entry: CacheEntry
+    """
+    if not entry.cached:
+        return entry.value
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == entry.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
 @router.get("/{code}/detail")
+@offload("market")
 def get_stock_detail(code: str):
     """获取股票详情"""
     return monitor.get_stock_detail(code)
 
 
+@router.get("/{code}/intraday")
+@offload("local")
+def get_intraday_indicators(code: str):
+    """获取盘中流式指标（随实时行情更新，不请求分时数据）"""
+    return monitor.get_intraday_indicators(code)
+
+
+@router.get("/{code}/ticks")
+@offload("local")
+def get_ticks(code: str, date: Optional[str] = None, minutes: bool = False):
+    """获取本地记录的盘中快照（minutes=true 时聚合为分钟线）"""
+    return monitor.get_ticks(code, date, minutes)
+
+
 @router.get("/{code}/minute")
-def get_minute_data(code: str):
+@offload("market")
+def get_minute_data(code: str, request: Request):
     """获取分时数据"""
-    return monitor.get_minute_data(code)
+    return _cached_response(request, monitor.get_cached_entry("minute", code))
 
 
 @router.get("/{code}/kline")
-def get_kline_data(code: str, period: str = "day", count: int = 120):
+@offload("market")
+def get_kline_data(code: str, request: Request, period: str = "day", count: int = 120):
     """获取K线数据"""
-    return monitor.get_kline_data(code, period, count)
+    return _cached_response(request, monitor.get_cached_entry("kline", code, period, count))
 
 
 @router.get("/{code}/money-flow")
-def get_money_flow(code: str):
+@offload("market")
+def get_money_flow(code: str, request: Request):
     """获取资金流向"""
-    return monitor.get_money_flow(code)
+    return _cached_response(request, monitor.get_cached_entry("money_flow", code))
 
 
 @router.get("/{code}/extra")
-def get_stock_extra(code: str):
+@offload("market")
+def get_stock_extra(code: str, request: Request):
     """获取股票额外数据（财务指标等）"""
-    return monitor.get_stock_extra_data(code)
+    return _cached_response(request, monitor.get_cached_entry("extra", code))
 
 
 @router.get("/{code}/dragon-tiger")
-def get_dragon_tiger(code: str):
+@offload("market")
+def get_dragon_tiger(code: str, request: Request):
     """获取龙虎榜数据"""
-    return monitor.get_dragon_tiger(code)
+    return _cached_response(request, monitor.get_cached_entry("dragon_tiger", code))
@@ -5,8 +5,12 @@
 注意：单个股票的详情 API 在 stock_detail.py 中
 """
 
+from typing import Optional
+
 from fastapi import APIRouter
 
+from core.bulkhead import offload
+
 router = APIRouter(prefix="/stocks", tags=["股票管理"])
 
 # monitor 实例将在 main.py 中注入
@@ -20,36 +24,56 @@ def set_monitor(m):
 
 
 @router.get("")
+@offload("local")
 def get_stocks():
     """获取股票列表和数据"""
     return monitor.get_stocks()
 
 
+@router.get("/intraday")
+@offload("local")
+def get_intraday_indicators():
+    """获取全部自选股的盘中流式指标（VWAP、量比、滚动波动率等）"""
+    return monitor.get_intraday_indicators()
+
+
+@router.get("/fundamentals")
+@offload("local")
+def get_fundamentals(sort: Optional[str] = None, order: str = "desc"):
+    """获取自选股基本面（市盈率、市净率、换手率、市值等），可按字段排序"""
+    return monitor.get_fundamentals(sort, order)
+
+
 @router.post("/{code}")
+@offload("local")
 def add_stock(code: str):
     """添加股票"""
     return monitor.add_stock(code)
 
 
 @router.delete("/{code}")
+@offload("local")
 def remove_stock(code: str):
     """删除股票"""
     return monitor.remove_stock(code)
 
 
 @router.post("/reorder")
+@offload("local")
 def reorder_stocks(data: dict):
     """重新排序股票"""
     return monitor.reorder_stocks(data.get("stocks", []))
 
 
 @router.post("/focus/{code}")
+@offload("local")
 def set_focused_stock(code: str):
     """设置重点关注股票"""
     return monitor.set_focused_stock(code)
 
 
 @router.post("/group/{code}")
+@offload("local")
 def set_stock_group(code: str, data: dict):
     """设置股票分组"""
     return monitor.set_stock_group(code, data.get("group", ""))
@@ -0,0 +1,91 @@
+"""
+实时推送 API
+
+提供基于 Server-Sent Events 的行情推送端点：
+- 连接时先发送一次完整快照（snapshot）
+- 之后由监控节拍推送增量（quotes/index/market_stats/alerts）
+- 客户端处理过慢导致队列溢出时，丢弃积压事件并重新发送快照
+"""
+
+import json
+import asyncio
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from core.bulkhead import run_in_bulkhead
+
+router = APIRouter(tags=["实时推送"])
+
+# monitor 实例将在 main.py 中注入
+monitor = None
+
+# 每个连接的事件队列长度
+STREAM_QUEUE_SIZE = 64
+# 心跳间隔（秒），用于保持连接和检测断开
+HEARTBEAT_INTERVAL = 15
+
+
+def set_monitor(m):
+    """注入 monitor 实例"""
+    global monitor
+    monitor = m
+
+
+def _format_event(event: str, payload: str) -> str:
+    """格式化为 SSE 消息"""
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def _snapshot_event() -> str:
+    """生成快照事件（在 local 分舱的线程池中读取，避免阻塞事件循环）"""
+    snapshot = await run_in_bulkhead("local", monitor.get_stream_snapshot)
+    return _format_event("snapshot", json.dumps(snapshot, ensure_ascii=False))
+
+
+@router.get("/stream")
+async def stream(request: Request):
+    """订阅实时行情推送（SSE）"""
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    state = {"overflow": False}
+
+    def enqueue(event: str, payload: str):
+        try:
+            events.put_nowait((event, payload))
+        except asyncio.QueueFull:
+            state["overflow"] = True
+
+    def deliver(event: str, payload: str):
+        # 在监控线程中调用，转交给事件循环
+        loop.call_soon_threadsafe(enqueue, event, payload)
+
+    subscriber_id = monitor.broadcaster.subscribe(deliver)
+
+    async def event_source():
+        try:
+            yield "retry: 3000\n\n"
+            yield await _snapshot_event()
+            while True:
+                if await request.is_disconnected():
+                    break
+                if state["overflow"]:
+                    while not events.empty():
+                        events.get_nowait()
+                    state["overflow"] = False
+                    yield await _snapshot_event()
+                    continue
+                try:
+                    event, payload = await asyncio.wait_for(events.get(), HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield _format_event(event, payload)
+        finally:
+            monitor.broadcaster.unsubscribe(subscriber_id)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -5,6 +5,17 @@
 - config: 配置管理（数据路径、文件路径等）
 - stock_data: 股票数据获取（行情、K线、分时等）
 - index_data: 大盘指数数据获取
+- http_client: 共享 HTTP 传输层（连接池、重试、超时、按主机限流和熔断）
+- parallel: 并发执行工具（命名线程池、gather）
+- quote_store: 实时行情列式存储（NumPy）
+- response_cache: 行情接口响应缓存（TTL + LRU + ETag）
+- kline_store: K线本地仓库（按股票持久化，增量更新）
+- indicators: 技术指标计算（NumPy，支持批量和增量）
+- intraday_stream: 盘中流式指标（随行情节拍增量更新）
+- tick_recorder: 盘中快照记录（环形缓冲区 + 按日文件）
+- fundamentals: 自选股基本面列式表（批量刷新，可排序）
+- scheduler: 监控节拍调度（多数据源并发刷新）
+- bulkhead: API 请求分舱（按上游隔离并发，async 路由的阻塞调用在分舱线程池中执行）
 - alert: 预警管理
 - data_io: 数据导入导出
 """
@@ -0,0 +1,179 @@
+"""
+请求分舱（bulkhead）模块
+
+本文件为 API 路由提供按上游划分的并发隔离：
+1. 每个分舱有独立的并发上限和等待队列上限，一类上游变慢只占满自己的分舱
+   （例如多个 AI 分析同时进行，不影响 /stocks 轮询）
+2. 阻塞调用在分舱自己的线程池中执行，不占用 Starlette 的公共线程池
+3. 原生异步调用（如 LLM 请求）只占用分舱的并发名额，不占用线程
+4. 等待队列已满时立即抛出 BulkheadFull（main.py 中转换为 503），不无限排队
+
+分舱划分：
+- local: 本地数据（自选股、设置、记录、笔记、组合、盘中快照等）
+- market: 行情上游（新浪、东方财富的分时、K线、资金流向、额外数据等）
+- compute: 计算密集任务（策略回测）
+- llm: AI 模型请求
+
+使用示例：
+    @router.get("/{code}/minute")
+    @offload("market")
+    def get_minute_data(code: str): ...
+
+    data = await run_in_bulkhead("market", context.load, names)
+    async with get_bulkhead("llm").acquire():
+        result = await AIService.call_llm_async(...)
+"""
+
+import asyncio
+import functools
+import threading
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Tuple
+
+from .parallel import get_executor
+
+
+# ========== 各分舱的限制（最大并发数, 最大等待数）==========
+BULKHEAD_LIMITS: Dict[str, Tuple[int, int]] = {
+    "local": (8, 256),
+    "market": (16, 128),
+    "compute": (2, 16),
+    "llm": (4, 32),
+}
+DEFAULT_LIMITS: Tuple[int, int] = (8, 64)
+
+
+class BulkheadFull(Exception):
+    """分舱等待队列已满"""
+
+    def __init__(self, name: str):
+        super().__init__(f"服务繁忙（{name}），请稍后重试")
+        self.name = name
+
+
+class Bulkhead:
+    """
+    单个分舱
+
+    并发名额用 asyncio.Semaphore 控制（只在事件循环线程中使用），
+    阻塞调用在大小等于并发上限的专用线程池中执行
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_waiting: int):
+        """
+        初始化分舱
+
+        Args:
+            name: 分舱名称
+            max_concurrent: 最大并发数（同时也是专用线程池的大小）
+            max_waiting: 最大等待数，超过时直接拒绝
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self._loop = None
+        self._semaphore = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """获取当前事件循环的信号量（事件循环变化时重建）"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    @asynccontextmanager
+    async def acquire(self):
+        """
+        占用一个并发名额（名额已满时排队，队列已满时抛出 BulkheadFull）
+        """
+        semaphore = self._get_semaphore()
+        if semaphore.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise BulkheadFull(self.name)
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.completed += 1
+            semaphore.release()
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """在分舱的线程池中执行阻塞函数"""
+        async with self.acquire():
+            loop = asyncio.get_running_loop()
+            executor = get_executor(f"bulkhead-{self.name}", self.max_concurrent)
+            return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+    def get_stats(self) -> Dict:
+        """获取分舱状态"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_waiting": self.max_waiting,
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+# ========== 全局分舱 ==========
+_bulkheads: Dict[str, Bulkhead] = {}
+_bulkheads_lock = threading.Lock()
+
+
+def get_bulkhead(name: str) -> Bulkhead:
+    """
+    获取命名分舱（首次调用时按 BULKHEAD_LIMITS 创建）
+
+    Args:
+        name: 分舱名称
+
+    Returns:
+        Bulkhead 实例
+    """
+    bulkhead = _bulkheads.get(name)
+    if bulkhead is None:
+        with _bulkheads_lock:
+            bulkhead = _bulkheads.get(name)
+            if bulkhead is None:
+                max_concurrent, max_waiting = BULKHEAD_LIMITS.get(name, DEFAULT_LIMITS)
+                bulkhead = _bulkheads[name] = Bulkhead(name, max_concurrent, max_waiting)
+    return bulkhead
+
+
+async def run_in_bulkhead(name: str, func: Callable, *args, **kwargs):
+    """在指定分舱中执行阻塞函数"""
+    return await get_bulkhead(name).run(func, *args, **kwargs)
+
+
+def offload(name: str):
+    """
+    路由装饰器：将同步处理函数转换为在指定分舱中执行的 async def 处理函数
+
+    保留原函数签名（FastAPI 据此解析路径、查询参数和请求体）
+
+    Args:
+        name: 分舱名称
+    """
+    def decorator(func: Callable):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await run_in_bulkhead(name, func, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_bulkhead_stats() -> Dict[str, Dict]:
+    """获取全部分舱状态"""
+    return {name: bulkhead.get_stats() for name, bulkhead in list(_bulkheads.items())}
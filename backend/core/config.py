@@ -124,6 +124,9 @@ ALERTS_FILE = CONFIG_DIR / "alerts.json"
 # ========== 默认设置 ==========
 DEFAULT_SETTINGS = {
     "refresh_interval": 5,          # 刷新间隔（秒）
+    "market_stats_interval": 15,    # 涨跌统计刷新间隔（秒）
+    "quote_chunk_size": 80,         # 实时行情每批请求的股票数量
+    "fundamentals_interval": 600,   # 基本面批量刷新间隔（秒）
     "pushplus_token": "",           # PushPlus 推送 Token
     "dingtalk_webhook": "",         # 钉钉 Webhook
     "alert_cooldown": 300,          # 预警冷却时间（秒）
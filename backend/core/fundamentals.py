@@ -0,0 +1,173 @@
+"""
+自选股基本面数据表
+
+本文件提供自选股基本面指标（市盈率、市净率、换手率、市值等）的列式存储：
+1. 由 StockDataFetcher.get_fundamentals_batch() 一次（或少量几次）批量请求全部自选股后整体写入
+2. 数值字段存储在 (股票数, 字段数) 的 NumPy 数组中，行业、名称以列表存储
+3. 单只股票读取时检查数据时效，过期视为没有数据（由调用方回退到单只请求）
+4. 按任意数值字段排序输出，缺失值排在最后
+
+设计说明：
+- 由监控调度器按较慢的节奏刷新（默认 10 分钟），不参与每个行情节拍
+- 删除股票时直接删除对应行，数据量很小，不做原地填补
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+# 数值字段（列顺序）
+FIELDS = (
+    "price",            # 最新价
+    "change_percent",   # 涨跌幅（%）
+    "turnover_rate",    # 换手率（%）
+    "volume_ratio",     # 量比
+    "amplitude",        # 振幅（%）
+    "pe_ratio",         # 市盈率（TTM，无则动态）
+    "pb_ratio",         # 市净率
+    "total_mv",         # 总市值（元）
+    "circ_mv",          # 流通市值（元）
+)
+# 单只股票读取时数据的最大有效期（秒）
+MAX_AGE = 1800
+
+
+class FundamentalsTable:
+    """
+    基本面列式表
+
+    values[row, FIELDS.index(field)] 为对应股票的字段值，缺失为 NaN
+    """
+
+    def __init__(self, max_age: float = MAX_AGE):
+        """
+        初始化基本面表
+
+        Args:
+            max_age: 单只股票读取时数据的最大有效期（秒）
+        """
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self.index: Dict[str, int] = {}
+        self.codes: List[str] = []
+        self.names: List[str] = []
+        self.industries: List[Optional[str]] = []
+        self.values = np.empty((0, len(FIELDS)), dtype=np.float64)
+        self.updated_at = np.empty(0, dtype=np.float64)
+        self.refreshed_at = 0.0
+        self.refreshes = 0
+
+    # ========== 写入 ==========
+
+    def update_many(self, rows: Dict[str, dict]):
+        """
+        批量写入（新股票追加行，已有股票覆盖）
+
+        Args:
+            rows: {code: {name, industry, 以及 FIELDS 中的字段}}
+        """
+        now = time.time()
+        with self._lock:
+            new_codes = [code for code in rows if code not in self.index]
+            if new_codes:
+                start = len(self.codes)
+                for i, code in enumerate(new_codes):
+                    self.index[code] = start + i
+                    self.codes.append(code)
+                    self.names.append("")
+                    self.industries.append(None)
+                self.values = np.vstack([self.values, np.full((len(new_codes), len(FIELDS)), np.nan)])
+                self.updated_at = np.concatenate([self.updated_at, np.zeros(len(new_codes))])
+
+            for code, row in rows.items():
+                i = self.index[code]
+                self.names[i] = row.get("name") or self.names[i]
+                self.industries[i] = row.get("industry")
+                self.values[i] = [_to_float(row.get(field)) for field in FIELDS]
+                self.updated_at[i] = now
+
+            self.refreshed_at = now
+            self.refreshes += 1
+
+    def remove(self, code: str):
+        """删除股票"""
+        with self._lock:
+            row = self.index.pop(code, None)
+            if row is None:
+                return
+            for items in (self.codes, self.names, self.industries):
+                del items[row]
+            self.values = np.delete(self.values, row, axis=0)
+            self.updated_at = np.delete(self.updated_at, row)
+            self.index = {c: i for i, c in enumerate(self.codes)}
+
+    # ========== 读取 ==========
+
+    def _row_dict(self, i: int) -> Dict:
+        item = {"code": self.codes[i], "name": self.names[i], "industry": self.industries[i]}
+        for field, value in zip(FIELDS, self.values[i].tolist()):
+            item[field] = None if np.isnan(value) else value
+        return item
+
+    def get(self, code: str, max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        读取单只股票（不存在或已过期时返回 None）
+
+        Args:
+            code: 股票代码（已规范化）
+            max_age: 最大有效期（秒），默认使用初始化时的设置
+        """
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            i = self.index.get(code)
+            if i is None or time.time() - self.updated_at[i] > max_age:
+                return None
+            return self._row_dict(i)
+
+    def view(self, sort: Optional[str] = None, descending: bool = True,
+             codes: Optional[List[str]] = None) -> List[Dict]:
+        """
+        获取基本面列表
+
+        Args:
+            sort: 排序字段（FIELDS 之一，不传则按写入顺序）
+            descending: 是否降序
+            codes: 只返回这些股票（按该顺序，未指定排序时）
+
+        Returns:
+            [{code, name, industry, price, pe_ratio, ...}, ...]，排序字段缺失的排在最后
+        """
+        with self._lock:
+            if codes is None:
+                rows = np.arange(len(self.codes))
+            else:
+                rows = np.array([self.index[c] for c in codes if c in self.index], dtype=np.int64)
+            if sort in FIELDS and len(rows):
+                column = self.values[rows, FIELDS.index(sort)]
+                keys = -column if descending else column
+                # NaN 排在最后（argsort 默认如此）
+                rows = rows[np.argsort(keys, kind="stable")]
+            return [self._row_dict(i) for i in rows.tolist()]
+
+    def get_stats(self) -> Dict:
+        """获取表状态"""
+        with self._lock:
+            return {
+                "symbols": len(self.codes),
+                "refreshes": self.refreshes,
+                "refreshed_at": (
+                    time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.refreshed_at))
+                    if self.refreshed_at else None
+                ),
+            }
+
+
+def _to_float(value) -> float:
+    """接口值转换为浮点数（"-"、None 等转换为 NaN）"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
@@ -0,0 +1,414 @@
+"""
+HTTP 传输层模块
+
+本文件为行情数据获取提供共享的 HTTP 传输层：
+1. 基于 requests.Session 的连接池（按主机复用连接，保持 keep-alive）
+2. 统一的重试与退避策略（连接失败、429、5xx 自动重试）；
+   监控节拍使用的主机（NO_RETRY_HOSTS）不重试，由下一个节拍重新请求
+3. 按接口类型划分的超时时间
+4. 忽略系统代理（行情接口均为国内直连）
+5. 按主机的令牌桶限流（平滑突发请求，避免被上游封 IP）
+6. 按主机的熔断器（closed / open / half-open）：上游连续失败后快速失败，
+   不再每个节拍等满超时；冷却后放行一个探测请求，成功即恢复
+
+使用方式：
+- StockDataFetcher、IndexDataFetcher 通过构造参数注入 HttpClient
+- 未注入时使用 get_http_client() 返回的全局共享实例
+- 熔断或限流时抛出 UpstreamUnavailable（requests ConnectionError 的子类），
+  调用方按普通网络错误处理；详情类数据由 ResponseCache 返回过期缓存兜底
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# ========== 按接口类型划分的超时时间（连接超时, 读取超时）==========
+ENDPOINT_TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    "sina_quote": (2, 3),       # 新浪实时行情 hq.sinajs.cn（须小于监控节拍的 deadline）
+    "sina_kline": (3, 10),      # 新浪分时/K线 quotes.sina.cn
+    "em_quote": (3, 10),        # 东方财富个股行情/资金流向 push2
+    "em_list": (3, 5),          # 东方财富列表/统计 push2 clist
+    "em_history": (3, 10),      # 东方财富历史数据 push2his
+    "em_datacenter": (3, 10),   # 东方财富数据中心（龙虎榜、融资融券）
+    "notify": (3, 5),           # 推送通知（PushPlus、钉钉）
+}
+DEFAULT_TIMEOUT: Tuple[float, float] = (3, 10)
+
+# 不自动重试的主机：监控节拍（指数 8 秒、自选股行情 10 秒）的数据源，
+# 单次请求最长 限流等待 2 秒 + 连接超时 + 读取超时 = 7 秒，须在 deadline 内返回，
+# 否则节拍被放弃且调度器在其返回前不再启动新的执行；失败由下一个节拍重新请求
+NO_RETRY_HOSTS: Tuple[str, ...] = ("hq.sinajs.cn",)
+
+# ========== 按主机的限流配置（每秒请求数, 突发容量）==========
+HOST_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    "hq.sinajs.cn": (10, 20),
+    "quotes.sina.cn": (10, 20),
+    "push2.eastmoney.com": (20, 40),
+    "push2his.eastmoney.com": (10, 20),
+    "datacenter-web.eastmoney.com": (5, 10),
+}
+DEFAULT_RATE_LIMIT: Tuple[float, int] = (20, 40)
+# 限流时最长等待时间（秒），超过则直接失败
+MAX_RATE_WAIT = 2.0
+
+# ========== 熔断配置 ==========
+BREAKER_FAILURE_THRESHOLD = 5     # 连续失败次数达到后打开
+BREAKER_RECOVERY_TIMEOUT = 10.0   # 打开后首次探测前的冷却时间（秒）
+BREAKER_MAX_RECOVERY = 120.0      # 探测连续失败时冷却时间倍增的上限（秒）
+# 计为失败的响应状态码（上游限流或故障）
+FAILURE_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class UpstreamUnavailable(requests.exceptions.ConnectionError):
+    """上游暂不可用（熔断打开或限流等待超时），请求未发出"""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    """熔断器打开"""
+
+
+class RateLimitedError(UpstreamUnavailable):
+    """限流等待超时"""
+
+
+class TokenBucket:
+    """
+    令牌桶限流器（线程安全）
+
+    令牌按 rate 匀速补充，最多积累 burst 个；令牌不足时等待，
+    预计等待超过 max_wait 时直接抛出 RateLimitedError
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.limited = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait: float = MAX_RATE_WAIT):
+        """获取一个令牌（必要时等待）"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+            if wait > max_wait:
+                self.limited += 1
+                raise RateLimitedError(f"rate limited ({wait:.1f}s)")
+            # 预占令牌（可为负数），后到的请求排在后面
+            self.tokens -= 1
+        if wait > 0:
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    熔断器（线程安全）
+
+    - closed: 正常放行，连续失败 failure_threshold 次后打开
+    - open: 直接拒绝，冷却时间到后进入 half-open
+    - half-open: 只放行一个探测请求；成功则关闭，失败则重新打开并加倍冷却时间
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        recovery_timeout: float = BREAKER_RECOVERY_TIMEOUT,
+        max_recovery: float = BREAKER_MAX_RECOVERY,
+    ):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.max_recovery = max_recovery
+        self.state = self.CLOSED
+        self.failures = 0
+        self.cooldown = recovery_timeout
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.opened = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """请求前检查（不允许时抛出 CircuitOpenError）"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    self.rejected += 1
+                    raise CircuitOpenError("circuit open")
+                self.state = self.HALF_OPEN
+            if self.trial_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError("circuit half-open")
+            self.trial_in_flight = True
+
+    def record_success(self):
+        """记录成功"""
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.cooldown = self.recovery_timeout
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        """记录失败"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self.cooldown = min(self.cooldown * 2, self.max_recovery)
+                self._open()
+            elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+            self.trial_in_flight = False
+
+    def release(self):
+        """请求未发出时释放探测名额（不改变状态）"""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.opened += 1
+
+    def get_stats(self) -> Dict:
+        """获取熔断器状态"""
+        with self._lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "cooldown": self.cooldown,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class HttpClient:
+    """
+    共享 HTTP 客户端
+
+    封装连接池、重试策略和超时配置，线程安全
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 16,
+        pool_maxsize: int = 32,
+        retries: int = 2,
+        backoff_factor: float = 0.3,
+        timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+    ):
+        """
+        初始化 HTTP 客户端
+
+        Args:
+            pool_connections: 缓存的主机连接池数量
+            pool_maxsize: 每个主机连接池的最大连接数
+            retries: 最大重试次数
+            backoff_factor: 退避系数（第 n 次重试等待 backoff_factor * 2^(n-1) 秒）
+            timeouts: 自定义接口超时配置，覆盖默认值
+        """
+        self.timeouts = dict(ENDPOINT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+
+        self.session = requests.Session()
+        # 不读取环境变量中的代理配置，等价于 proxies={"http": None, "https": None}
+        self.session.trust_env = False
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        no_retry_adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(total=0, raise_on_status=False),
+        )
+        for host in NO_RETRY_HOSTS:
+            self.session.mount(f"http://{host}", no_retry_adapter)
+            self.session.mount(f"https://{host}", no_retry_adapter)
+
+        # 按主机的限流器和熔断器（首次请求该主机时创建）
+        self._limiters: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._guards_lock = threading.Lock()
+
+    def get_limiter(self, host: str) -> TokenBucket:
+        """获取主机的限流器"""
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            with self._guards_lock:
+                limiter = self._limiters.get(host)
+                if limiter is None:
+                    rate, burst = HOST_RATE_LIMITS.get(host, DEFAULT_RATE_LIMIT)
+                    limiter = self._limiters[host] = TokenBucket(rate, burst)
+        return limiter
+
+    def get_breaker(self, host: str) -> CircuitBreaker:
+        """获取主机的熔断器"""
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            with self._guards_lock:
+                breaker = self._breakers.get(host)
+                if breaker is None:
+                    breaker = self._breakers[host] = CircuitBreaker()
+        return breaker
+
+    def _request(self, method: str, url: str, timeout, **kwargs) -> requests.Response:
+        """
+        经熔断器和限流器发送请求
+
+        连接失败、超时和 FAILURE_STATUSES 中的响应（重试之后）计为失败
+        """
+        host = urlsplit(url).hostname or ""
+        breaker = self.get_breaker(host)
+        breaker.before_request()
+        try:
+            self.get_limiter(host).acquire()
+        except BaseException:
+            # 请求未发出（限流等），不计入熔断判断
+            breaker.release()
+            raise
+        # 未记录成功或失败就退出时（非网络类异常）释放半开试探名额，避免熔断器一直停在半开状态
+        recorded = False
+        try:
+            try:
+                resp = self.session.request(method, url, timeout=timeout, **kwargs)
+            except requests.exceptions.RequestException:
+                breaker.record_failure()
+                recorded = True
+                raise
+            if resp.status_code in FAILURE_STATUSES:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            recorded = True
+        finally:
+            if not recorded:
+                breaker.release()
+        return resp
+
+    def get_timeout(self, endpoint: Optional[str]) -> Tuple[float, float]:
+        """获取接口类型对应的超时时间"""
+        return self.timeouts.get(endpoint, DEFAULT_TIMEOUT)
+
+    def get(
+        self,
+        url: str,
+        endpoint: Optional[str] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[Union[float, Tuple[float, float]]] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        发送 GET 请求
+
+        Args:
+            url: 请求地址
+            endpoint: 接口类型（决定超时时间，见 ENDPOINT_TIMEOUTS）
+            headers: 请求头
+            timeout: 显式超时时间，优先于接口类型配置
+
+        Returns:
+            响应对象
+        """
+        return self._request(
+            "GET",
+            url,
+            headers=headers,
+            timeout=timeout or self.get_timeout(endpoint),
+            **kwargs
+        )
+
+    def post(
+        self,
+        url: str,
+        endpoint: Optional[str] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[Union[float, Tuple[float, float]]] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        发送 POST 请求（POST 不自动重试）
+
+        Args:
+            url: 请求地址
+            endpoint: 接口类型（决定超时时间，见 ENDPOINT_TIMEOUTS）
+            headers: 请求头
+            timeout: 显式超时时间，优先于接口类型配置
+
+        Returns:
+            响应对象
+        """
+        return self._request(
+            "POST",
+            url,
+            headers=headers,
+            timeout=timeout or self.get_timeout(endpoint),
+            **kwargs
+        )
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """
+        获取各主机的熔断和限流状态
+
+        Returns:
+            {host: {state, failures, cooldown, opened, rejected, rate_limited}}
+        """
+        stats = {}
+        for host, breaker in list(self._breakers.items()):
+            stats[host] = breaker.get_stats()
+            limiter = self._limiters.get(host)
+            stats[host]["rate_limited"] = limiter.limited if limiter else 0
+        return stats
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+
+
+# ========== 全局共享实例 ==========
+_http_client: Optional[HttpClient] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    获取全局共享的 HTTP 客户端（懒加载）
+
+    Returns:
+        HttpClient 实例
+    """
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = HttpClient()
+    return _http_client
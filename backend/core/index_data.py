@@ -12,10 +12,14 @@
 - 东方财富：涨跌统计、分时、K线
 """
 
-import requests
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime
 
+import numpy as np
+
+from .http_client import HttpClient, get_http_client
+from .parallel import gather
+
 
 class IndexDataFetcher:
     """
@@ -25,8 +29,26 @@ class IndexDataFetcher:
     # 主要指数代码
     INDEX_CODES = ["sh000001", "sz399001", "sz399006", "sh000300"]  # 上证、深证、创业板、沪深300
     
-    def __init__(self):
-        """初始化"""
+    # 全市场快照：沪深主板、创业板、科创板
+    MARKET_FS = "m:0+t:6,m:0+t:80,m:1+t:2,m:1+t:23"
+    MARKET_PAGE_SIZE = 5000
+    # 涨跌幅限制 20% 的代码前缀（创业板、科创板；快照不含北交所）
+    BOARD_LIMIT_20 = ("300", "301", "688", "689")
+    # 涨跌幅分布区间（%）
+    DISTRIBUTION_EDGES = [-np.inf, -7, -5, -3, -1e-9, 1e-9, 3, 5, 7, np.inf]
+    DISTRIBUTION_LABELS = ["<-7", "-7~-5", "-5~-3", "-3~0", "0", "0~3", "3~5", "5~7", ">7"]
+    # 指数详情各部分并发请求的最大线程数和等待超时（秒）
+    DETAIL_MAX_WORKERS = 16
+    DETAIL_PART_TIMEOUTS = {"minute": 5, "kline": 8, "stats_history": 8}
+    
+    def __init__(self, http: Optional[HttpClient] = None):
+        """
+        初始化
+        
+        Args:
+            http: HTTP 客户端（不传则使用全局共享实例）
+        """
+        self.http = http or get_http_client()
         self.sina_headers = {
             "Referer": "https://finance.sina.com.cn/",
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
@@ -48,12 +70,7 @@ class IndexDataFetcher:
             codes_str = ",".join(self.INDEX_CODES)
             url = f"http://hq.sinajs.cn/list={codes_str}"
             
-            resp = requests.get(
-                url, 
-                headers=self.sina_headers, 
-                timeout=5, 
-                proxies={"http": None, "https": None}
-            )
+            resp = self.http.get(url, endpoint="sina_quote", headers=self.sina_headers)
             content = resp.content.decode('gbk')
             
             lines = content.strip().split('\n')
@@ -107,88 +124,115 @@ class IndexDataFetcher:
         
         return result
     
-    def fetch_market_stats(self) -> Dict:
+    def _fetch_market_page(self, page: int) -> dict:
+        """获取全市场快照的一页（代码、名称、最新价、涨跌幅、昨收）"""
+        url = (
+            "https://push2.eastmoney.com/api/qt/clist/get"
+            f"?pn={page}&pz={self.MARKET_PAGE_SIZE}&po=1&np=1&fltt=2&invt=2&fid=f12"
+            f"&fs={self.MARKET_FS}&fields=f2,f3,f12,f14,f18"
+        )
+        resp = self.http.get(url, endpoint="em_list", headers=self.eastmoney_headers)
+        resp.raise_for_status()
+        return resp.json().get("data") or {}
+    
+    def fetch_market_snapshot(self) -> List[dict]:
         """
-        获取市场涨跌家数统计
+        获取全市场 A 股快照（按页请求，第一页之后的页并发获取）
         
         Returns:
-            涨跌统计 {rise_count, fall_count, flat_count, limit_up, limit_down, update_time}
+            [{f2: 最新价, f3: 涨跌幅, f12: 代码, f14: 名称, f18: 昨收}, ...]
+        """
+        first = self._fetch_market_page(1)
+        rows = list(first.get("diff") or [])
+        total = first.get("total", 0)
+        if len(rows) >= total or not rows:
+            return rows
+        
+        pages = range(2, (total + len(rows) - 1) // len(rows) + 1)
+        results, errors = gather(
+            {page: (lambda p=page: self._fetch_market_page(p)) for page in pages},
+            executor="market_stats"
+        )
+        if errors:
+            raise RuntimeError(f"全市场快照分页失败: {errors}")
+        for page in pages:
+            rows.extend(results[page].get("diff") or [])
+        return rows
+    
+    @classmethod
+    def compute_breadth(cls, rows: List[dict]) -> Dict:
         """
-        result = {
-            "rise_count": 0,
-            "fall_count": 0,
-            "flat_count": 0,
-            "limit_up": 0,
-            "limit_down": 0,
-            "update_time": datetime.now().strftime("%H:%M:%S")
+        根据全市场快照计算涨跌统计（向量化）
+        
+        涨跌停按板块区分：主板 10%、ST 5%、创业板/科创板 20%，
+        以昨收计算涨跌停价（四舍五入到分）后与最新价比较
+        
+        Args:
+            rows: fetch_market_snapshot 的结果
+            
+        Returns:
+            {total, rise_count, fall_count, flat_count, limit_up, limit_down, distribution}
+        """
+        def to_float(value):
+            return value if isinstance(value, (int, float)) else np.nan
+        
+        n = len(rows)
+        price = np.fromiter((to_float(r.get("f2")) for r in rows), dtype=np.float64, count=n)
+        pct = np.fromiter((to_float(r.get("f3")) for r in rows), dtype=np.float64, count=n)
+        pre_close = np.fromiter((to_float(r.get("f18")) for r in rows), dtype=np.float64, count=n)
+        
+        limit = np.full(n, 0.10)
+        for i, r in enumerate(rows):
+            code = str(r.get("f12", ""))
+            if code.startswith(cls.BOARD_LIMIT_20):
+                limit[i] = 0.20
+            elif "ST" in str(r.get("f14", "")).upper():
+                limit[i] = 0.05
+        
+        # 停牌、未开盘的股票（价格或涨跌幅为 "-"）不参与统计
+        traded = ~np.isnan(price) & ~np.isnan(pct) & (price > 0)
+        price, pct, pre_close, limit = price[traded], pct[traded], pre_close[traded], limit[traded]
+        
+        with np.errstate(invalid="ignore"):
+            limit_up_price = np.floor(pre_close * (1 + limit) * 100 + 0.5 + 1e-6) / 100
+            limit_down_price = np.floor(pre_close * (1 - limit) * 100 + 0.5 + 1e-6) / 100
+            is_limit_up = price >= limit_up_price - 1e-6
+            is_limit_down = price <= limit_down_price + 1e-6
+        
+        counts, _ = np.histogram(pct, bins=cls.DISTRIBUTION_EDGES)
+        distribution = [
+            {"label": label, "count": int(count)}
+            for label, count in zip(cls.DISTRIBUTION_LABELS, counts)
+        ]
+        
+        return {
+            "total": int(traded.sum()),
+            "rise_count": int((pct > 0).sum()),
+            "fall_count": int((pct < 0).sum()),
+            "flat_count": int((pct == 0).sum()),
+            "limit_up": int(is_limit_up.sum()),
+            "limit_down": int(is_limit_down.sum()),
+            "distribution": distribution,
         }
+    
+    def fetch_market_stats(self) -> Dict:
+        """
+        获取市场涨跌家数统计（一次全市场快照计算所有统计）
+        
+        Returns:
+            涨跌统计 {rise_count, fall_count, flat_count, limit_up, limit_down,
+                      total, distribution, update_time}
+            获取失败时返回空字典（监控器保留上一次的统计，不用全零覆盖）
+        """
+        result = {}
         
         try:
-            # 获取A股总数
-            url = "https://push2.eastmoney.com/api/qt/clist/get?pn=1&pz=1&po=1&np=1&fltt=2&invt=2&fid=f3&fs=m:0+t:6,m:0+t:80,m:1+t:2,m:1+t:23&fields=f3"
-            resp = requests.get(
-                url, 
-                headers=self.eastmoney_headers, 
-                timeout=5, 
-                proxies={"http": None, "https": None}
-            )
-            data = resp.json()
-            total = data.get("data", {}).get("total", 0)
-            
-            # 获取上涨股票数量
-            url_up = "https://push2.eastmoney.com/api/qt/clist/get?pn=1&pz=1&po=1&np=1&fltt=2&invt=2&fid=f3&fs=m:0+t:6,m:0+t:80,m:1+t:2,m:1+t:23&fields=f3&fid=f3&filter=(f3>0)"
-            resp_up = requests.get(
-                url_up, 
-                headers=self.eastmoney_headers, 
-                timeout=5, 
-                proxies={"http": None, "https": None}
-            )
-            rise_count = resp_up.json().get("data", {}).get("total", 0)
-            
-            # 获取下跌股票数量
-            url_down = "https://push2.eastmoney.com/api/qt/clist/get?pn=1&pz=1&po=1&np=1&fltt=2&invt=2&fid=f3&fs=m:0+t:6,m:0+t:80,m:1+t:2,m:1+t:23&fields=f3&fid=f3&filter=(f3<0)"
-            resp_down = requests.get(
-                url_down, 
-                headers=self.eastmoney_headers, 
-                timeout=5, 
-                proxies={"http": None, "https": None}
-            )
-            fall_count = resp_down.json().get("data", {}).get("total", 0)
-            
-            # 获取涨停数量
-            url_limit_up = "https://push2.eastmoney.com/api/qt/clist/get?pn=1&pz=1&po=1&np=1&fltt=2&invt=2&fid=f3&fs=m:0+t:6,m:0+t:80,m:1+t:2,m:1+t:23&fields=f3&fid=f3&filter=(f3>=9.9)"
-            resp_limit_up = requests.get(
-                url_limit_up, 
-                headers=self.eastmoney_headers, 
-                timeout=5, 
-                proxies={"http": None, "https": None}
+            result = self.compute_breadth(self.fetch_market_snapshot())
+            result["update_time"] = datetime.now().strftime("%H:%M:%S")
+            print(
+                f"涨跌统计: 涨{result['rise_count']} 跌{result['fall_count']} 平{result['flat_count']} "
+                f"涨停{result['limit_up']} 跌停{result['limit_down']}"
             )
-            limit_up = resp_limit_up.json().get("data", {}).get("total", 0)
-            
-            # 获取跌停数量
-            url_limit_down = "https://push2.eastmoney.com/api/qt/clist/get?pn=1&pz=1&po=1&np=1&fltt=2&invt=2&fid=f3&fs=m:0+t:6,m:0+t:80,m:1+t:2,m:1+t:23&fields=f3&fid=f3&filter=(f3<=-9.9)"
-            resp_limit_down = requests.get(
-                url_limit_down, 
-                headers=self.eastmoney_headers, 
-                timeout=5, 
-                proxies={"http": None, "https": None}
-            )
-            limit_down = resp_limit_down.json().get("data", {}).get("total", 0)
-            
-            flat_count = total - rise_count - fall_count
-            if flat_count < 0:
-                flat_count = 0
-            
-            result = {
-                "rise_count": rise_count,
-                "fall_count": fall_count,
-                "flat_count": flat_count,
-                "limit_up": limit_up,
-                "limit_down": limit_down,
-                "update_time": datetime.now().strftime("%H:%M:%S")
-            }
-            print(f"涨跌统计: 涨{rise_count} 跌{fall_count} 平{flat_count} 涨停{limit_up} 跌停{limit_down}")
-            
         except Exception as e:
             print(f"获取市场涨跌统计失败: {e}")
         
@@ -207,12 +251,7 @@ class IndexDataFetcher:
         try:
             url = f"https://push2his.eastmoney.com/api/qt/stock/kline/get?secid=1.000001&fields1=f1,f2,f3,f4,f5&fields2=f51,f52,f53,f54,f55,f56,f57&klt=101&fqt=0&end=20500101&lmt={days}"
             
-            resp = requests.get(
-                url, 
-                headers=self.eastmoney_headers, 
-                timeout=10, 
-                proxies={"http": None, "https": None}
-            )
+            resp = self.http.get(url, endpoint="em_history", headers=self.eastmoney_headers)
             data = resp.json()
             
             result = []
@@ -249,12 +288,7 @@ class IndexDataFetcher:
             
             url = f"https://push2.eastmoney.com/api/qt/stock/trends2/get?secid={secid}&fields1=f1,f2,f3,f4,f5,f6,f7,f8,f9,f10,f11&fields2=f51,f52,f53,f54,f55,f56,f57,f58&iscr=0&ndays=2"
             
-            resp = requests.get(
-                url, 
-                headers=self.eastmoney_headers, 
-                timeout=10, 
-                proxies={"http": None, "https": None}
-            )
+            resp = self.http.get(url, endpoint="em_quote", headers=self.eastmoney_headers)
             data = resp.json()
             
             result = []
@@ -298,12 +332,7 @@ class IndexDataFetcher:
             
             url = f"https://push2his.eastmoney.com/api/qt/stock/kline/get?secid={secid}&fields1=f1,f2,f3,f4,f5&fields2=f51,f52,f53,f54,f55,f56,f57&klt=101&fqt=0&end=20500101&lmt={days}"
             
-            resp = requests.get(
-                url, 
-                headers=self.eastmoney_headers, 
-                timeout=10, 
-                proxies={"http": None, "https": None}
-            )
+            resp = self.http.get(url, endpoint="em_history", headers=self.eastmoney_headers)
             data = resp.json()
             
             result = []
@@ -338,16 +367,27 @@ class IndexDataFetcher:
         """
         code = code if code.startswith("sh") or code.startswith("sz") else f"sh{code}"
         basic = index_data.get(code, {})
-        minute = self.get_index_minute_data(code)
-        kline = self.get_index_kline_data(code, days=60)
-        stats_history = self.get_market_stats_history(30)
+        
+        # 三部分并发获取；单个部分失败或超时时返回空列表
+        results, errors = gather(
+            {
+                "minute": lambda: self.get_index_minute_data(code),
+                "kline": lambda: self.get_index_kline_data(code, days=60),
+                "stats_history": lambda: self.get_market_stats_history(30),
+            },
+            executor="detail",
+            max_workers=self.DETAIL_MAX_WORKERS,
+            timeouts=self.DETAIL_PART_TIMEOUTS,
+        )
+        if errors:
+            print(f"获取指数详情部分失败 {code}: {errors}")
         
         return {
             "status": "success",
             "basic": basic,
-            "minute": minute.get("data", []),
-            "kline": kline.get("data", []),
-            "stats_history": stats_history.get("data", []),
+            "minute": results.get("minute", {}).get("data", []),
+            "kline": results.get("kline", {}).get("data", []),
+            "stats_history": results.get("stats_history", {}).get("data", []),
             "current_stats": market_stats
         }
 
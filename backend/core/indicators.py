@@ -0,0 +1,428 @@
+"""
+技术指标计算模块
+
+本文件提供基于 NumPy 的技术指标计算：
+1. 均线类：SMA、EMA、布林带（BOLL）
+2. 趋势/动量类：MACD、RSI、KDJ
+3. 波动/量能类：ATR、OBV、VWAP
+4. 增量计算：IndicatorState 在新 K 线到来时只更新最后一个值
+
+设计说明：
+- 所有批量函数的时间维为最后一维：一维数组为单只股票，二维数组 (股票数, K线数) 为批量计算
+- 数据不足的位置为 NaN；批量数组中各股票长度不同时，用 stack() 右对齐、左侧补 NaN
+- 递推类指标（EMA、Wilder 平滑、KDJ）按时间逐步递推，每一步对全部股票做向量运算
+- 平滑规则与国内行情软件一致：EMA(X, N) 首值取 X 首个有效值；
+  RSI / ATR / KDJ 使用 SMA(X, N, M) 递推：Y = (M*X + (N-M)*Y') / N
+"""
+
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+OHLCV_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+# ========== 数据准备 ==========
+
+def ohlcv(kline_data: List[dict]) -> Dict[str, np.ndarray]:
+    """
+    将K线字典列表转换为 OHLCV 数组
+
+    Args:
+        kline_data: [{"open", "high", "low", "close", "volume", ...}, ...]
+
+    Returns:
+        {"open": ndarray, "high": ..., "low": ..., "close": ..., "volume": ...}
+    """
+    rows = np.array(
+        [(k.get("open") or 0, k.get("high") or 0, k.get("low") or 0, k.get("close") or 0, k.get("volume") or 0)
+         for k in kline_data],
+        dtype=np.float64,
+    ).reshape(-1, len(OHLCV_FIELDS))
+    return {field: rows[:, i].copy() for i, field in enumerate(OHLCV_FIELDS)}
+
+
+def stack(series: Sequence[np.ndarray], length: Optional[int] = None) -> np.ndarray:
+    """
+    将多只股票的序列右对齐堆叠为二维数组（左侧补 NaN）
+
+    Args:
+        series: 各股票的一维数组
+        length: 保留的K线数（默认取最长序列的长度）
+
+    Returns:
+        (股票数, length) 数组
+    """
+    if length is None:
+        length = max((len(s) for s in series), default=0)
+    out = np.full((len(series), length), np.nan, dtype=np.float64)
+    for i, s in enumerate(series):
+        tail = np.asarray(s, dtype=np.float64)[-length:] if length else s[:0]
+        if len(tail):
+            out[i, length - len(tail):] = tail
+    return out
+
+
+def last(values: np.ndarray, digits: int = 2) -> Optional[float]:
+    """取一维序列的最后一个值并四舍五入（为空或 NaN 时返回 None）"""
+    if values.size == 0 or np.isnan(values[-1]):
+        return None
+    return round(float(values[-1]), digits)
+
+
+# ========== 基础运算 ==========
+
+def sma(x: np.ndarray, n: int) -> np.ndarray:
+    """
+    简单移动平均 MA(X, N)
+
+    窗口内存在 NaN（数据不足）时结果为 NaN
+    """
+    x = np.asarray(x, dtype=np.float64)
+    valid = np.isfinite(x)
+    csum = np.cumsum(np.where(valid, x, 0.0), axis=-1)
+    ccount = np.cumsum(valid, axis=-1)
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] < n:
+        return out
+    window_sum = csum[..., n - 1:].copy()
+    window_sum[..., 1:] -= csum[..., :-n]
+    window_count = ccount[..., n - 1:].copy()
+    window_count[..., 1:] -= ccount[..., :-n]
+    out[..., n - 1:] = np.where(window_count == n, window_sum / n, np.nan)
+    return out
+
+
+def rolling_std(x: np.ndarray, n: int) -> np.ndarray:
+    """滚动总体标准差（与 MA 对齐，数据不足时为 NaN）"""
+    mean = sma(x, n)
+    mean_sq = sma(np.square(x), n)
+    return np.sqrt(np.maximum(mean_sq - np.square(mean), 0.0))
+
+
+def _rolling_extreme(x: np.ndarray, n: int, func, fill: float) -> np.ndarray:
+    """滚动最大/最小值（前 n-1 根取已有数据）"""
+    x = np.asarray(x, dtype=np.float64)
+    pad = [(0, 0)] * (x.ndim - 1) + [(n - 1, 0)]
+    padded = np.pad(np.where(np.isfinite(x), x, fill), pad, constant_values=fill)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, n, axis=-1)
+    out = func(windows, axis=-1)
+    return np.where(np.isfinite(x) & np.isfinite(out), out, np.nan)
+
+
+def hhv(x: np.ndarray, n: int) -> np.ndarray:
+    """N 周期最高值 HHV(X, N)"""
+    return _rolling_extreme(x, n, np.max, -np.inf)
+
+
+def llv(x: np.ndarray, n: int) -> np.ndarray:
+    """N 周期最低值 LLV(X, N)"""
+    return _rolling_extreme(x, n, np.min, np.inf)
+
+
+def _recursive(x: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    递推平滑 Y = alpha*X + (1-alpha)*Y'，首值取 X 首个有效值
+
+    沿时间维逐步递推，每一步对全部股票做向量运算；
+    单只股票时直接按 Python 浮点数递推（避免逐元素调用 NumPy 的开销）
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim == 1:
+        values = x.tolist()
+        prev = float("nan")
+        for t, cur in enumerate(values):
+            if prev != prev:
+                prev = cur
+            elif cur == cur:
+                prev = alpha * cur + (1 - alpha) * prev
+            values[t] = prev
+        return np.array(values, dtype=np.float64)
+    out = np.empty_like(x)
+    xt = np.moveaxis(x, -1, 0)
+    ot = np.moveaxis(out, -1, 0)
+    prev = np.full(xt.shape[1:], np.nan)
+    for t in range(xt.shape[0]):
+        cur = xt[t]
+        prev = np.where(np.isnan(prev), cur, np.where(np.isnan(cur), prev, alpha * cur + (1 - alpha) * prev))
+        ot[t] = prev
+    return out
+
+
+def ema(x: np.ndarray, n: int) -> np.ndarray:
+    """指数移动平均 EMA(X, N)，alpha = 2/(N+1)"""
+    return _recursive(x, 2.0 / (n + 1))
+
+
+def sma_cn(x: np.ndarray, n: int, m: int = 1) -> np.ndarray:
+    """国内行情软件的 SMA(X, N, M)，alpha = M/N（即 Wilder 平滑）"""
+    return _recursive(x, m / n)
+
+
+def _prev(x: np.ndarray) -> np.ndarray:
+    """前一根的值（首根为 NaN）"""
+    out = np.full(x.shape, np.nan)
+    out[..., 1:] = x[..., :-1]
+    return out
+
+
+# ========== 指标 ==========
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MACD
+
+    Returns:
+        (DIF, DEA, MACD柱)，柱 = 2 * (DIF - DEA)
+    """
+    dif = ema(close, fast) - ema(close, slow)
+    dea = ema(dif, signal)
+    return dif, dea, 2 * (dif - dea)
+
+
+def rsi(close: np.ndarray, n: int = 14) -> np.ndarray:
+    """RSI = SMA(MAX(C-C',0), N, 1) / SMA(ABS(C-C'), N, 1) * 100"""
+    close = np.asarray(close, dtype=np.float64)
+    diff = close - _prev(close)
+    up = sma_cn(np.maximum(diff, 0.0), n)
+    total = sma_cn(np.abs(diff), n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(total > 0, up / total * 100, np.where(np.isnan(total), np.nan, 50.0))
+
+
+def kdj(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    n: int = 9,
+    m1: int = 3,
+    m2: int = 3,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    KDJ
+
+    RSV = (C - LLV(L, N)) / (HHV(H, N) - LLV(L, N)) * 100
+    K = SMA(RSV, M1, 1)，D = SMA(K, M2, 1)，J = 3K - 2D
+    """
+    lowest = llv(low, n)
+    highest = hhv(high, n)
+    span = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsv = np.where(span > 0, (np.asarray(close, dtype=np.float64) - lowest) / span * 100, 50.0)
+    rsv = np.where(np.isfinite(span), rsv, np.nan)
+    k = sma_cn(rsv, m1)
+    d = sma_cn(k, m2)
+    return k, d, 3 * k - 2 * d
+
+
+def boll(close: np.ndarray, n: int = 20, width: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    布林带
+
+    Returns:
+        (中轨, 上轨, 下轨)
+    """
+    mid = sma(close, n)
+    std = rolling_std(close, n)
+    return mid, mid + width * std, mid - width * std
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """真实波幅 TR = MAX(H-L, |H-C'|, |L-C'|)"""
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    prev_close = _prev(np.asarray(close, dtype=np.float64))
+    tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    # 首根没有昨收，只用 H-L
+    return np.where(np.isnan(prev_close), high - low, tr)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int = 14) -> np.ndarray:
+    """平均真实波幅 ATR = SMA(TR, N, 1)"""
+    return sma_cn(true_range(high, low, close), n)
+
+
+def obv(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """能量潮 OBV（上涨加成交量，下跌减成交量，首根为 0）"""
+    close = np.asarray(close, dtype=np.float64)
+    direction = np.sign(close - _prev(close))
+    signed = np.where(np.isnan(direction), 0.0, direction) * np.nan_to_num(np.asarray(volume, dtype=np.float64))
+    return np.cumsum(signed, axis=-1)
+
+
+def vwap(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    n: Optional[int] = None,
+) -> np.ndarray:
+    """
+    成交量加权均价（典型价 (H+L+C)/3 加权）
+
+    Args:
+        n: 滚动窗口；不传时为自首根起的累计 VWAP（适用于分时数据）
+    """
+    typical = (np.asarray(high, dtype=np.float64) + low + close) / 3
+    volume = np.asarray(volume, dtype=np.float64)
+    if n is None:
+        pv = np.cumsum(np.nan_to_num(typical * volume), axis=-1)
+        vol = np.cumsum(np.nan_to_num(volume), axis=-1)
+    else:
+        pv = sma(typical * volume, n)
+        vol = sma(volume, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(vol > 0, pv / vol, np.nan)
+
+
+def compute_all(bars: Dict[str, np.ndarray], ma_periods: Sequence[int] = (5, 10, 20, 60)) -> Dict[str, np.ndarray]:
+    """
+    一次计算全部常用指标（单只或批量）
+
+    Args:
+        bars: ohlcv() 的返回值（或对应的二维数组）
+        ma_periods: 均线周期
+
+    Returns:
+        {指标名: 数组}
+    """
+    close, high, low, volume = bars["close"], bars["high"], bars["low"], bars["volume"]
+    result = {f"ma{n}": sma(close, n) for n in ma_periods}
+    result["ema12"] = ema(close, 12)
+    result["ema26"] = ema(close, 26)
+    result["dif"], result["dea"], result["macd"] = macd(close)
+    result["rsi6"] = rsi(close, 6)
+    result["rsi14"] = rsi(close, 14)
+    result["k"], result["d"], result["j"] = kdj(high, low, close)
+    result["boll_mid"], result["boll_upper"], result["boll_lower"] = boll(close)
+    result["atr"] = atr(high, low, close)
+    result["obv"] = obv(close, volume)
+    result["vwap20"] = vwap(high, low, close, volume, 20)
+    return result
+
+
+def latest(bars: Dict[str, np.ndarray], digits: int = 2) -> Dict[str, Optional[float]]:
+    """计算单只股票全部指标的最新值（数据不足为 None）"""
+    return {name: last(values, digits) for name, values in compute_all(bars).items()}
+
+
+# ========== 增量计算 ==========
+
+class IndicatorState:
+    """
+    单只股票的增量指标状态
+
+    用历史K线初始化后，每根新K线只做 O(1) 更新（均线窗口用滑动和），
+    结果与对整段数据调用 compute_all() 的最后一个值一致
+    """
+
+    MA_PERIODS = (5, 10, 20, 60)
+
+    def __init__(self, bars: Optional[Dict[str, np.ndarray]] = None):
+        """
+        初始化状态
+
+        Args:
+            bars: 历史K线（ohlcv() 的返回值，可选）
+        """
+        self._windows = {n: deque(maxlen=n) for n in self.MA_PERIODS + (20,)}
+        self._sums = {n: 0.0 for n in self._windows}
+        self._sq_window: deque = deque(maxlen=20)
+        self._sq_sum = 0.0
+        self._pv_window: deque = deque(maxlen=20)
+        self._pv_sum = 0.0
+        self._vol_window: deque = deque(maxlen=20)
+        self._vol_sum = 0.0
+        self._high_window: deque = deque(maxlen=9)
+        self._low_window: deque = deque(maxlen=9)
+
+        self._ema12 = self._ema26 = self._dea = None
+        self._rsi6 = [None, None]
+        self._rsi14 = [None, None]
+        self._k = self._d = None
+        self._atr = None
+        self._obv = 0.0
+        self._prev_close: Optional[float] = None
+        self.values: Dict[str, Optional[float]] = {}
+
+        if bars is not None:
+            for i in range(len(bars["close"])):
+                self.update(*(float(bars[f][i]) for f in OHLCV_FIELDS))
+
+    @staticmethod
+    def _smooth(prev: Optional[float], value: float, alpha: float) -> float:
+        return value if prev is None else alpha * value + (1 - alpha) * prev
+
+    @staticmethod
+    def _push(window: deque, total: float, value: float) -> float:
+        """滑动窗口追加一个值，返回新的窗口和"""
+        if len(window) == window.maxlen:
+            total -= window[0]
+        window.append(value)
+        return total + value
+
+    def update(self, open_: float, high: float, low: float, close: float, volume: float) -> Dict[str, Optional[float]]:
+        """
+        追加一根新K线
+
+        Returns:
+            各指标最新值（未四舍五入，数据不足为 None）
+        """
+        values: Dict[str, Optional[float]] = {}
+
+        for n, window in self._windows.items():
+            self._sums[n] = self._push(window, self._sums[n], close)
+        for n in self.MA_PERIODS:
+            values[f"ma{n}"] = self._sums[n] / n if len(self._windows[n]) == n else None
+
+        self._ema12 = self._smooth(self._ema12, close, 2 / 13)
+        self._ema26 = self._smooth(self._ema26, close, 2 / 27)
+        dif = self._ema12 - self._ema26
+        self._dea = self._smooth(self._dea, dif, 2 / 10)
+        values.update(ema12=self._ema12, ema26=self._ema26, dif=dif, dea=self._dea, macd=2 * (dif - self._dea))
+
+        if self._prev_close is None:
+            values["rsi6"] = values["rsi14"] = None
+        else:
+            diff = close - self._prev_close
+            for name, state, n in (("rsi6", self._rsi6, 6), ("rsi14", self._rsi14, 14)):
+                state[0] = self._smooth(state[0], max(diff, 0.0), 1 / n)
+                state[1] = self._smooth(state[1], abs(diff), 1 / n)
+                values[name] = state[0] / state[1] * 100 if state[1] > 0 else 50.0
+
+        self._high_window.append(high)
+        self._low_window.append(low)
+        lowest, highest = min(self._low_window), max(self._high_window)
+        rsv = (close - lowest) / (highest - lowest) * 100 if highest > lowest else 50.0
+        self._k = self._smooth(self._k, rsv, 1 / 3)
+        self._d = self._smooth(self._d, self._k, 1 / 3)
+        values.update(k=self._k, d=self._d, j=3 * self._k - 2 * self._d)
+
+        self._sq_sum = self._push(self._sq_window, self._sq_sum, close * close)
+        if len(self._sq_window) == 20:
+            mid = self._sums[20] / 20
+            std = max(self._sq_sum / 20 - mid * mid, 0.0) ** 0.5
+            values.update(boll_mid=mid, boll_upper=mid + 2 * std, boll_lower=mid - 2 * std)
+        else:
+            values.update(boll_mid=None, boll_upper=None, boll_lower=None)
+
+        if self._prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+            self._obv += volume if close > self._prev_close else -volume if close < self._prev_close else 0.0
+        self._atr = self._smooth(self._atr, tr, 1 / 14)
+        values.update(atr=self._atr, obv=self._obv)
+
+        typical = (high + low + close) / 3
+        self._pv_sum = self._push(self._pv_window, self._pv_sum, typical * volume)
+        self._vol_sum = self._push(self._vol_window, self._vol_sum, volume)
+        values["vwap20"] = (
+            self._pv_sum / self._vol_sum if len(self._vol_window) == 20 and self._vol_sum > 0 else None
+        )
+
+        self._prev_close = close
+        self.values = values
+        return values
@@ -0,0 +1,284 @@
+"""
+盘中流式指标模块
+
+本文件负责在每个监控节拍用实时行情（QuoteStore）增量更新盘中指标，
+不再为了盘中指标重新拉取分时数据：
+1. 当日 VWAP：累计成交额 / 累计成交量
+2. 每个节拍的成交量增量，以及最近 N 笔增量的滚动成交量
+3. 量比：当前每分钟成交量 / 历史每分钟平均成交量（历史日成交量由调用方提供）
+4. 滚动波动率：最近 N 个节拍对数收益率的标准差
+
+设计说明：
+- 每只股票占一个槽位，状态以 NumPy 数组存储；环形缓冲区为 (槽位数, N) 的二维数组
+- 每个节拍只对本次更新的行做向量运算，窗口和用滑动加减维护，单只股票 O(1)
+- 只有成交量增加（有新成交）时才写入环形缓冲区，午休和停牌不会稀释窗口
+- 累计成交量减少（新交易日或数据源重置）时该股票的状态清零
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .quote_store import QuoteStore
+
+
+# 环形缓冲区长度（节拍数）
+WINDOW = 60
+# 每隔多少次写入重新计算一次窗口和，消除浮点累积误差
+RESUM_INTERVAL = 1024
+# 每个交易日的连续竞价分钟数
+TRADING_MINUTES = 240
+
+
+def elapsed_trading_minutes(now: datetime) -> float:
+    """当日已进行的连续竞价分钟数（9:30-11:30、13:00-15:00）"""
+    minutes = now.hour * 60 + now.minute + now.second / 60
+    morning = min(max(minutes - (9 * 60 + 30), 0), 120)
+    afternoon = min(max(minutes - 13 * 60, 0), 120)
+    return morning + afternoon
+
+
+class IntradayAccumulator:
+    """
+    盘中流式指标累加器
+
+    槽位与 QuoteStore 行号无关（行号会因删除而变化），通过代码映射
+    """
+
+    def __init__(self, window: int = WINDOW, capacity: int = 64):
+        """
+        初始化累加器
+
+        Args:
+            window: 环形缓冲区长度
+            capacity: 初始槽位数，不足时自动翻倍
+        """
+        self.window = window
+        self.capacity = capacity
+        self._lock = threading.Lock()
+
+        self.slots: Dict[str, int] = {}
+        self.codes: List[str] = []
+        self._free: List[int] = []
+
+        self._row_slots = np.empty(0, dtype=np.int64)
+        self._store_version = -1
+
+        self.last_volume = np.full(capacity, np.nan)
+        self.last_price = np.full(capacity, np.nan)
+        self.tick_volume = np.zeros(capacity)
+        self.profile = np.full(capacity, np.nan)     # 历史日均成交量（NaN: 尚未读取到历史数据）
+        self.head = np.zeros(capacity, dtype=np.int64)
+        self.filled = np.zeros(capacity, dtype=np.int64)
+        self.ret_ring = np.zeros((capacity, window))
+        self.vol_ring = np.zeros((capacity, window))
+        self.ret_sum = np.zeros(capacity)
+        self.ret_sq_sum = np.zeros(capacity)
+        self.vol_sum = np.zeros(capacity)
+
+        self._writes = 0
+        self._date = ""
+
+    # ========== 槽位管理 ==========
+
+    def _grow(self):
+        """槽位数翻倍"""
+        old, new = self.capacity, self.capacity * 2
+        for name in ("last_volume", "last_price", "profile"):
+            arr = np.full(new, np.nan)
+            arr[:old] = getattr(self, name)
+            setattr(self, name, arr)
+        for name, dtype in (("tick_volume", np.float64), ("head", np.int64), ("filled", np.int64),
+                            ("ret_sum", np.float64), ("ret_sq_sum", np.float64), ("vol_sum", np.float64)):
+            arr = np.zeros(new, dtype=dtype)
+            arr[:old] = getattr(self, name)
+            setattr(self, name, arr)
+        for name in ("ret_ring", "vol_ring"):
+            arr = np.zeros((new, self.window))
+            arr[:old] = getattr(self, name)
+            setattr(self, name, arr)
+        self.capacity = new
+
+    def _slot_for(self, code: str) -> int:
+        """获取股票的槽位，不存在时分配"""
+        slot = self.slots.get(code)
+        if slot is not None:
+            return slot
+        if self._free:
+            slot = self._free.pop()
+            self.codes[slot] = code
+        else:
+            if len(self.codes) >= self.capacity:
+                self._grow()
+            slot = len(self.codes)
+            self.codes.append(code)
+        self.slots[code] = slot
+        self._reset(np.array([slot]))
+        self.profile[slot] = np.nan
+        return slot
+
+    def _reset(self, slots: np.ndarray):
+        """清空槽位的当日状态"""
+        self.last_volume[slots] = np.nan
+        self.last_price[slots] = np.nan
+        self.tick_volume[slots] = 0
+        self.head[slots] = 0
+        self.filled[slots] = 0
+        self.ret_ring[slots] = 0
+        self.vol_ring[slots] = 0
+        self.ret_sum[slots] = 0
+        self.ret_sq_sum[slots] = 0
+        self.vol_sum[slots] = 0
+
+    def remove(self, code: str):
+        """移除股票"""
+        with self._lock:
+            slot = self.slots.pop(code, None)
+            if slot is None:
+                return
+            self._reset(np.array([slot]))
+            self.codes[slot] = ""
+            self._free.append(slot)
+            self._store_version = -1
+
+    def set_profile(self, code: str, avg_daily_volume: float):
+        """设置历史日均成交量（用于计算量比）"""
+        with self._lock:
+            self.profile[self._slot_for(code)] = max(avg_daily_volume, 0.0)
+
+    def missing_profiles(self) -> List[str]:
+        """当日尚未读取到历史成交量的股票"""
+        with self._lock:
+            return [code for code, slot in self.slots.items() if np.isnan(self.profile[slot])]
+
+    # ========== 节拍更新 ==========
+
+    def _map_rows(self, store: QuoteStore) -> np.ndarray:
+        """行情行号 → 槽位（行结构变化时重建）"""
+        if store.version != self._store_version:
+            self._row_slots = np.array(
+                [self._slot_for(code) for code in store.codes], dtype=np.int64
+            )
+            self._store_version = store.version
+        return self._row_slots
+
+    def update(self, store: QuoteStore, rows: np.ndarray):
+        """
+        用一个节拍的行情更新指标
+
+        Args:
+            store: 实时行情快照
+            rows: 本次更新的行号（QuoteStore.update_many 的返回值）
+        """
+        if not len(rows):
+            return
+        with self._lock:
+            today = datetime.now().strftime("%Y-%m-%d")
+            if today != self._date:
+                self._date = today
+                self._reset(np.arange(self.capacity))
+                # 新交易日重新读取历史成交量
+                self.profile[:] = np.nan
+
+            slots = self._map_rows(store)[rows]
+            price = store.price[rows]
+            volume = store.volume[rows].astype(np.float64)
+
+            # 累计成交量回退：新交易日或数据源重置
+            restarted = volume < self.last_volume[slots]
+            if restarted.any():
+                self._reset(slots[restarted])
+
+            prev_volume = self.last_volume[slots]
+            prev_price = self.last_price[slots]
+            delta = np.where(np.isnan(prev_volume), 0.0, volume - prev_volume)
+            self.tick_volume[slots] = delta
+            self.last_volume[slots] = volume
+            self.last_price[slots] = np.where(price > 0, price, prev_price)
+
+            # 只有新成交的股票写入环形缓冲区
+            traded = (delta > 0) & (price > 0) & (prev_price > 0)
+            if not traded.any():
+                return
+            s = slots[traded]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ret = np.log(price[traded] / prev_price[traded])
+            d = delta[traded]
+
+            h = self.head[s]
+            old_ret = self.ret_ring[s, h]
+            old_vol = self.vol_ring[s, h]
+            self.ret_ring[s, h] = ret
+            self.vol_ring[s, h] = d
+            self.ret_sum[s] += ret - old_ret
+            self.ret_sq_sum[s] += ret * ret - old_ret * old_ret
+            self.vol_sum[s] += d - old_vol
+            self.head[s] = (h + 1) % self.window
+            self.filled[s] = np.minimum(self.filled[s] + 1, self.window)
+
+            self._writes += 1
+            if self._writes % RESUM_INTERVAL == 0:
+                self.ret_sum = self.ret_ring.sum(axis=1)
+                self.ret_sq_sum = np.square(self.ret_ring).sum(axis=1)
+                self.vol_sum = self.vol_ring.sum(axis=1)
+
+    # ========== 读取 ==========
+
+    def snapshot(self, store: QuoteStore, now: Optional[datetime] = None) -> Dict[str, dict]:
+        """
+        计算全部股票的盘中指标
+
+        Args:
+            store: 实时行情快照
+            now: 当前时间（计算量比用，默认当前时间）
+
+        Returns:
+            {code: {vwap, high, low, tick_volume, rolling_volume, volume_ratio, volatility, ticks}}
+        """
+        now = now or datetime.now()
+        elapsed = elapsed_trading_minutes(now)
+        with self._lock:
+            if not store.size:
+                return {}
+            rows = np.arange(store.size)
+            slots = self._map_rows(store)
+            volume = store.volume[rows].astype(np.float64)
+            amount = store.amount[rows]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                vwap = np.where(volume > 0, amount / volume, np.nan)
+                n = self.filled[slots].astype(np.float64)
+                mean = self.ret_sum[slots] / n
+                variance = self.ret_sq_sum[slots] / n - mean * mean
+                volatility = np.where(n >= 2, np.sqrt(np.maximum(variance, 0.0)) * 100, np.nan)
+                profile = self.profile[slots]
+                volume_ratio = np.where(
+                    (profile > 0) & (elapsed > 0),
+                    (volume / elapsed) / (profile / TRADING_MINUTES),
+                    np.nan,
+                )
+            tick_volume = self.tick_volume[slots]
+            rolling_volume = self.vol_sum[slots]
+            ticks = self.filled[slots]
+
+            def _num(value: float, digits: int) -> Optional[float]:
+                return None if np.isnan(value) else round(float(value), digits)
+
+            return {
+                code: {
+                    "vwap": _num(vwap[i], 3),
+                    "high": _num(store.high[i], 2),
+                    "low": _num(store.low[i], 2),
+                    "tick_volume": int(tick_volume[i]),
+                    "rolling_volume": int(round(rolling_volume[i])),
+                    "volume_ratio": _num(volume_ratio[i], 2),
+                    "volatility": _num(volatility[i], 4),
+                    "ticks": int(ticks[i]),
+                }
+                for i, code in enumerate(store.codes)
+            }
+
+    def get_stats(self) -> Dict:
+        """获取累加器状态"""
+        return {"symbols": len(self.slots), "window": self.window, "writes": self._writes}
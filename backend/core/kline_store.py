@@ -0,0 +1,301 @@
+"""
+K线本地仓库模块
+
+本文件负责将K线数据按股票持久化到数据目录，避免每次请求都下载完整历史：
+1. 每只股票、每个周期一个 .npy 文件（结构化数组：日期、OHLC、成交量）
+2. 首次请求下载所需条数，之后只下载缺失的尾部K线并合并；
+   下载结果与本地不衔接时（本地过旧）整体替换，文件中不会出现缺口
+3. 读取时以内存映射方式打开，只复制请求的切片
+4. 收盘后已更新过的数据直接从本地返回，不再请求上游
+
+目录结构：
+    {data_dir}/kline/{period}/{code}.npy
+    {data_dir}/kline/meta.json      # 每个文件的更新时间、是否已到上市首日
+"""
+
+import os
+import json
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from .response_cache import is_trading_session
+
+
+KLINE_DTYPE = np.dtype([
+    ("date", "i4"),         # YYYYMMDD
+    ("open", "f8"),
+    ("close", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("volume", "i8"),
+])
+
+# 每根K线大约覆盖的交易日数（用于估算缺失条数）
+PERIOD_DAYS = {"day": 1, "week": 5, "month": 21}
+# 增量请求时额外重叠的K线条数（覆盖未收盘的最后一根）
+TAIL_OVERLAP = 2
+
+
+def _period_keys(dates: np.ndarray, period: str) -> np.ndarray:
+    """
+    K线所属的自然周期编号（日K为日期，周K为所在周的周一，月K为年月）
+
+    周K、月K未收盘时日期为最新交易日，收盘后变为周期最后一个交易日，
+    合并时按周期编号而不是日期判断是否为同一根K线
+    """
+    dates = np.asarray(dates, dtype=np.int64)
+    if period == "month":
+        return dates // 100
+    if period == "week":
+        days = np.array(
+            [f"{d // 10000:04d}-{d // 100 % 100:02d}-{d % 100:02d}" for d in dates.tolist()],
+            dtype="datetime64[D]",
+        ).astype(np.int64)
+        # 1970-01-01 为周四，(days + 3) % 7 为距周一的天数
+        return days - (days + 3) % 7
+    return dates
+
+
+def _date_to_int(date: str) -> int:
+    """'2024-01-02' → 20240102"""
+    return int(date[:10].replace("-", ""))
+
+
+def _int_to_date(value: int) -> str:
+    """20240102 → '2024-01-02'"""
+    value = int(value)
+    return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
+
+
+def _last_close(now: datetime) -> datetime:
+    """最近一个已收盘交易日的 15:00（不考虑节假日）"""
+    close = now.replace(hour=15, minute=0, second=0, microsecond=0)
+    if now < close:
+        close -= timedelta(days=1)
+    while close.weekday() >= 5:
+        close -= timedelta(days=1)
+    return close
+
+
+class KlineStore:
+    """
+    K线本地仓库
+
+    fetch 为上游获取函数 fetch(code, period, count) -> {"status", "data": [...]}
+    （即 StockDataFetcher.get_kline_data）
+    """
+
+    def __init__(self, root_dir: Path, fetch: Callable[[str, str, int], dict]):
+        """
+        初始化K线仓库
+
+        Args:
+            root_dir: 仓库根目录
+            fetch: 上游K线获取函数
+        """
+        self.root_dir = root_dir
+        self.fetch = fetch
+        self._meta_file = root_dir / "meta.json"
+        self._meta: Dict[str, dict] = self._load_meta()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+        # 运行统计
+        self.local_hits = 0
+        self.upstream_bars = 0
+
+    # ========== 元数据 ==========
+
+    def _load_meta(self) -> Dict[str, dict]:
+        """加载元数据"""
+        if self._meta_file.exists():
+            try:
+                with open(self._meta_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"加载K线元数据失败: {e}")
+        return {}
+
+    def _save_meta(self):
+        """保存元数据"""
+        try:
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._meta_file, 'w', encoding='utf-8') as f:
+                json.dump(self._meta, f, ensure_ascii=False)
+        except Exception as e:
+            print(f"保存K线元数据失败: {e}")
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        """获取单个文件的锁"""
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    # ========== 文件读写 ==========
+
+    def _path(self, code: str, period: str) -> Path:
+        return self.root_dir / period / f"{code}.npy"
+
+    def _read(self, path: Path) -> np.ndarray:
+        """读取整个文件（内存映射，不存在时返回空数组）"""
+        if not path.exists():
+            return np.empty(0, dtype=KLINE_DTYPE)
+        try:
+            return np.load(path, mmap_mode="r")
+        except Exception as e:
+            print(f"读取K线文件失败 {path}: {e}")
+            return np.empty(0, dtype=KLINE_DTYPE)
+
+    def _write(self, path: Path, bars: np.ndarray):
+        """原子写入（先写临时文件再替换）"""
+        tmp = path.with_suffix(".tmp.npy")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.save(tmp, bars)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"写入K线文件失败 {path}: {e}")
+
+    @staticmethod
+    def _to_array(items: List[dict]) -> np.ndarray:
+        """上游结果转换为结构化数组"""
+        bars = np.empty(len(items), dtype=KLINE_DTYPE)
+        for i, item in enumerate(items):
+            bars[i] = (
+                _date_to_int(item["date"]),
+                item["open"], item["close"], item["high"], item["low"],
+                item["volume"],
+            )
+        return bars
+
+    @staticmethod
+    def _to_dicts(bars: np.ndarray) -> List[dict]:
+        """结构化数组转换为与上游相同的字典列表"""
+        return [
+            {
+                "date": _int_to_date(date),
+                "open": float(o),
+                "close": float(c),
+                "high": float(h),
+                "low": float(l),
+                "volume": int(v),
+            }
+            for date, o, c, h, l, v in bars.tolist()
+        ]
+
+    # ========== 增量更新 ==========
+
+    def _missing_bars(self, bars: np.ndarray, period: str, now: datetime) -> int:
+        """估算本地最后一根K线之后缺失的条数（含重叠）"""
+        last = datetime.strptime(str(int(bars["date"][-1])), "%Y%m%d")
+        business_days = int(np.busday_count(last.date(), now.date() + timedelta(days=1)))
+        return business_days // PERIOD_DAYS.get(period, 1) + TAIL_OVERLAP
+
+    def _is_fresh(self, key: str, now: datetime) -> bool:
+        """收盘后已更新过的数据视为最新"""
+        if is_trading_session(now):
+            return False
+        updated = self._meta.get(key, {}).get("updated")
+        if not updated:
+            return False
+        return datetime.fromisoformat(updated) >= _last_close(now)
+
+    def get_kline_data(self, code: str, period: str = "day", count: int = 120) -> dict:
+        """
+        获取K线数据（优先读本地，只下载缺失部分）
+
+        Args:
+            code: 股票代码（已规范化，如 sh600000）
+            period: 周期 day/week/month
+            count: 数据条数
+
+        Returns:
+            {"status": "success/error", "data": [...], "message": "..."}
+        """
+        key = f"{period}/{code}"
+        path = self._path(code, period)
+        now = datetime.now()
+
+        with self._lock_for(key):
+            stored = self._read(path)
+            meta = self._meta.get(key, {})
+            enough = len(stored) >= count or meta.get("exhausted", False)
+
+            if enough and len(stored) and self._is_fresh(key, now):
+                self.local_hits += 1
+                return {"status": "success", "data": self._to_dicts(np.array(stored[-count:]))}
+
+            # 本地历史不足时下载完整条数，否则下载缺失的尾部（不少于 count 条）
+            incremental = enough and len(stored) > 0
+            fetch_count = max(self._missing_bars(stored, period, now), count) if incremental else count
+            result = self.fetch(code, period, fetch_count)
+            if result.get("status") != "success":
+                # 上游失败时返回本地已有数据
+                if len(stored):
+                    return {"status": "success", "data": self._to_dicts(np.array(stored[-count:]))}
+                return result
+
+            fetched = self._to_array(result.get("data", []))
+            self.upstream_bars += len(fetched)
+            replaced = False
+            if len(fetched):
+                # 从第一根新K线所在的周期开始覆盖（最后一根可能是盘中未完成的K线，
+                # 周K、月K的未完成K线在完成后日期会变化）
+                first = _period_keys(fetched["date"][:1], period)[0]
+                stored_keys = _period_keys(stored["date"], period)
+                if len(stored) and first > stored_keys[-1]:
+                    # 下载的数据与本地不衔接（本地过旧，缺失超过单次下载能返回的条数）：
+                    # 整体替换，不在文件中留下缺口
+                    merged = fetched
+                    replaced = True
+                else:
+                    keep = stored[stored_keys < first]
+                    merged = np.concatenate([np.array(keep), fetched])
+            else:
+                merged = np.array(stored)
+            del stored
+            self._write(path, merged)
+
+            # 只有完整下载的条数不足时才说明已到上市首日（增量下载的条数按工作日估算，会偏多）
+            if incremental and not replaced:
+                exhausted = meta.get("exhausted", False)
+            else:
+                exhausted = len(fetched) < fetch_count
+            self._meta[key] = {"updated": now.isoformat(), "exhausted": exhausted}
+            self._save_meta()
+
+            return {"status": "success", "data": self._to_dicts(merged[-count:])}
+
+    def read_local(self, code: str, period: str = "day", count: int = 5) -> np.ndarray:
+        """
+        只读取本地已有的K线（不请求上游）
+
+        Args:
+            code: 股票代码（已规范化）
+            period: 周期
+            count: 最多返回的条数
+
+        Returns:
+            结构化数组（KLINE_DTYPE），本地无数据时为空数组
+        """
+        with self._lock_for(f"{period}/{code}"):
+            return np.array(self._read(self._path(code, period))[-count:])
+
+    def get_stats(self) -> Dict:
+        """
+        获取仓库统计
+
+        Returns:
+            {files, local_hits, upstream_bars}
+        """
+        return {
+            "files": len(self._meta),
+            "local_hits": self.local_hits,
+            "upstream_bars": self.upstream_bars,
+        }
@@ -0,0 +1,116 @@
+"""
+并发执行工具模块
+
+本文件提供 I/O 密集型任务的并发执行工具：
+1. 按用途命名的共享线程池（不同层级使用不同线程池，避免嵌套等待导致死锁）
+2. gather(): 并发执行一组任务，支持整体超时和单个任务超时，返回成功结果和失败信息
+
+使用示例：
+    results, errors = gather({"a": fetch_a, "b": fetch_b}, executor="detail", timeout=5)
+    results, errors = gather(tasks, executor="detail", timeouts={"a": 3, "b": 8})
+"""
+
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, Tuple
+
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name: str, max_workers: int = 8) -> ThreadPoolExecutor:
+    """
+    获取命名线程池（首次调用时创建）
+
+    Args:
+        name: 线程池名称
+        max_workers: 最大线程数（仅首次创建时生效）
+
+    Returns:
+        线程池实例
+    """
+    executor = _executors.get(name)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(name)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=max_workers,
+                    thread_name_prefix=f"pool-{name}"
+                )
+                _executors[name] = executor
+    return executor
+
+
+def gather(
+    tasks: Dict[str, Callable[[], object]],
+    executor: str = "default",
+    timeout: Optional[float] = None,
+    max_workers: int = 8,
+    timeouts: Optional[Dict[str, float]] = None,
+) -> Tuple[Dict[str, object], Dict[str, str]]:
+    """
+    并发执行一组任务
+
+    超时未完成的任务不会被中断（线程继续运行至自身超时），但其结果会被丢弃
+
+    Args:
+        tasks: {任务名: 无参函数}
+        executor: 使用的线程池名称
+        timeout: 整体等待超时（秒），None 表示一直等待
+        max_workers: 线程池最大线程数（仅首次创建时生效）
+        timeouts: 单个任务的等待超时 {任务名: 秒}，未列出的任务使用 timeout；
+                  某个任务超时后不再等待它，其余任务的结果照常返回
+
+    Returns:
+        (results, errors)
+        - results: {任务名: 返回值}，仅包含成功的任务
+        - errors: {任务名: 错误信息}，包含失败和超时的任务
+    """
+    results: Dict[str, object] = {}
+    errors: Dict[str, str] = {}
+    if not tasks:
+        return results, errors
+
+    pool = get_executor(executor, max_workers)
+    futures = {pool.submit(func): name for name, func in tasks.items()}
+
+    if not timeouts:
+        done, not_done = wait(futures, timeout=timeout)
+    else:
+        # 按各任务的截止时间依次等待
+        start = time.monotonic()
+        deadlines = {}
+        for future, name in futures.items():
+            limit = timeouts.get(name, timeout)
+            deadlines[future] = start + limit if limit is not None else float("inf")
+        done, not_done = set(), set(futures)
+        while not_done:
+            now = time.monotonic()
+            # 已到截止时间仍未完成的任务记为超时，不再等待
+            expired = {f for f in not_done if deadlines[f] <= now and not f.done()}
+            for future in expired:
+                future.cancel()
+                errors[futures[future]] = "timeout"
+            not_done -= expired
+            if not not_done:
+                break
+            next_deadline = min(deadlines[f] for f in not_done)
+            wait_for = None if next_deadline == float("inf") else max(next_deadline - now, 0)
+            finished, not_done = wait(not_done, timeout=wait_for, return_when=FIRST_COMPLETED)
+            done |= finished
+
+    for future in done:
+        name = futures[future]
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            errors[name] = str(e) or e.__class__.__name__
+
+    for future in not_done:
+        future.cancel()
+        errors[futures[future]] = "timeout"
+
+    return results, errors
@@ -0,0 +1,250 @@
+"""
+实时行情列式存储模块
+
+本文件提供基于 NumPy 的实时行情快照存储：
+1. 股票代码 → 行号索引
+2. 按列存储的数值数组（float64: 价格类字段、成交额；int64: 成交量、时间戳）
+3. 每个监控节拍原地更新，不再为每只股票创建格式化字符串字典
+4. 提供与原 StockMonitor.data 相同结构的只读视图（get / [] / in / to_dict）
+
+设计说明：
+- 行保持连续（删除时用最后一行填补空位），数值运算可直接作用于 [:size] 切片
+- 结构变化（新增/删除股票）时 version 递增，依赖行号的模块据此重建映射
+- 字符串格式化只在 API 读取时进行，并按节拍缓存
+"""
+
+import time
+import threading
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+
+class QuoteStore:
+    """
+    实时行情列式快照
+
+    数值字段以 NumPy 数组存储，名称和行情时间以列表存储
+    """
+
+    FLOAT_FIELDS = ("price", "pre_close", "open", "high", "low", "amount")
+    INT_FIELDS = ("volume", "timestamp")
+
+    def __init__(self, capacity: int = 64):
+        """
+        初始化行情存储
+
+        Args:
+            capacity: 初始容量（行数），不足时自动翻倍扩容
+        """
+        self._lock = threading.RLock()
+        self.capacity = max(int(capacity), 1)
+        self.size = 0
+        self.version = 0        # 结构变化（增删行）计数
+        self.tick = 0           # 数据更新计数
+
+        self.index: Dict[str, int] = {}
+        self.codes: List[str] = []
+        self.names: List[str] = []
+        self.times: List[str] = []
+
+        for field in self.FLOAT_FIELDS:
+            setattr(self, field, np.full(self.capacity, np.nan, dtype=np.float64))
+        for field in self.INT_FIELDS:
+            setattr(self, field, np.zeros(self.capacity, dtype=np.int64))
+
+        self._render_cache: Optional[Dict[str, dict]] = None
+        self._render_tick = -1
+
+    # ========== 写入 ==========
+
+    def _grow(self):
+        """容量翻倍"""
+        new_capacity = self.capacity * 2
+        for field in self.FLOAT_FIELDS:
+            arr = np.full(new_capacity, np.nan, dtype=np.float64)
+            arr[:self.capacity] = getattr(self, field)
+            setattr(self, field, arr)
+        for field in self.INT_FIELDS:
+            arr = np.zeros(new_capacity, dtype=np.int64)
+            arr[:self.capacity] = getattr(self, field)
+            setattr(self, field, arr)
+        self.capacity = new_capacity
+
+    def _ensure_row(self, code: str) -> int:
+        """获取股票所在行，不存在时追加新行"""
+        row = self.index.get(code)
+        if row is not None:
+            return row
+        if self.size >= self.capacity:
+            self._grow()
+        row = self.size
+        self.index[code] = row
+        self.codes.append(code)
+        self.names.append("")
+        self.times.append("")
+        self.size += 1
+        self.version += 1
+        return row
+
+    def update_many(self, quotes: Dict[str, dict]) -> np.ndarray:
+        """
+        批量写入一个节拍的行情
+
+        Args:
+            quotes: {code: {name, price, pre_close, open, high, low, volume, amount, time}}
+                    数值字段为 float/int（见 StockDataFetcher.fetch_realtime_quotes）
+
+        Returns:
+            本次更新的行号数组
+        """
+        now = int(time.time())
+        with self._lock:
+            rows = np.empty(len(quotes), dtype=np.int64)
+            for i, (code, q) in enumerate(quotes.items()):
+                row = self._ensure_row(code)
+                rows[i] = row
+                self.names[row] = q.get("name", "")
+                self.times[row] = q.get("time", "")
+                self.price[row] = q["price"]
+                self.pre_close[row] = q["pre_close"]
+                self.open[row] = q["open"]
+                self.high[row] = q["high"]
+                self.low[row] = q["low"]
+                self.volume[row] = q["volume"]
+                self.amount[row] = q["amount"]
+                self.timestamp[row] = now
+            self.tick += 1
+            return rows
+
+    def remove(self, code: str) -> bool:
+        """
+        删除股票（用最后一行填补空位）
+
+        Returns:
+            是否删除成功
+        """
+        with self._lock:
+            row = self.index.pop(code, None)
+            if row is None:
+                return False
+            last = self.size - 1
+            if row != last:
+                last_code = self.codes[last]
+                self.index[last_code] = row
+                self.codes[row] = last_code
+                self.names[row] = self.names[last]
+                self.times[row] = self.times[last]
+                for field in self.FLOAT_FIELDS + self.INT_FIELDS:
+                    arr = getattr(self, field)
+                    arr[row] = arr[last]
+            self.codes.pop()
+            self.names.pop()
+            self.times.pop()
+            for field in self.FLOAT_FIELDS:
+                getattr(self, field)[last] = np.nan
+            for field in self.INT_FIELDS:
+                getattr(self, field)[last] = 0
+            self.size -= 1
+            self.version += 1
+            self.tick += 1
+            return True
+
+    def clear(self):
+        """清空所有行情"""
+        with self._lock:
+            for code in list(self.codes):
+                self.remove(code)
+
+    # ========== 数值读取 ==========
+
+    def row_of(self, code: str) -> Optional[int]:
+        """获取股票所在行号"""
+        return self.index.get(code)
+
+    def column(self, field: str) -> np.ndarray:
+        """
+        获取某一列当前有效部分（视图，不复制）
+
+        Args:
+            field: 字段名（FLOAT_FIELDS 或 INT_FIELDS 中的一个）
+        """
+        return getattr(self, field)[:self.size]
+
+    def change_percent(self) -> np.ndarray:
+        """计算所有股票的涨跌幅（%），昨收无效时为 0"""
+        price = self.column("price")
+        pre_close = self.column("pre_close")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct = np.where(pre_close > 0, (price - pre_close) / pre_close * 100, 0.0)
+        return pct
+
+    # ========== 字典视图（兼容原 data 结构）==========
+
+    def _render_row(self, row: int, change_percent: float) -> dict:
+        """将一行渲染为原始的字符串字典结构"""
+        code = self.codes[row]
+        return {
+            "code": code,
+            "name": self.names[row],
+            "price": f"{self.price[row]:.2f}",
+            "change_percent": f"{change_percent:.2f}",
+            "high": f"{self.high[row]:.2f}",
+            "low": f"{self.low[row]:.2f}",
+            "open": f"{self.open[row]:.2f}",
+            "pre_close": f"{self.pre_close[row]:.2f}",
+            "volume": str(int(self.volume[row])),
+            "amount": f"{self.amount[row]:.2f}",
+            "time": self.times[row],
+        }
+
+    def to_dict(self) -> Dict[str, dict]:
+        """
+        渲染全部行情为 {code: {...}} 字典（按节拍缓存）
+
+        Returns:
+            与原 StockMonitor.data 相同结构的字典
+        """
+        with self._lock:
+            if self._render_cache is not None and self._render_tick == self.tick:
+                return self._render_cache
+            pct = self.change_percent()
+            rendered = {
+                self.codes[row]: self._render_row(row, pct[row])
+                for row in range(self.size)
+            }
+            self._render_cache = rendered
+            self._render_tick = self.tick
+            return rendered
+
+    def get(self, code: str, default=None) -> Optional[dict]:
+        """获取单只股票的字典视图"""
+        with self._lock:
+            row = self.index.get(code)
+            if row is None:
+                return default
+            pre_close = self.pre_close[row]
+            pct = (self.price[row] - pre_close) / pre_close * 100 if pre_close > 0 else 0.0
+            return self._render_row(row, pct)
+
+    def __getitem__(self, code: str) -> dict:
+        result = self.get(code)
+        if result is None:
+            raise KeyError(code)
+        return result
+
+    def __delitem__(self, code: str):
+        if not self.remove(code):
+            raise KeyError(code)
+
+    def __contains__(self, code: object) -> bool:
+        return code in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self.codes))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def keys(self) -> List[str]:
+        return list(self.codes)
@@ -0,0 +1,283 @@
+"""
+行情接口响应缓存模块
+
+本文件提供进程内的上游数据缓存，用于股票详情类接口（分时、K线、资金流向等）：
+1. 按 (数据类型, 股票代码, 参数) 缓存，TTL 随数据类型和交易时段变化
+2. LRU 淘汰，按序列化后的字节数限制总内存
+3. 单飞（single-flight）：同一个键的并发未命中只请求一次上游
+4. 缓存 JSON 序列化结果和 ETag，API 层可直接返回或响应 304
+5. 过期兜底（stale-if-error）：重新加载失败（上游熔断、超时等）时，
+   在 stale_if_error 时间内返回已过期的缓存，而不是错误
+
+设计说明：
+- 只缓存成功结果（status == "success"），错误结果每次重新请求
+- 缓存的 value 为共享对象，调用方只读，不应修改
+"""
+
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+# 各数据类型的 TTL（秒）：(交易时段, 非交易时段)
+CACHE_TTLS: Dict[str, Tuple[float, float]] = {
+    "minute": (10, 3600),
+    "kline": (30, 6 * 3600),
+    "money_flow": (30, 3600),
+    "extra": (300, 6 * 3600),
+    "dragon_tiger": (3600, 6 * 3600),
+    "history_minute": (24 * 3600, 24 * 3600),
+}
+DEFAULT_TTL: Tuple[float, float] = (30, 600)
+# 加载失败时可返回的过期缓存的最大过期时长（秒）
+STALE_IF_ERROR = 6 * 3600
+
+
+def is_trading_session(now: Optional[datetime] = None) -> bool:
+    """
+    判断是否处于 A 股交易时段（工作日 9:15-11:30, 13:00-15:00，含集合竞价）
+
+    Args:
+        now: 指定时间（默认当前时间）
+    """
+    now = now or datetime.now()
+    if now.weekday() >= 5:
+        return False
+    hm = now.hour * 100 + now.minute
+    return 915 <= hm <= 1130 or 1300 <= hm <= 1500
+
+
+def next_session_open(now: Optional[datetime] = None) -> datetime:
+    """
+    获取下一个交易时段的开始时间（工作日 9:15 或 13:00，不含节假日）
+
+    Args:
+        now: 指定时间（默认当前时间）
+    """
+    now = now or datetime.now()
+    day = now.replace(second=0, microsecond=0)
+    for offset in range(8):
+        date = day + timedelta(days=offset)
+        if date.weekday() >= 5:
+            continue
+        for hour, minute in ((9, 15), (13, 0)):
+            start = date.replace(hour=hour, minute=minute)
+            if start > now:
+                return start
+    return now + timedelta(days=1)
+
+
+def ttl_for(kind: str, now: Optional[datetime] = None) -> float:
+    """
+    获取数据类型在当前时段的 TTL（秒）
+
+    非交易时段的较长 TTL 截止到下一个交易时段开始，开盘后不会继续返回盘前缓存
+    """
+    now = now or datetime.now()
+    in_session, off_session = CACHE_TTLS.get(kind, DEFAULT_TTL)
+    if is_trading_session(now):
+        return in_session
+    if off_session <= in_session:
+        return off_session
+    until_open = (next_session_open(now) - now).total_seconds()
+    return max(min(off_session, until_open), in_session)
+
+
+@dataclass
+class CacheEntry:
+    """缓存条目"""
+    value: Any              # 原始结果（只读）
+    body: bytes             # JSON 序列化结果
+    etag: str               # 内容哈希
+    expires_at: float       # 过期时间（time.monotonic）
+    cached: bool = True     # 是否已写入缓存（错误结果为 False）
+    stale: bool = False     # 是否为加载失败时返回的过期缓存
+
+    @property
+    def max_age(self) -> int:
+        """剩余有效期（秒）"""
+        return max(int(self.expires_at - time.monotonic()), 0)
+
+
+class _Flight:
+    """进行中的上游请求（单飞）"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry: Optional[CacheEntry] = None
+        self.error: Optional[BaseException] = None
+
+
+def _is_success(value: Any) -> bool:
+    """默认缓存条件：返回 status == success 的字典"""
+    return isinstance(value, dict) and value.get("status") == "success"
+
+
+class ResponseCache:
+    """
+    TTL + LRU 响应缓存
+
+    线程安全，用于同步路由所在的线程池
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 32 * 1024 * 1024,
+        max_entries: int = 1024,
+        stale_if_error: float = STALE_IF_ERROR,
+    ):
+        """
+        初始化缓存
+
+        Args:
+            max_bytes: 缓存总字节数上限（按 JSON 序列化长度计）
+            max_entries: 条目数上限
+            stale_if_error: 加载失败时可返回的过期缓存的最大过期时长（秒）
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.stale_if_error = stale_if_error
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._bytes = 0
+
+        # 运行统计
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.stale_served = 0
+
+    # ========== 读写 ==========
+
+    def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: float,
+        cacheable: Callable[[Any], bool] = _is_success,
+    ) -> CacheEntry:
+        """
+        读取缓存，未命中时调用 loader 加载（同一键并发未命中只加载一次）
+
+        加载失败（抛出异常或结果不可缓存）且有 stale_if_error 内的过期缓存时，返回该过期缓存
+
+        Args:
+            key: 缓存键
+            loader: 加载函数
+            ttl: 有效期（秒）
+            cacheable: 判断结果是否可缓存
+
+        Returns:
+            缓存条目
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            stale = entry if entry is not None and now - entry.expires_at <= self.stale_if_error else None
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.entry
+
+        try:
+            try:
+                value = loader()
+            except Exception:
+                if stale is None:
+                    raise
+                flight.entry = self._serve_stale(stale)
+                return flight.entry
+            flight.entry = self._make_entry(value, ttl, cacheable(value))
+            if flight.entry.cached:
+                self._store(key, flight.entry)
+            elif stale is not None:
+                flight.entry = self._serve_stale(stale)
+            return flight.entry
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _serve_stale(self, entry: CacheEntry) -> CacheEntry:
+        """返回过期缓存（标记为 stale，不改变缓存中的条目）"""
+        with self._lock:
+            self.stale_served += 1
+        return replace(entry, stale=True)
+
+    @staticmethod
+    def _make_entry(value: Any, ttl: float, cached: bool) -> CacheEntry:
+        """序列化结果并计算 ETag"""
+        body = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        return CacheEntry(value, body, etag, time.monotonic() + ttl, cached)
+
+    def _store(self, key: Hashable, entry: CacheEntry):
+        """写入缓存并按 LRU 淘汰"""
+        size = len(entry.body)
+        if size > self.max_bytes:
+            entry.cached = False
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes or len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self.evictions += 1
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None):
+        """
+        删除缓存
+
+        Args:
+            predicate: 键过滤函数（不传则清空全部）
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if predicate is None or predicate(key):
+                    self._bytes -= len(self._entries.pop(key).body)
+
+    def get_stats(self) -> Dict:
+        """
+        获取缓存统计
+
+        Returns:
+            {entries, bytes, hits, misses, coalesced, evictions, stale_served}
+        """
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "stale_served": self.stale_served,
+        }
@@ -0,0 +1,230 @@
+"""
+监控节拍调度模块
+
+本文件负责监控循环中各数据源的并发调度：
+1. 每个数据源（指数、涨跌统计、自选股行情等）注册为独立任务
+2. 各任务拥有独立的刷新间隔和超时时间（deadline）
+3. 任务在线程池中并发执行，慢数据源不会拖慢其他数据源
+4. 超过 deadline 的任务被视为超时，其结果将被丢弃（不回调 on_result）
+
+设计说明：
+- 刷新间隔按「开始时间」计算，固定节拍，不受执行耗时影响
+- 同一任务同一时刻最多只有一个执行：超时被放弃的执行线程仍在运行时不启动新的执行，
+  避免请求堆积，也避免两次执行并发修改同一份状态
+- 修改共享状态的步骤应放在 on_result 中（func 只负责获取数据），超时结果不会被应用
+"""
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, List, Optional, Union
+
+
+class TickJob:
+    """
+    调度任务
+
+    描述一个数据源的获取函数、刷新间隔、超时时间和结果回调
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], object],
+        interval: Union[float, Callable[[], float]],
+        timeout: float,
+        on_result: Optional[Callable[[object], None]] = None,
+        condition: Optional[Callable[[], bool]] = None,
+    ):
+        """
+        初始化调度任务
+
+        Args:
+            name: 任务名称
+            func: 数据获取函数（不应修改共享状态，超时后其结果会被丢弃）
+            interval: 刷新间隔（秒），可以是返回秒数的函数（用于动态读取设置）
+            timeout: 超时时间（秒），超时后结果被丢弃
+            on_result: 结果回调，在工作线程中执行（仅对未超时的结果调用）
+            condition: 执行条件，返回 False 时跳过本次调度
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.timeout = timeout
+        self.on_result = on_result
+        self.condition = condition
+
+        # 运行状态
+        self.future: Optional[Future] = None
+        self.abandoned: Optional[Future] = None  # 超时被放弃但线程仍在运行的执行
+        self.generation = 0          # 每次超时放弃后递增，用于丢弃过期结果
+        self.started_at = 0.0
+        self.next_run = 0.0
+        self.last_duration: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.run_count = 0
+        self.timeout_count = 0
+        self.error_count = 0
+        self.last_error: Optional[str] = None
+
+    def get_interval(self) -> float:
+        """获取当前刷新间隔"""
+        interval = self.interval() if callable(self.interval) else self.interval
+        return max(float(interval), 0.1)
+
+
+class TickScheduler:
+    """
+    监控节拍调度器
+
+    并发执行多个数据源任务，每个任务独立计时
+    """
+
+    def __init__(self, max_workers: int = 8, poll_interval: float = 0.2):
+        """
+        初始化调度器
+
+        Args:
+            max_workers: 最大工作线程数
+            poll_interval: 调度循环的检查间隔（秒）
+        """
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.jobs: Dict[str, TickJob] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable[[], object],
+        interval: Union[float, Callable[[], float]],
+        timeout: float,
+        on_result: Optional[Callable[[object], None]] = None,
+        condition: Optional[Callable[[], bool]] = None,
+    ) -> TickJob:
+        """
+        注册调度任务（同名任务会被替换）
+
+        Returns:
+            注册的任务
+        """
+        job = TickJob(name, func, interval, timeout, on_result, condition)
+        with self._lock:
+            self.jobs[name] = job
+        return job
+
+    def remove_job(self, name: str):
+        """移除调度任务"""
+        with self._lock:
+            self.jobs.pop(name, None)
+
+    def run(self):
+        """
+        运行调度循环（阻塞，直到调用 stop）
+        """
+        self._stop_event.clear()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="tick"
+        )
+        try:
+            while not self._stop_event.is_set():
+                self._dispatch(time.monotonic())
+                self._stop_event.wait(self.poll_interval)
+        finally:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stop(self):
+        """停止调度循环"""
+        self._stop_event.set()
+
+    def _dispatch(self, now: float):
+        """检查所有任务，提交到期任务，处理超时任务"""
+        with self._lock:
+            jobs: List[TickJob] = list(self.jobs.values())
+
+        for job in jobs:
+            if job.future is not None and not job.future.done():
+                if now - job.started_at > job.timeout:
+                    # 超时：放弃本次执行，结果到达后将被丢弃
+                    job.generation += 1
+                    job.abandoned = job.future
+                    job.future = None
+                    job.timeout_count += 1
+                    print(f"[调度] {job.name} 超时 ({job.timeout}s)，已放弃本次结果")
+                continue
+
+            if job.abandoned is not None:
+                if not job.abandoned.done():
+                    # 被放弃的执行仍在运行，等待其结束后再启动新的执行
+                    continue
+                job.abandoned = None
+
+            if now < job.next_run:
+                continue
+
+            if job.condition is not None and not job.condition():
+                job.next_run = now + job.get_interval()
+                continue
+
+            job.started_at = now
+            job.next_run = now + job.get_interval()
+            job.future = self._executor.submit(self._run_job, job, job.generation)
+
+    def _run_job(self, job: TickJob, generation: int):
+        """在工作线程中执行任务并回调结果"""
+        started = time.monotonic()
+        try:
+            result = job.func()
+        except Exception as e:
+            job.error_count += 1
+            job.last_error = str(e)
+            print(f"[调度] {job.name} 执行失败: {e}")
+            return
+
+        duration = time.monotonic() - started
+        if generation != job.generation:
+            # 已超时被放弃，丢弃过期结果
+            return
+
+        job.run_count += 1
+        job.last_duration = duration
+        job.last_success = time.time()
+        job.last_error = None
+
+        if job.on_result is not None:
+            try:
+                job.on_result(result)
+            except Exception as e:
+                job.error_count += 1
+                job.last_error = str(e)
+                print(f"[调度] {job.name} 处理结果失败: {e}")
+
+    def get_status(self) -> Dict[str, dict]:
+        """
+        获取各任务运行状态
+
+        Returns:
+            {name: {interval, timeout, last_duration, last_success, ...}}
+        """
+        with self._lock:
+            jobs = list(self.jobs.values())
+
+        return {
+            job.name: {
+                "interval": job.get_interval(),
+                "timeout": job.timeout,
+                "running": job.future is not None and not job.future.done(),
+                "abandoned_running": job.abandoned is not None and not job.abandoned.done(),
+                "last_duration": round(job.last_duration, 3) if job.last_duration is not None else None,
+                "last_success": job.last_success,
+                "run_count": job.run_count,
+                "timeout_count": job.timeout_count,
+                "error_count": job.error_count,
+                "last_error": job.last_error,
+            }
+            for job in jobs
+        }
@@ -6,7 +6,7 @@
 2. 分时数据（新浪财经）
 3. K线数据（新浪财经）
 4. 资金流向数据（东方财富）
-5. 额外数据（换手率、量比、均线、市盈率等）
+5. 额外数据（换手率、量比、均线及技术指标、市盈率等）
 6. 龙虎榜数据（东方财富）
 7. 北向资金、融资融券数据
 
@@ -17,10 +17,19 @@
 
 import re
 import json
-import requests
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from .http_client import HttpClient, get_http_client
+from .parallel import gather
+from .fundamentals import FundamentalsTable
+from .kline_store import KlineStore
+from . import indicators
+
+
+# 计算技术指标使用的日K线条数
+INDICATOR_BARS = 120
+
 
 class StockDataFetcher:
     """
@@ -29,8 +38,31 @@ class StockDataFetcher:
     封装了各种股票数据的获取方法
     """
     
-    def __init__(self):
-        """初始化数据获取器"""
+    # 实时行情每批请求的代码数量（过长的 URL 会被新浪拒绝）
+    REALTIME_CHUNK_SIZE = 80
+    # 实时行情并发请求的最大线程数
+    REALTIME_MAX_WORKERS = 8
+    # 详情类数据（额外数据的各组成部分）并发请求的最大线程数
+    DETAIL_MAX_WORKERS = 16
+    # 额外数据各部分的等待超时（秒），超时的部分字段留空
+    EXTRA_PART_TIMEOUTS = {"quote": 5, "indicators": 8, "north_flow": 5, "margin": 5}
+    # 基本面批量请求每批的代码数量（东方财富 ulist 接口）
+    FUNDAMENTALS_CHUNK_SIZE = 100
+    
+    def __init__(self, http: Optional[HttpClient] = None):
+        """
+        初始化数据获取器
+        
+        Args:
+            http: HTTP 客户端（不传则使用全局共享实例）
+        """
+        self.http = http or get_http_client()
+        # 最近一次实时行情请求中失败的批次 [{index, codes, error}]
+        self.last_chunk_errors: List[Dict] = []
+        # 基本面表（由监控器注入，设置后额外数据优先读取本地）
+        self.fundamentals: Optional[FundamentalsTable] = None
+        # K线本地仓库（由监控器注入，设置后技术指标只下载缺失的尾部K线）
+        self.kline_store: Optional[KlineStore] = None
         # 通用请求头
         self.sina_headers = {
             "Referer": "https://finance.sina.com.cn/",
@@ -62,91 +94,182 @@ class StockDataFetcher:
             return f"bj{code}"
         return code
     
-    def fetch_realtime_data(self, codes: List[str]) -> Dict[str, dict]:
+    def _build_query_list(self, codes: List[str]) -> List[str]:
+        """
+        构建新浪行情查询代码列表（带市场前缀，去重并保持顺序）
+        
+        Args:
+            codes: 股票代码列表
+            
+        Returns:
+            查询代码列表
+        """
+        query_list = []
+        seen = set()
+        for code in codes:
+            code_lower = code.lower()
+            if code_lower.startswith("sh") or code_lower.startswith("sz") or code_lower.startswith("bj"):
+                query = code_lower
+            else:
+                query = self.normalize_code(code)
+                if query == code:
+                    continue
+            if query not in seen:
+                seen.add(query)
+                query_list.append(query)
+        return query_list
+    
+    def fetch_realtime_data(self, codes: List[str], chunk_size: Optional[int] = None) -> Dict[str, dict]:
         """
-        获取实时行情数据
+        获取实时行情数据（字符串格式）
         
         Args:
             codes: 股票代码列表
+            chunk_size: 每批代码数量（默认 REALTIME_CHUNK_SIZE）
             
         Returns:
             股票数据字典 {code: {name, price, change_percent, ...}}
         """
+        quotes = self.fetch_realtime_quotes(codes, chunk_size)
+        return {code: self.format_quote(q) for code, q in quotes.items()}
+    
+    @staticmethod
+    def format_quote(quote: dict) -> dict:
+        """
+        将数值行情格式化为字符串字典（API 返回格式）
+        
+        Args:
+            quote: fetch_realtime_quotes 返回的单只股票数值行情
+            
+        Returns:
+            {code, name, price, change_percent, ...}（数值均为字符串）
+        """
+        return {
+            "code": quote["code"],
+            "name": quote["name"],
+            "price": f"{quote['price']:.2f}",
+            "change_percent": f"{quote['change_percent']:.2f}",
+            "high": f"{quote['high']:.2f}",
+            "low": f"{quote['low']:.2f}",
+            "open": f"{quote['open']:.2f}",
+            "pre_close": f"{quote['pre_close']:.2f}",
+            "volume": str(quote["volume"]),
+            "amount": f"{quote['amount']:.2f}",
+            "time": quote["time"]
+        }
+    
+    def fetch_realtime_quotes(self, codes: List[str], chunk_size: Optional[int] = None) -> Dict[str, dict]:
+        """
+        获取实时行情数据（数值格式）
+        
+        代码列表按 chunk_size 分批请求，多批并发执行后合并结果，
+        单批失败只影响该批股票，失败信息记录在 last_chunk_errors 中
+        
+        Args:
+            codes: 股票代码列表
+            chunk_size: 每批代码数量（默认 REALTIME_CHUNK_SIZE）
+            
+        Returns:
+            股票数据字典 {code: {name, price, pre_close, open, high, low, volume, amount, change_percent, time}}
+            其中价格、成交额为 float，成交量为 int
+        """
+        self.last_chunk_errors = []
         if not codes:
             return {}
         
-        result = {}
+        query_list = self._build_query_list(codes)
+        if not query_list:
+            return {}
         
-        try:
-            # 构建查询列表
-            query_list = []
-            for code in codes:
-                code_lower = code.lower()
-                if code_lower.startswith("sh") or code_lower.startswith("sz") or code_lower.startswith("bj"):
-                    query_list.append(code_lower)
-                else:
-                    normalized = self.normalize_code(code)
-                    if normalized != code:
-                        query_list.append(normalized)
-            
-            if not query_list:
+        size = max(int(chunk_size or self.REALTIME_CHUNK_SIZE), 1)
+        chunks = [query_list[i:i + size] for i in range(0, len(query_list), size)]
+        
+        if len(chunks) == 1:
+            # 单批直接在当前线程请求
+            try:
+                return self._fetch_realtime_chunk(chunks[0])
+            except Exception as e:
+                print(f"获取实时数据失败: {e}")
+                self.last_chunk_errors = [{"index": 0, "codes": chunks[0], "error": str(e)}]
                 return {}
+        
+        tasks = {i: (lambda chunk=chunk: self._fetch_realtime_chunk(chunk)) for i, chunk in enumerate(chunks)}
+        results, errors = gather(tasks, executor="quotes", max_workers=self.REALTIME_MAX_WORKERS)
+        
+        result = {}
+        for i in range(len(chunks)):
+            if i in results:
+                result.update(results[i])
+        
+        if errors:
+            self.last_chunk_errors = [
+                {"index": i, "codes": chunks[i], "error": error}
+                for i, error in sorted(errors.items())
+            ]
+            print(f"获取实时数据部分失败: {len(errors)}/{len(chunks)} 批")
+        
+        return result
+    
+    def _fetch_realtime_chunk(self, query_list: List[str]) -> Dict[str, dict]:
+        """
+        请求并解析一批实时行情（请求失败时抛出异常，由调用方按批记录）
+        
+        Args:
+            query_list: 带市场前缀的代码列表
             
-            codes_str = ",".join(query_list)
-            url = f"http://hq.sinajs.cn/list={codes_str}"
+        Returns:
+            数值行情字典 {code: {...}}
+        """
+        codes_str = ",".join(query_list)
+        url = f"http://hq.sinajs.cn/list={codes_str}"
+        
+        resp = self.http.get(url, endpoint="sina_quote", headers=self.sina_headers)
+        resp.raise_for_status()
+        content = resp.content.decode('gbk')
+        
+        result = {}
+        lines = content.strip().split('\n')
+        for line in lines:
+            if not line:
+                continue
+            parts = line.split('=')
+            if len(parts) < 2:
+                continue
             
-            resp = requests.get(
-                url, 
-                headers=self.sina_headers, 
-                timeout=5, 
-                proxies={"http": None, "https": None}
-            )
-            content = resp.content.decode('gbk')
+            code_part = parts[0].split('_')[-1]
+            data_part = parts[1].strip('"')
+            if not data_part:
+                continue
             
-            lines = content.strip().split('\n')
-            for line in lines:
-                if not line:
-                    continue
-                parts = line.split('=')
-                if len(parts) < 2:
-                    continue
-                
-                code_part = parts[0].split('_')[-1]
-                data_part = parts[1].strip('"')
-                if not data_part:
-                    continue
-                
-                fields = data_part.split(',')
-                if len(fields) < 30:
-                    continue
-                
-                name = fields[0]
+            fields = data_part.split(',')
+            if len(fields) < 32:
+                continue
+            
+            # 单只股票数据异常不影响同批其他股票
+            try:
                 pre_close = float(fields[2])
                 price = float(fields[3])
-                high = fields[4]
-                low = fields[5]
-                time_str = fields[31]
-                
-                change_percent = 0.0
-                if pre_close > 0:
-                    change_percent = (price - pre_close) / pre_close * 100
-                
-                result[code_part] = {
+                quote = {
                     "code": code_part,
-                    "name": name,
-                    "price": f"{price:.2f}",
-                    "change_percent": f"{change_percent:.2f}",
-                    "high": high,
-                    "low": low,
-                    "open": fields[1],
-                    "pre_close": f"{pre_close:.2f}",
-                    "volume": fields[8],
-                    "amount": fields[9],
-                    "time": time_str
+                    "name": fields[0],
+                    "price": price,
+                    "pre_close": pre_close,
+                    "open": float(fields[1]),
+                    "high": float(fields[4]),
+                    "low": float(fields[5]),
+                    "volume": int(float(fields[8])),
+                    "amount": float(fields[9]),
+                    "time": fields[31],
                 }
-                
-        except Exception as e:
-            print(f"获取实时数据失败: {e}")
+            except ValueError:
+                continue
+            
+            change_percent = 0.0
+            if pre_close > 0:
+                change_percent = (price - pre_close) / pre_close * 100
+            quote["change_percent"] = change_percent
+            
+            result[code_part] = quote
         
         return result
     
@@ -164,12 +287,7 @@ class StockDataFetcher:
             code = self.normalize_code(code)
             url = f"https://quotes.sina.cn/cn/api/jsonp_v2.php/var%20_{code}_data=/CN_MarketDataService.getKLineData?symbol={code}&scale=1&ma=no&datalen=500"
             
-            resp = requests.get(
-                url, 
-                headers=self.sina_headers, 
-                timeout=10, 
-                proxies={"http": None, "https": None}
-            )
+            resp = self.http.get(url, endpoint="sina_kline", headers=self.sina_headers)
             content = resp.text
             
             match = re.search(r'\[.*\]', content)
@@ -209,12 +327,7 @@ class StockDataFetcher:
             code = self.normalize_code(code)
             url = f"https://quotes.sina.cn/cn/api/jsonp_v2.php/var%20_{code}_data=/CN_MarketDataService.getKLineData?symbol={code}&scale=1&ma=no&datalen=1000"
             
-            resp = requests.get(
-                url, 
-                headers=self.sina_headers, 
-                timeout=10, 
-                proxies={"http": None, "https": None}
-            )
+            resp = self.http.get(url, endpoint="sina_kline", headers=self.sina_headers)
             content = resp.text
             
             match = re.search(r'\[.*\]', content)
@@ -262,12 +375,7 @@ class StockDataFetcher:
             
             url = f"https://quotes.sina.cn/cn/api/jsonp_v2.php/var%20_{code}_kline=/CN_MarketDataService.getKLineData?symbol={code}&scale={scale}&ma=no&datalen={count}"
             
-            resp = requests.get(
-                url, 
-                headers=self.sina_headers, 
-                timeout=10, 
-                proxies={"http": None, "https": None}
-            )
+            resp = self.http.get(url, endpoint="sina_kline", headers=self.sina_headers)
             content = resp.text
             
             match = re.search(r'\[.*\]', content)
@@ -306,12 +414,7 @@ class StockDataFetcher:
             # 使用 klt=101 获取日线资金流向，避免 klt=1 分时数据累加导致数值过大
             url = f"https://push2.eastmoney.com/api/qt/stock/fflow/kline/get?secid={market}.{stock_code}&fields1=f1,f2,f3&fields2=f51,f52,f53,f54,f55,f56&klt=101&lmt=30"
             
-            resp = requests.get(
-                url, 
-                headers=self.eastmoney_headers, 
-                timeout=10, 
-                proxies={"http": None, "https": None}
-            )
+            resp = self.http.get(url, endpoint="em_quote", headers=self.eastmoney_headers)
             data = resp.json()
             
             if data.get("data") and data["data"].get("klines"):
@@ -361,68 +464,181 @@ class StockDataFetcher:
             "ma10": None,           # 10日均线
             "ma20": None,           # 20日均线
             "ma60": None,           # 60日均线
+            "macd": None,           # MACD {dif, dea, macd}
+            "rsi": None,            # RSI {rsi6, rsi14}
+            "kdj": None,            # KDJ {k, d, j}
+            "boll": None,           # 布林带 {mid, upper, lower}
+            "atr": None,            # 14日平均真实波幅
             "north_flow": None,     # 北向资金
             "margin_balance": None, # 融资余额
         }
         
-        try:
-            # 使用东方财富接口获取详细数据
-            # f162: PE(动), f164: PE(TTM), f167: PB, f168: 换手率
-            url = f"https://push2.eastmoney.com/api/qt/stock/get?secid={market}.{stock_code}&fields=f43,f44,f45,f46,f47,f48,f50,f51,f52,f55,f57,f58,f60,f61,f62,f162,f164,f167,f168,f84,f85,f100,f116,f117,f162,f167,f168,f171"
-            
-            resp = requests.get(
-                url, 
-                headers=self.eastmoney_headers, 
-                timeout=10, 
-                proxies={"http": None, "https": None}
-            )
-            data = resp.json()
+        # 四部分互不依赖，并发获取；单个部分失败或超时只留空对应字段
+        tasks = {
+            "quote": lambda: self._get_extra_quote(market, stock_code, code),
+            "indicators": lambda: self._get_extra_indicators(code),
+            "north_flow": lambda: {"north_flow": self._get_north_flow(code)},
+            "margin": lambda: {"margin_balance": self._get_margin_data(code)},
+        }
+        results, errors = gather(
+            tasks,
+            executor="detail",
+            max_workers=self.DETAIL_MAX_WORKERS,
+            timeouts=self.EXTRA_PART_TIMEOUTS,
+        )
+        for name in tasks:
+            if name in results:
+                result.update(results[name])
+            else:
+                print(f"获取股票额外数据失败 {code} {name}: {errors.get(name)}")
+        
+        # 行情部分（换手率、市盈率等主要字段）失败时整体视为失败：
+        # 不缓存字段大多为空的结果，由调用方重试或返回上一次成功的缓存
+        if "quote" not in results:
+            return {"status": "error", "message": f"获取额外数据失败: {errors.get('quote')}"}
+        return {"status": "success", "data": result}
+    
+    def _get_extra_quote(self, market: str, stock_code: str, code: Optional[str] = None) -> Dict:
+        """获取换手率、量比、振幅、市盈率、市净率、市值、所属行业（优先读基本面表，否则请求东方财富个股行情）"""
+        if self.fundamentals is not None and code:
+            row = self.fundamentals.get(code)
+            if row is not None:
+                return {key: row[key] for key in (
+                    "turnover_rate", "volume_ratio", "amplitude", "pe_ratio",
+                    "pb_ratio", "total_mv", "circ_mv", "industry",
+                )}
+        
+        # f162: PE(动), f164: PE(TTM), f167: PB, f168: 换手率
+        url = f"https://push2.eastmoney.com/api/qt/stock/get?secid={market}.{stock_code}&fields=f43,f44,f45,f46,f47,f48,f50,f51,f52,f55,f57,f58,f60,f61,f62,f162,f164,f167,f168,f84,f85,f100,f116,f117,f162,f167,f168,f171"
+        
+        resp = self.http.get(url, endpoint="em_quote", headers=self.eastmoney_headers)
+        data = resp.json()
+        
+        result = {}
+        if data.get("data"):
+            d = data["data"]
+            result["turnover_rate"] = d.get("f168") / 100 if d.get("f168") else None
+            result["volume_ratio"] = d.get("f50") / 100 if d.get("f50") else None
+            result["amplitude"] = d.get("f171") / 100 if d.get("f171") else None
+            # 优先使用 PE(TTM) f164，如果没有则使用 PE(动) f162
+            pe = d.get("f164") if d.get("f164") != "-" else d.get("f162")
+            result["pe_ratio"] = pe / 100 if pe else None
+            result["pb_ratio"] = d.get("f167") / 100 if d.get("f167") else None
+            result["total_mv"] = d.get("f116")
+            result["circ_mv"] = d.get("f117")
+            result["industry"] = d.get("f100")
+        return result
+    
+    def get_fundamentals_batch(self, codes: List[str], chunk_size: Optional[int] = None) -> Dict[str, dict]:
+        """
+        批量获取基本面数据（东方财富多代码行情接口，每批一次请求）
+        
+        Args:
+            codes: 股票代码列表
+            chunk_size: 每批代码数量（默认 FUNDAMENTALS_CHUNK_SIZE）
             
-            if data.get("data"):
-                d = data["data"]
-                result["turnover_rate"] = d.get("f168") / 100 if d.get("f168") else None
-                result["volume_ratio"] = d.get("f50") / 100 if d.get("f50") else None
-                result["amplitude"] = d.get("f171") / 100 if d.get("f171") else None
-                # 优先使用 PE(TTM) f164，如果没有则使用 PE(动) f162
-                pe = d.get("f164") if d.get("f164") != "-" else d.get("f162")
-                result["pe_ratio"] = pe / 100 if pe else None
-                result["pb_ratio"] = d.get("f167") / 100 if d.get("f167") else None
-                result["total_mv"] = d.get("f116")
-                result["circ_mv"] = d.get("f117")
-                result["industry"] = d.get("f100")
-        except Exception as e:
-            print(f"获取股票额外数据失败: {e}")
+        Returns:
+            {code: {name, industry, price, change_percent, turnover_rate, volume_ratio,
+                    amplitude, pe_ratio, pb_ratio, total_mv, circ_mv}}，code 为规范化代码
+            单批失败只缺少该批股票
+        """
+        secids = {}
+        for code in codes:
+            code = self.normalize_code(code)
+            if code[:2] in ("sh", "sz", "bj"):
+                secids[f"{'1' if code.startswith('sh') else '0'}.{code[2:]}"] = code
+        if not secids:
+            return {}
         
-        # 计算均线数据
-        try:
-            kline_result = self.get_kline_data(code, "day", 60)
-            kline_data = kline_result.get("data", [])
-            if kline_data:
-                closes = [k["close"] for k in kline_data]
-                if len(closes) >= 5:
-                    result["ma5"] = round(sum(closes[-5:]) / 5, 2)
-                if len(closes) >= 10:
-                    result["ma10"] = round(sum(closes[-10:]) / 10, 2)
-                if len(closes) >= 20:
-                    result["ma20"] = round(sum(closes[-20:]) / 20, 2)
-                if len(closes) >= 60:
-                    result["ma60"] = round(sum(closes[-60:]) / 60, 2)
-        except Exception as e:
-            print(f"计算均线失败: {e}")
+        size = max(int(chunk_size or self.FUNDAMENTALS_CHUNK_SIZE), 1)
+        keys = list(secids)
+        chunks = [keys[i:i + size] for i in range(0, len(keys), size)]
+        tasks = {i: (lambda chunk=chunk: self._fetch_fundamentals_chunk(chunk)) for i, chunk in enumerate(chunks)}
+        results, errors = gather(tasks, executor="detail", max_workers=self.DETAIL_MAX_WORKERS)
+        if errors:
+            print(f"批量获取基本面数据部分失败: {len(errors)}/{len(chunks)} 批")
         
-        # 获取北向资金数据
-        try:
-            result["north_flow"] = self._get_north_flow(code)
-        except Exception as e:
-            print(f"获取北向资金失败: {e}")
+        result = {}
+        for i in range(len(chunks)):
+            for secid, row in results.get(i, {}).items():
+                if secid in secids:
+                    result[secids[secid]] = row
+        return result
+    
+    def _fetch_fundamentals_chunk(self, secids: List[str]) -> Dict[str, dict]:
+        """
+        请求并解析一批基本面数据（请求失败时抛出异常）
         
-        # 获取融资融券数据
-        try:
-            result["margin_balance"] = self._get_margin_data(code)
-        except Exception as e:
-            print(f"获取融资融券失败: {e}")
+        Args:
+            secids: 东方财富证券代码列表（如 1.600000）
+            
+        Returns:
+            {secid: {...}}
+        """
+        # fltt=2 时数值已是实际值（无需除以 100），缺失为 "-"
+        # f2: 最新价, f3: 涨跌幅, f7: 振幅, f8: 换手率, f9: PE(动), f10: 量比,
+        # f20: 总市值, f21: 流通市值, f23: PB, f100: 所属行业, f115: PE(TTM)
+        url = (
+            "https://push2.eastmoney.com/api/qt/ulist.np/get?fltt=2&invt=2"
+            f"&secids={','.join(secids)}"
+            "&fields=f2,f3,f7,f8,f9,f10,f12,f13,f14,f20,f21,f23,f100,f115"
+        )
+        resp = self.http.get(url, endpoint="em_list", headers=self.eastmoney_headers)
+        resp.raise_for_status()
+        data = resp.json().get("data") or {}
         
-        return {"status": "success", "data": result}
+        diff = data.get("diff") or []
+        if isinstance(diff, dict):
+            diff = list(diff.values())
+        
+        def value(d, key):
+            v = d.get(key)
+            return None if v in (None, "-", "") else v
+        
+        result = {}
+        for d in diff:
+            pe = value(d, "f115")
+            if pe is None:
+                pe = value(d, "f9")
+            result[f"{d.get('f13')}.{d.get('f12')}"] = {
+                "name": d.get("f14"),
+                "industry": value(d, "f100"),
+                "price": value(d, "f2"),
+                "change_percent": value(d, "f3"),
+                "turnover_rate": value(d, "f8"),
+                "volume_ratio": value(d, "f10"),
+                "amplitude": value(d, "f7"),
+                "pe_ratio": pe,
+                "pb_ratio": value(d, "f23"),
+                "total_mv": value(d, "f20"),
+                "circ_mv": value(d, "f21"),
+            }
+        return result
+    
+    def _get_extra_indicators(self, code: str) -> Dict:
+        """计算均线和技术指标（多取一些K线，让 EMA 类指标充分收敛）"""
+        result = {}
+        source = self.kline_store.get_kline_data if self.kline_store is not None else self.get_kline_data
+        kline_result = source(code, "day", INDICATOR_BARS)
+        kline_data = kline_result.get("data", [])
+        if kline_data:
+            values = indicators.latest(indicators.ohlcv(kline_data))
+            for n in (5, 10, 20, 60):
+                result[f"ma{n}"] = values[f"ma{n}"]
+            if values["dif"] is not None:
+                result["macd"] = {"dif": values["dif"], "dea": values["dea"], "macd": values["macd"]}
+            if values["rsi6"] is not None:
+                result["rsi"] = {"rsi6": values["rsi6"], "rsi14": values["rsi14"]}
+            if values["k"] is not None:
+                result["kdj"] = {"k": values["k"], "d": values["d"], "j": values["j"]}
+            if values["boll_mid"] is not None:
+                result["boll"] = {
+                    "mid": values["boll_mid"],
+                    "upper": values["boll_upper"],
+                    "lower": values["boll_lower"],
+                }
+            result["atr"] = values["atr"]
+        return result
     
     def _get_north_flow(self, code: str) -> Optional[List[Dict]]:
         """获取北向资金流入数据（最近5天）"""
@@ -433,12 +649,7 @@ class StockDataFetcher:
         try:
             url = f"https://push2his.eastmoney.com/api/qt/stock/fflow/daykline/get?secid={market}.{stock_code}&fields1=f1,f2,f3&fields2=f51,f52,f53,f54,f55,f56&klt=101&lmt=5"
             
-            resp = requests.get(
-                url, 
-                headers=self.eastmoney_headers, 
-                timeout=10, 
-                proxies={"http": None, "https": None}
-            )
+            resp = self.http.get(url, endpoint="em_history", headers=self.eastmoney_headers)
             data = resp.json()
             
             if data.get("data") and data["data"].get("klines"):
@@ -463,12 +674,7 @@ class StockDataFetcher:
         try:
             url = f"https://datacenter-web.eastmoney.com/api/data/v1/get?reportName=RPTA_WEB_RZRQ_GGMX&columns=ALL&filter=(SCODE%3D%22{stock_code}%22)&pageNumber=1&pageSize=5&sortTypes=-1&sortColumns=TRADE_DATE"
             
-            resp = requests.get(
-                url, 
-                headers=self.eastmoney_headers, 
-                timeout=10, 
-                proxies={"http": None, "https": None}
-            )
+            resp = self.http.get(url, endpoint="em_datacenter", headers=self.eastmoney_headers)
             data = resp.json()
             
             if data.get("result") and data["result"].get("data"):
@@ -502,12 +708,7 @@ class StockDataFetcher:
         try:
             url = f"https://datacenter-web.eastmoney.com/api/data/v1/get?reportName=RPT_DAILYBILLBOARD_DETAILSNEW&columns=ALL&filter=(SECURITY_CODE%3D%22{stock_code}%22)&pageNumber=1&pageSize=5&sortTypes=-1&sortColumns=TRADE_DATE"
             
-            resp = requests.get(
-                url, 
-                headers=self.eastmoney_headers, 
-                timeout=10, 
-                proxies={"http": None, "https": None}
-            )
+            resp = self.http.get(url, endpoint="em_datacenter", headers=self.eastmoney_headers)
             data = resp.json()
             
             if data.get("result") and data["result"].get("data"):
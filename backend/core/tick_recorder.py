@@ -0,0 +1,295 @@
+"""
+盘中逐笔快照记录模块
+
+本文件负责保存每个监控节拍的实时行情，供图表、模拟交易和 AI 分析直接读取本地盘中历史：
+1. 每只股票一个固定容量的环形缓冲区（结构化数组：时间戳、价格、累计成交量、累计成交额）
+2. 只在价格或成交量变化时记录，午休和停牌不占用容量
+3. 交易时段内每 flush_interval 秒、收盘后、跨日、移除股票和停止监控时写入按日存放的二进制文件
+4. 重启后首次记录某只股票时，从当日文件恢复已记录的数据（崩溃最多丢失一个写入间隔）
+
+目录结构：
+    {data_dir}/ticks/{YYYYMMDD}/{code}.npy
+
+内存占用：每只股票 capacity * TICK_DTYPE.itemsize 字节（默认 4096 * 24 ≈ 96KB），按需分配
+"""
+
+import os
+import time
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .quote_store import QuoteStore
+
+
+TICK_DTYPE = np.dtype([
+    ("ts", "i4"),           # Unix 时间戳（秒）
+    ("price", "f4"),
+    ("volume", "i8"),       # 当日累计成交量
+    ("amount", "f8"),       # 当日累计成交额
+])
+
+# 每只股票的环形缓冲区容量（5 秒节拍约 2900 条/日）
+TICK_CAPACITY = 4096
+# 收盘时间（之后的第一次 flush 写入当日文件）
+CLOSE_HOUR = 15
+# 盘中定期写入日文件的间隔（秒）
+FLUSH_INTERVAL = 300
+
+
+class TickRing:
+    """单只股票的固定容量环形缓冲区"""
+
+    __slots__ = ("buf", "head", "count", "dirty")
+
+    def __init__(self, capacity: int):
+        self.buf = np.zeros(capacity, dtype=TICK_DTYPE)
+        self.head = 0       # 下一个写入位置
+        self.count = 0
+        self.dirty = False
+
+    def append(self, ts: int, price: float, volume: int, amount: float):
+        """追加一条记录（满时覆盖最早的记录）"""
+        self.buf[self.head] = (ts, price, volume, amount)
+        self.head = (self.head + 1) % len(self.buf)
+        self.count = min(self.count + 1, len(self.buf))
+        self.dirty = True
+
+    def extend(self, ticks: np.ndarray):
+        """批量追加（用于从文件恢复）"""
+        ticks = ticks[-len(self.buf):]
+        n = len(ticks)
+        self.buf[:n] = ticks
+        self.head = n % len(self.buf)
+        self.count = n
+
+    def last(self) -> Optional[np.void]:
+        """最后一条记录"""
+        if not self.count:
+            return None
+        return self.buf[self.head - 1]
+
+    def to_array(self) -> np.ndarray:
+        """按时间顺序复制全部记录"""
+        if self.count < len(self.buf):
+            return self.buf[:self.count].copy()
+        return np.concatenate([self.buf[self.head:], self.buf[:self.head]])
+
+
+class TickRecorder:
+    """
+    盘中逐笔快照记录器
+
+    record() 在监控节拍中调用；flush() 由调度任务定期调用，盘中按间隔、收盘后写入日文件
+    """
+
+    def __init__(self, root_dir: Path, capacity: int = TICK_CAPACITY, flush_interval: float = FLUSH_INTERVAL):
+        """
+        初始化记录器
+
+        Args:
+            root_dir: 日文件根目录
+            capacity: 每只股票的环形缓冲区容量
+            flush_interval: 盘中定期写入日文件的间隔（秒）
+        """
+        self.root_dir = root_dir
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self._rings: Dict[str, TickRing] = {}
+        self._lock = threading.Lock()
+        self._date = datetime.now().strftime("%Y%m%d")
+        self._flushed_date = ""
+        self._last_flush = time.monotonic()
+
+    # ========== 文件 ==========
+
+    def _path(self, date: str, code: str) -> Path:
+        return self.root_dir / date / f"{code}.npy"
+
+    def _write(self, date: str, code: str, ticks: np.ndarray):
+        """原子写入日文件"""
+        path = self._path(date, code)
+        tmp = path.with_suffix(".tmp.npy")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.save(tmp, ticks)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"写入盘中数据失败 {path}: {e}")
+
+    def _read(self, date: str, code: str) -> np.ndarray:
+        """读取日文件（不存在时返回空数组）"""
+        path = self._path(date, code)
+        if not path.exists():
+            return np.empty(0, dtype=TICK_DTYPE)
+        try:
+            return np.load(path, mmap_mode="r")
+        except Exception as e:
+            print(f"读取盘中数据失败 {path}: {e}")
+            return np.empty(0, dtype=TICK_DTYPE)
+
+    # ========== 记录 ==========
+
+    def _ring_for(self, code: str) -> TickRing:
+        """获取股票的环形缓冲区（首次使用时从当日文件恢复）"""
+        ring = self._rings.get(code)
+        if ring is None:
+            ring = self._rings[code] = TickRing(self.capacity)
+            saved = self._read(self._date, code)
+            if len(saved):
+                ring.extend(np.array(saved))
+        return ring
+
+    def _roll_day(self, today: str):
+        """跨日：写出前一交易日的数据并清空缓冲区"""
+        self._flush_locked(self._date)
+        self._rings.clear()
+        self._date = today
+
+    def record(self, store: QuoteStore, rows: np.ndarray):
+        """
+        记录一个节拍的行情（价格和成交量都未变化的股票跳过）
+
+        Args:
+            store: 实时行情快照
+            rows: 本次更新的行号
+        """
+        if not len(rows):
+            return
+        now = datetime.now()
+        ts = int(now.timestamp())
+        today = now.strftime("%Y%m%d")
+        price = store.price[rows].tolist()
+        volume = store.volume[rows].tolist()
+        amount = store.amount[rows].tolist()
+        with self._lock:
+            if today != self._date:
+                self._roll_day(today)
+            for i, row in enumerate(rows.tolist()):
+                if not price[i] > 0:
+                    continue
+                ring = self._ring_for(store.codes[row])
+                last = ring.last()
+                if last is not None and last["volume"] == volume[i] and last["price"] == np.float32(price[i]):
+                    continue
+                ring.append(ts, price[i], volume[i], amount[i])
+
+    def remove(self, code: str):
+        """移除股票的内存缓冲区（未写出的数据先写入日文件，日文件保留）"""
+        with self._lock:
+            ring = self._rings.pop(code, None)
+            if ring is not None and ring.dirty and ring.count:
+                self._write(self._date, code, ring.to_array())
+
+    # ========== 落盘 ==========
+
+    def _flush_locked(self, date: str) -> int:
+        """写出有变化的缓冲区，返回写入的文件数"""
+        written = 0
+        for code, ring in self._rings.items():
+            if ring.dirty and ring.count:
+                self._write(date, code, ring.to_array())
+                ring.dirty = False
+                written += 1
+        return written
+
+    def flush(self, force: bool = False) -> int:
+        """
+        写入当日文件（只写有变化的缓冲区）
+
+        Args:
+            force: 是否立即写入（默认盘中每 flush_interval 秒写入一次，收盘后再写入一次）
+
+        Returns:
+            写入的文件数
+        """
+        now = datetime.now()
+        with self._lock:
+            if not force:
+                if now.hour >= CLOSE_HOUR:
+                    if self._flushed_date == self._date:
+                        return 0
+                    self._flushed_date = self._date
+                elif time.monotonic() - self._last_flush < self.flush_interval:
+                    return 0
+            self._last_flush = time.monotonic()
+            return self._flush_locked(self._date)
+
+    # ========== 读取 ==========
+
+    def get_ticks(self, code: str, date: Optional[str] = None) -> np.ndarray:
+        """
+        获取盘中记录
+
+        Args:
+            code: 股票代码（已规范化）
+            date: 日期 YYYYMMDD（默认当日，优先读内存缓冲区）
+
+        Returns:
+            结构化数组（TICK_DTYPE），按时间正序
+        """
+        with self._lock:
+            if date is None or date == self._date:
+                ring = self._rings.get(code)
+                if ring is not None:
+                    return ring.to_array()
+                date = self._date
+        return np.array(self._read(date, code))
+
+    @staticmethod
+    def to_minutes(ticks: np.ndarray) -> List[dict]:
+        """
+        聚合为分钟线
+
+        Returns:
+            [{"time": "HH:MM", "open", "close", "high", "low", "volume", "avg_price"}, ...]
+            volume 为该分钟的成交量增量，avg_price 为截至该分钟的成交均价
+        """
+        if not len(ticks):
+            return []
+        minutes = ticks["ts"].astype(np.int64) // 60
+        starts = np.flatnonzero(np.r_[True, minutes[1:] != minutes[:-1]])
+        ends = np.r_[starts[1:], len(ticks)] - 1
+        price = ticks["price"].astype(np.float64)
+        volume = ticks["volume"]
+        amount = ticks["amount"]
+
+        high = np.maximum.reduceat(price, starts)
+        low = np.minimum.reduceat(price, starts)
+        end_volume = volume[ends]
+        start_volume = np.r_[volume[starts[0]], end_volume[:-1]]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg_price = np.where(end_volume > 0, amount[ends] / end_volume, np.nan)
+
+        return [
+            {
+                "time": datetime.fromtimestamp(int(m) * 60).strftime("%H:%M"),
+                "open": round(float(price[s]), 3),
+                "close": round(float(price[e]), 3),
+                "high": round(float(h), 3),
+                "low": round(float(l), 3),
+                "volume": int(ev - sv),
+                "avg_price": None if np.isnan(a) else round(float(a), 3),
+            }
+            for m, s, e, h, l, ev, sv, a in zip(
+                minutes[starts].tolist(), starts.tolist(), ends.tolist(), high, low,
+                end_volume.tolist(), start_volume.tolist(), avg_price
+            )
+        ]
+
+    def get_stats(self) -> Dict:
+        """
+        获取记录器状态
+
+        Returns:
+            {symbols, ticks, memory_bytes}
+        """
+        with self._lock:
+            return {
+                "symbols": len(self._rings),
+                "ticks": sum(r.count for r in self._rings.values()),
+                "memory_bytes": len(self._rings) * self.capacity * TICK_DTYPE.itemsize,
+            }
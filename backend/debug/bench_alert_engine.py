@@ -0,0 +1,70 @@
+"""
+预警引擎基准测试
+
+对比逐只调用 AlertManager.check_alerts 与批量向量化 check_alerts_batch 的耗时。
+预警全部设置为不会触发的阈值，只测量判断本身的开销（不含推送）。
+
+运行方式（在 backend 目录下）：
+    python debug/bench_alert_engine.py [股票数量]
+"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.quote_store import QuoteStore  # noqa: E402
+from core.stock_data import StockDataFetcher  # noqa: E402
+from domain.alert_manager import AlertManager  # noqa: E402
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rounds = 20
+
+    quotes = {}
+    for i in range(count):
+        code = f"sh{600000 + i}"
+        price = 10 + (i % 100) / 10
+        quotes[code] = {
+            "code": code, "name": code, "price": price, "pre_close": price * 0.99,
+            "open": price, "high": price, "low": price, "volume": 1000, "amount": 10000.0,
+            "change_percent": 1.0, "time": "10:00:00",
+        }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = AlertManager(Path(tmp) / "alerts.json", {"alert_cooldown": 300})
+        manager.alerts = {
+            code: {"take_profit": 999, "stop_loss": 0.01, "change_alert": 50, "enabled": True}
+            for code in quotes
+        }
+        manager.alerts_version += 1
+
+        store = QuoteStore()
+        rows = store.update_many(quotes)
+        formatted = {code: StockDataFetcher.format_quote(q) for code, q in quotes.items()}
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for code, data in formatted.items():
+                manager.check_alerts(code, data)
+        loop_cost = (time.perf_counter() - start) / rounds
+
+        manager.check_alerts_batch(store, rows)  # 首次编译
+        start = time.perf_counter()
+        for _ in range(rounds):
+            manager.check_alerts_batch(store, rows)
+        batch_cost = (time.perf_counter() - start) / rounds
+
+    print("--- Alert Engine Benchmark ---")
+    print(f"股票数量: {count}")
+    print(f"逐只 check_alerts:       {loop_cost * 1e6:,.0f} µs/节拍")
+    print(f"批量 check_alerts_batch: {batch_cost * 1e6:,.0f} µs/节拍")
+    print(f"提升: {loop_cost / batch_cost:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
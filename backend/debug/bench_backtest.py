@@ -0,0 +1,83 @@
+"""
+策略回测引擎基准测试
+
+在临时目录中为 N 只股票生成 M 根随机游走日线（写入 KlineStore 的 .npy 格式），
+分别测量读取对齐、信号计算和逐日撮合的耗时。
+
+运行方式（在 backend 目录下）：
+    python debug/bench_backtest.py [股票数量] [K线条数]
+"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.kline_store import KlineStore, KLINE_DTYPE  # noqa: E402
+from domain.backtest_engine import BacktestEngine, STRATEGIES, simulate  # noqa: E402
+
+
+def make_bars(rng: np.random.Generator, dates: np.ndarray) -> np.ndarray:
+    """生成一只股票的随机游走日线（随机截掉上市前的一段）"""
+    start = int(rng.integers(0, len(dates) // 4))
+    n = len(dates) - start
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.005, n))
+    bars = np.empty(n, dtype=KLINE_DTYPE)
+    bars["date"] = dates[start:]
+    bars["open"] = open_
+    bars["close"] = close
+    bars["high"] = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, n)))
+    bars["low"] = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, n)))
+    bars["volume"] = rng.integers(1e5, 1e7, n)
+    return bars
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 2500
+
+    rng = np.random.default_rng(0)
+    business = np.arange(np.datetime64("2014-01-01"), np.datetime64("2026-01-01"))
+    business = business[np.is_busday(business)][:days]
+    dates = np.array([int(str(d).replace("-", "")) for d in business], dtype=np.int32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        codes = [f"sh{600000 + i}" for i in range(count)]
+        for code in codes:
+            path = root / "day" / f"{code}.npy"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            np.save(path, make_bars(rng, dates))
+
+        engine = BacktestEngine(KlineStore(root, lambda *args: {"status": "error"}))
+
+        start = time.perf_counter()
+        panel, _ = engine.load_panel(codes, days)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{count} 只股票 x {days} 根日线")
+        print(f"读取对齐: {load_ms:.0f} ms")
+        for name, (func, defaults) in STRATEGIES.items():
+            start = time.perf_counter()
+            entries, exits = func(panel, **defaults)
+            signal_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            result = simulate(panel, entries, exits, 100000, take_profit_pct=20, stop_loss_pct=8)
+            sim_ms = (time.perf_counter() - start) * 1000
+            print(f"{name:10s} 信号: {signal_ms:6.0f} ms  撮合: {sim_ms:6.0f} ms  "
+                  f"成交: {int(result['trades'].sum())}")
+
+        start = time.perf_counter()
+        report = engine.run(codes, "ma_cross", count=days, stop_loss_pct=8)
+        total_ms = (time.perf_counter() - start) * 1000
+        print(f"完整回测（含读取和汇总）: {total_ms:.0f} ms，组合收益率 {report['summary']['profit_rate']}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+HTTP 连接池基准测试
+
+对比「每次新建连接的 requests.get」与「共享连接池的 HttpClient」的吞吐量。
+使用本地 HTTP 桩服务器（HTTP/1.1 keep-alive），返回模拟的新浪行情文本。
+
+运行方式（在 backend 目录下）：
+    python debug/bench_http_session.py [请求数]
+
+说明：本地桩服务器不走 TLS，真实环境中 HTTPS 接口（东方财富、sina.cn）
+每次新建连接还需额外的 TLS 握手，连接复用的收益会更明显。
+"""
+
+import os
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.http_client import HttpClient  # noqa: E402
+
+BODY = (
+    'var hq_str_sh600519="贵州茅台,1700.000,1695.000,1710.500,1715.000,1690.000,'
+    '1710.000,1710.500,1234567,2100000000.000' + ',0' * 20 + ',2025-01-02,15:00:00,00";\n'
+).encode("gbk")
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """模拟行情接口的桩服务器"""
+
+    protocol_version = "HTTP/1.1"
+    # 头部和正文分两次写出，关闭 Nagle 避免 keep-alive 下的延迟确认等待
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=gbk")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_bench(label: str, fetch, url: str, count: int) -> float:
+    """执行 count 次请求，返回每秒请求数"""
+    start = time.perf_counter()
+    for _ in range(count):
+        resp = fetch(url)
+        resp.content
+    elapsed = time.perf_counter() - start
+    rps = count / elapsed
+    print(f"{label:<32} {count} 次请求, 耗时 {elapsed:.3f}s, {rps:,.0f} req/s")
+    return rps
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/list=sh600519"
+
+    print("--- HTTP Session Benchmark ---")
+    before = run_bench(
+        "requests.get（无连接复用）",
+        lambda u: requests.get(u, timeout=5, proxies={"http": None, "https": None}),
+        url,
+        count,
+    )
+
+    client = HttpClient()
+    after = run_bench(
+        "HttpClient（连接池 keep-alive）",
+        lambda u: client.get(u, endpoint="sina_quote"),
+        url,
+        count,
+    )
+    client.close()
+
+    print(f"\n提升: {after / before:.2f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+技术指标基准测试
+
+对比原 get_stock_extra_data / format_data_for_prompt 中的逐只 Python 循环
+（sum(closes[-n:]) 计算 MA5/10/20/60、列表推导计算平均成交量）
+与 core.indicators 的批量计算（一次计算全部股票的全部指标）。
+
+运行方式（在 backend 目录下）：
+    python debug/bench_indicators.py [股票数量]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import indicators  # noqa: E402
+
+
+def legacy(kline_data):
+    """原实现：均线 + 平均成交量"""
+    result = {}
+    closes = [k["close"] for k in kline_data]
+    for n in (5, 10, 20, 60):
+        if len(closes) >= n:
+            result[f"ma{n}"] = round(sum(closes[-n:]) / n, 2)
+    volumes = [k["volume"] for k in kline_data[-30:] if k.get("volume")]
+    result["avg_volume"] = sum(volumes) / len(volumes) if volumes else 0
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    bars = 120
+    rng = np.random.default_rng(0)
+
+    klines = []
+    for _ in range(count):
+        close = 10 + np.cumsum(rng.normal(0, 0.2, bars))
+        klines.append([
+            {"date": "", "open": c, "close": c, "high": c + 0.1, "low": c - 0.1, "volume": 1000 + i}
+            for i, c in enumerate(close.tolist())
+        ])
+
+    start = time.perf_counter()
+    for kline_data in klines:
+        legacy(kline_data)
+    legacy_ms = (time.perf_counter() - start) * 1000
+
+    # 单只接口路径：字典列表 → 数组 → 全部指标最新值（get_stock_extra_data 的实际用法）
+    start = time.perf_counter()
+    for kline_data in klines[:50]:
+        indicators.latest(indicators.ohlcv(kline_data))
+    latest_ms = (time.perf_counter() - start) * 1000 / 50
+
+    # 批量路径：数组已就绪（如 KlineStore 的 .npy 文件），一次计算全部股票
+    series = [indicators.ohlcv(k) for k in klines]
+    batch = {f: indicators.stack([s[f] for s in series]) for f in indicators.OHLCV_FIELDS}
+
+    start = time.perf_counter()
+    ma_only = {n: indicators.sma(batch["close"], n)[:, -1] for n in (5, 10, 20, 60)}
+    ma_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    indicators.compute_all(batch)
+    all_ms = (time.perf_counter() - start) * 1000
+
+    state = indicators.IndicatorState(series[0])
+    start = time.perf_counter()
+    for _ in range(1000):
+        state.update(10.0, 10.1, 9.9, 10.0, 1000.0)
+    update_us = (time.perf_counter() - start) * 1000
+
+    assert np.isclose(ma_only[20][0], legacy(klines[0])["ma20"], atol=0.005)
+    print(f"股票数量: {count}, 每只 {bars} 根K线")
+    print(f"原逐只循环（MA5/10/20/60 + 平均成交量）: {legacy_ms:.2f} ms")
+    print(f"单只全部指标最新值（含字典转换）: {latest_ms:.3f} ms/只")
+    print(f"批量 MA5/10/20/60（数组输入）: {ma_ms:.2f} ms")
+    print(f"批量全部指标（MA/EMA/MACD/RSI/KDJ/BOLL/ATR/OBV/VWAP，数组输入）: {all_ms:.2f} ms")
+    print(f"增量更新每根新K线: {update_us:.2f} us")
+
+if __name__ == "__main__":
+    main()
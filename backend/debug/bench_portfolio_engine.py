@@ -0,0 +1,65 @@
+"""
+组合盈亏引擎基准测试
+
+构造 N 只持仓和对应的实时行情，测量每个节拍的向量化重估耗时
+（不含编译：台账和行情行结构不变时只做数组运算）。
+
+运行方式（在 backend 目录下）：
+    python debug/bench_portfolio_engine.py [持仓数量]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.quote_store import QuoteStore  # noqa: E402
+from domain.position_ledger import PositionLedger  # noqa: E402
+from domain.portfolio_engine import PortfolioEngine  # noqa: E402
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rounds = 1000
+
+    records = []
+    quotes = {}
+    groups = {}
+    for i in range(count):
+        code = f"sh{600000 + i}"
+        price = 10 + (i % 100) / 10
+        records.append({
+            "stock_code": code, "type": "B", "price": price, "quantity": 100 * (1 + i % 10),
+            "trade_time": "2024-01-02 10:00",
+        })
+        quotes[code] = {
+            "name": code, "price": price * 1.01, "pre_close": price, "open": price,
+            "high": price, "low": price, "volume": 1000, "amount": 10000.0, "time": "10:00:00",
+        }
+        groups[code] = f"分组{i % 8}"
+
+    ledger = PositionLedger(lambda key: [])
+    ledger.rebuild(records)
+    store = QuoteStore()
+    store.update_many(quotes)
+    engine = PortfolioEngine(ledger)
+
+    start = time.perf_counter()
+    engine.revalue(store, groups)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        store.tick += 1
+        engine.revalue(store, groups)
+    tick_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    print(f"持仓数量: {count}")
+    print(f"首次编译 + 重估: {compile_ms:.3f} ms")
+    print(f"每节拍重估: {tick_ms:.3f} ms")
+    print(f"汇总: {engine.summary}")
+
+
+if __name__ == "__main__":
+    main()
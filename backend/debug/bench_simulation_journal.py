@@ -0,0 +1,107 @@
+"""
+模拟会话存储基准测试
+
+对比旧版全量 JSON 重写与追加写日志：
+1. 单次交易的写入耗时（旧版每次交易重写整个 simulations.json）
+2. 启动加载耗时（旧版 JSON 全量解析 vs 快照 + 日志重放）
+   两边都计入解析、构建会话字典和重建二级索引，不计日志后台线程的启动
+
+运行方式（在 backend 目录下）：
+    python debug/bench_simulation_journal.py [会话数量]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from domain.simulation_manager import SimulationManager  # noqa: E402
+from repositories.simulation_journal import SimulationJournal  # noqa: E402
+
+
+def make_kline(days: int):
+    return [
+        {"date": f"2024-{1 + i // 28:02d}-{1 + i % 28:02d}", "open": 10.0, "close": 10.0,
+         "high": 10.0, "low": 10.0, "volume": 1000}
+        for i in range(days)
+    ]
+
+
+def build_state(sessions):
+    """按 SimulationManager 的加载方式构建会话字典和二级索引"""
+    manager = SimulationManager.__new__(SimulationManager)
+    manager.sessions = {s["id"]: s for s in sessions}
+    manager._rebuild_indexes()
+    return manager
+
+
+def load_legacy(path: Path):
+    """旧版加载：全量解析 simulations.json"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return build_state(json.load(f).get("sessions", []))
+
+
+def load_journal(data_dir: Path):
+    """新版加载：快照 + 日志重放"""
+    journal = SimulationJournal(data_dir)
+    manager = build_state(journal.load())
+    return manager, journal.get_stats()["journal_events"]
+
+
+def best_ms(func, repeat: int = 3) -> float:
+    """多次运行取最短耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    trades = 200
+    kline = make_kline(51)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        manager = SimulationManager(data_dir)
+        ids = [
+            manager.create_session(f"sh{600000 + i}", "测试", 50, 100000.0, kline)["session"]["id"]
+            for i in range(count)
+        ]
+
+        # 追加写日志
+        start = time.perf_counter()
+        for i in range(trades):
+            manager.execute_trade(ids[i % count], "buy", 10.0, 100, "基准测试", "2024-01-02")
+        journal_ms = (time.perf_counter() - start) * 1000 / trades
+
+        # 旧版：每次交易重写整个 JSON（写到子目录，避免被新版当作待迁移文件）
+        legacy_file = data_dir / "legacy" / "simulations.json"
+        legacy_file.parent.mkdir()
+        start = time.perf_counter()
+        for _ in range(trades):
+            with open(legacy_file, 'w', encoding='utf-8') as f:
+                json.dump({'sessions': list(manager.sessions.values())}, f, ensure_ascii=False, indent=2)
+        legacy_ms = (time.perf_counter() - start) * 1000 / trades
+
+        manager.close()
+
+        # 启动加载（同样构建会话字典和索引）
+        legacy_load_ms = best_ms(lambda: load_legacy(legacy_file))
+        journal_load_ms = best_ms(lambda: load_journal(data_dir))
+        reloaded, replayed = load_journal(data_dir)
+        assert len(reloaded.sessions) == count
+
+        print(f"会话数量: {count}, 交易次数: {trades}")
+        print(f"单次交易写入  全量 JSON: {legacy_ms:.3f} ms  追加日志: {journal_ms:.3f} ms")
+        print(f"启动加载      全量 JSON: {legacy_load_ms:.1f} ms  快照 + 重放 {replayed} 个事件: {journal_load_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
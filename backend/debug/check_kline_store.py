@@ -0,0 +1,99 @@
+"""
+K线本地仓库增量合并检查
+
+用模拟上游检查 KlineStore 的尾部合并不会在文件中留下缺口：
+1. 本地落后的条数多于请求的 count 时，合并后的文件仍连续
+2. 本地落后的条数多于单次下载能返回的条数时，整体替换为下载结果
+
+运行方式（在 backend 目录下）：
+    python debug/check_kline_store.py
+"""
+
+import os
+import sys
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.kline_store import KlineStore  # noqa: E402
+
+
+class FakeUpstream:
+    """模拟上游：截至 end 的最近 count 根日K（可限制单次最多返回的条数）"""
+
+    def __init__(self, days: np.ndarray, max_bars: int = 10000):
+        self.days = days
+        self.end = len(days)
+        self.max_bars = max_bars
+
+    def __call__(self, code: str, period: str, count: int) -> dict:
+        count = min(count, self.max_bars, self.end)
+        days = self.days[self.end - count:self.end]
+        return {"status": "success", "data": [
+            {"date": str(d), "open": 1.0, "close": float(i), "high": 1.0, "low": 1.0, "volume": 100}
+            for i, d in enumerate(days.tolist(), self.end - count)
+        ]}
+
+
+def business_days(total: int) -> np.ndarray:
+    """截至今天（含）的 total 个工作日"""
+    today = np.datetime64(date.today().isoformat())
+    end = np.busday_offset(today, 0, roll="backward")
+    return np.busday_offset(end, np.arange(-total + 1, 1), roll="backward")
+
+
+def stored_dates(store: KlineStore, code: str) -> np.ndarray:
+    return store.read_local(code, "day", 100000)["date"]
+
+
+def assert_continuous(store: KlineStore, code: str, days: np.ndarray, expected: int):
+    dates = stored_dates(store, code)
+    want = np.array([int(str(d).replace("-", "")) for d in days[-expected:].tolist()])
+    assert len(dates) == expected, f"{code}: 期望 {expected} 根，实际 {len(dates)} 根"
+    assert np.array_equal(dates, want), f"{code}: 日期不连续"
+
+
+def check_stale_more_than_count(root: Path):
+    """本地 200 根，上游前进 100 根，以 count=60 请求"""
+    days = business_days(300)
+    upstream = FakeUpstream(days)
+    store = KlineStore(root, upstream)
+    store._is_fresh = lambda key, now: False
+
+    upstream.end = 200
+    store.get_kline_data("sh600000", "day", 200)
+    # 让本地最后一根K线落后于今天 100 个交易日
+    store.fetch = FakeUpstream(days)
+    result = store.get_kline_data("sh600000", "day", 60)
+    assert len(result["data"]) == 60
+    assert_continuous(store, "sh600000", days, 300)
+    print("本地落后多于 count：合并后 300 根，连续")
+
+
+def check_stale_beyond_upstream_limit(root: Path):
+    """上游单次最多返回 50 根，本地落后 100 根：整体替换"""
+    days = business_days(300)
+    store = KlineStore(root, FakeUpstream(days))
+    store._is_fresh = lambda key, now: False
+
+    store.fetch.end = 200
+    store.get_kline_data("sz000001", "day", 200)
+    store.fetch = FakeUpstream(days, max_bars=50)
+    store.get_kline_data("sz000001", "day", 30)
+    assert_continuous(store, "sz000001", days, 50)
+    print("本地落后多于单次下载上限：整体替换为 50 根，连续")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        check_stale_more_than_count(Path(tmp) / "a")
+        check_stale_beyond_upstream_limit(Path(tmp) / "b")
+    print("全部通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,37 @@
 - stock_monitor: 股票监控核心逻辑
 - stock_manager: 股票列表管理
 - alert_manager: 预警管理
+- alert_engine: 批量向量化预警计算
+- notification_dispatcher: 预警通知异步分发
 - records_manager: 交易记录管理
+- position_ledger: 增量持仓台账
+- portfolio_engine: 组合实时盈亏
 - simulation_manager: 模拟交易管理
+- backtest_engine: 多股票策略回测
+- backtest_optimizer: 策略参数优化（多进程、滚动前推）
+- backtest_worker: 参数优化工作进程入口（只依赖 backtest_engine 和 numpy）
 - notes_manager: 笔记管理
+
+导出的类按需导入：参数优化的工作进程导入 domain.backtest_worker 时，
+不会连带加载监控、AI 等模块
 """
 
-from .stock_monitor import StockMonitor
-from .records_manager import RecordsManager
-from .simulation_manager import SimulationManager
-from .notes_manager import NotesManager
+import importlib
+
+_EXPORTS = {
+    "StockMonitor": ".stock_monitor",
+    "RecordsManager": ".records_manager",
+    "SimulationManager": ".simulation_manager",
+    "NotesManager": ".notes_manager",
+}
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
+
 
 __all__ = [
     "StockMonitor",
@@ -0,0 +1,147 @@
+"""
+批量预警计算引擎
+
+本文件负责将预警配置编译为与行情快照（QuoteStore）行号对齐的阈值数组，
+每个监控节拍对所有股票做一次向量化判断：
+1. 止盈：price >= take_profit
+2. 止损：price <= stop_loss
+3. 异动：|change_percent| >= change_alert
+4. 冷却：距离上次触发未超过冷却时间的股票被屏蔽
+
+设计说明：
+- 预警配置或行情行结构（QuoteStore.version）变化时才重新编译
+- 引擎只负责判断，返回触发的行号和类型；消息生成与推送仍由 AlertManager 负责
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from core.quote_store import QuoteStore
+
+
+# 触发类型位标记
+TAKE_PROFIT = 1
+STOP_LOSS = 2
+CHANGE_ALERT = 4
+
+
+def _to_threshold(value) -> float:
+    """将预警阈值转换为 float，空值或 0 视为未设置（NaN）"""
+    if not value:
+        return np.nan
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    return value if value else np.nan
+
+
+class AlertEngine:
+    """
+    向量化预警引擎
+
+    维护与 QuoteStore 行号对齐的阈值数组和冷却时间数组
+    """
+
+    def __init__(self):
+        """初始化预警引擎"""
+        self._compiled_key: Optional[Tuple[int, int, int]] = None
+        self.take_profit = np.empty(0, dtype=np.float64)
+        self.stop_loss = np.empty(0, dtype=np.float64)
+        self.change_alert = np.empty(0, dtype=np.float64)
+        self.enabled = np.empty(0, dtype=bool)
+        self.last_triggered = np.empty(0, dtype=np.float64)
+
+    def compile(
+        self,
+        alerts: Dict[str, dict],
+        cooldowns: Dict[str, float],
+        store: QuoteStore,
+        alerts_version: int,
+    ):
+        """
+        编译预警配置为阈值数组（配置和行结构未变化时跳过）
+
+        Args:
+            alerts: 预警配置 {code: {take_profit, stop_loss, change_alert, enabled}}
+            cooldowns: 上次触发时间 {code: timestamp}
+            store: 行情快照
+            alerts_version: 预警配置版本号
+        """
+        key = (alerts_version, store.version, store.size)
+        if key == self._compiled_key:
+            return
+
+        size = store.size
+        take_profit = np.full(size, np.nan)
+        stop_loss = np.full(size, np.nan)
+        change_alert = np.full(size, np.nan)
+        enabled = np.zeros(size, dtype=bool)
+        last_triggered = np.full(size, -np.inf)
+
+        for code, config in alerts.items():
+            row = store.row_of(code)
+            if row is None:
+                continue
+            take_profit[row] = _to_threshold(config.get("take_profit"))
+            stop_loss[row] = _to_threshold(config.get("stop_loss"))
+            change_alert[row] = _to_threshold(config.get("change_alert"))
+            enabled[row] = bool(config.get("enabled", True))
+            if code in cooldowns:
+                last_triggered[row] = cooldowns[code]
+
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+        self.change_alert = change_alert
+        self.enabled = enabled
+        self.last_triggered = last_triggered
+        self._compiled_key = key
+
+    def evaluate(
+        self,
+        store: QuoteStore,
+        now: float,
+        cooldown: float,
+        rows: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        对一个节拍的行情做向量化预警判断
+
+        Args:
+            store: 行情快照（需先调用 compile）
+            now: 当前时间戳
+            cooldown: 冷却时间（秒）
+            rows: 本节拍更新的行号（None 表示全部行）
+
+        Returns:
+            (triggered_rows, flags)
+            - triggered_rows: 触发预警的行号数组
+            - flags: 对应的触发类型位标记（TAKE_PROFIT | STOP_LOSS | CHANGE_ALERT）
+        """
+        size = store.size
+        if size == 0 or len(self.enabled) != size:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        # 与字符串格式一致，按两位小数比较
+        price = np.round(store.column("price"), 2)
+        change = np.abs(np.round(store.change_percent(), 2))
+
+        active = self.enabled & (now - self.last_triggered >= cooldown) & ~np.isnan(price)
+        if rows is not None:
+            updated = np.zeros(size, dtype=bool)
+            # 更新后若有股票被删除，行号可能越界
+            updated[rows[rows < size]] = True
+            active &= updated
+
+        with np.errstate(invalid="ignore"):
+            flags = (
+                (price >= self.take_profit) * TAKE_PROFIT
+                | (price <= self.stop_loss) * STOP_LOSS
+                | (change >= self.change_alert) * CHANGE_ALERT
+            )
+        flags = np.where(active, flags, 0)
+
+        triggered_rows = np.flatnonzero(flags)
+        self.last_triggered[triggered_rows] = now
+        return triggered_rows, flags[triggered_rows]
@@ -3,18 +3,23 @@
 
 本文件负责股票预警功能：
 1. 预警配置的增删改查
-2. 预警触发检测
-3. 推送通知（PushPlus、钉钉）
+2. 预警触发检测（批量向量化检测 + 单只股票兼容接口）
+3. 推送通知（PushPlus、钉钉，经 NotificationDispatcher 异步发送）
 4. 预警冷却时间管理
 """
 
 import json
 import time
-import requests
 from typing import Dict, List, Optional
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
+
+from core.quote_store import QuoteStore
+from .alert_engine import AlertEngine, TAKE_PROFIT, STOP_LOSS, CHANGE_ALERT
+from .notification_dispatcher import NotificationDispatcher
+
 
 class AlertManager:
     """
@@ -23,6 +28,9 @@ class AlertManager:
     管理股票预警配置和触发逻辑
     """
     
+    # 待拉取预警列表的最大长度（无推送订阅者且长时间无人轮询时丢弃最早的）
+    MAX_PENDING_ALERTS = 100
+    
     def __init__(self, alerts_file: Path, settings: Dict):
         """
         初始化预警管理器
@@ -35,7 +43,14 @@ class AlertManager:
         self.settings = settings
         self.alerts: Dict[str, dict] = {}
         self.alert_cooldowns: Dict[str, float] = {}  # 预警冷却时间记录
-        self.triggered_alerts: List[dict] = []  # 已触发的预警
+        self.triggered_alerts: List[dict] = []  # 已触发且尚未送达前端的预警
+        self._next_alert_id = int(time.time() * 1000)  # 预警 ID（以启动时间起始，重启后不与旧 ID 重复）
+        self.alerts_version = 0  # 预警配置版本号，变化时批量引擎重新编译
+        self.engine = AlertEngine()
+        self.dispatcher = NotificationDispatcher(
+            lambda: self.settings,
+            alerts_file.parent / "notification_dead_letter.jsonl"
+        )
         self._load_data()
     
     def _load_data(self):
@@ -44,6 +59,7 @@ class AlertManager:
             try:
                 with open(self.alerts_file, 'r', encoding='utf-8') as f:
                     self.alerts = json.load(f)
+                    self.alerts_version += 1
                     print(f"已加载 {len(self.alerts)} 个预警配置")
             except Exception as e:
                 print(f"加载预警配置失败: {e}")
@@ -89,6 +105,7 @@ class AlertManager:
             "change_alert": alert_config.get("change_alert"),
             "enabled": alert_config.get("enabled", True),
         }
+        self.alerts_version += 1
         self._save_data()
         return {"status": "success", "message": f"已设置 {code} 的预警"}
     
@@ -104,6 +121,7 @@ class AlertManager:
         """
         if code in self.alerts:
             del self.alerts[code]
+            self.alerts_version += 1
             self._save_data()
             return {"status": "success", "message": f"已移除 {code} 的预警"}
         return {"status": "error", "message": "预警不存在"}
@@ -116,14 +134,67 @@ class AlertManager:
             {"status": "success", "alerts": [...]}
         """
         alerts = self.triggered_alerts.copy()
-        self.triggered_alerts.clear()
+        self.discard_pending(alerts)
         return {"status": "success", "alerts": alerts}
     
+    def discard_pending(self, alerts: List[dict]):
+        """
+        从待拉取列表中移除已送达的预警（已通过推送通道送达或已被轮询拉取）
+        
+        Args:
+            alerts: 已送达的预警信息列表
+        """
+        if not alerts:
+            return
+        delivered = {alert["id"] for alert in alerts}
+        self.triggered_alerts[:] = [a for a in self.triggered_alerts if a["id"] not in delivered]
+    
     # ========== 预警检测 ==========
     
+    def check_alerts_batch(self, store: QuoteStore, rows: Optional[np.ndarray] = None) -> List[dict]:
+        """
+        批量检查一个节拍的所有股票是否触发预警（向量化）
+        
+        Args:
+            store: 行情快照
+            rows: 本节拍更新的行号（None 表示全部）
+            
+        Returns:
+            本次触发的预警列表
+        """
+        if not self.alerts:
+            return []
+        
+        now = time.time()
+        cooldown = self.settings.get("alert_cooldown", 300)
+        self.engine.compile(self.alerts, self.alert_cooldowns, store, self.alerts_version)
+        triggered_rows, flags = self.engine.evaluate(store, now, cooldown, rows)
+        
+        triggered = []
+        for row, flag in zip(triggered_rows.tolist(), flags.tolist()):
+            code = store.codes[row]
+            alert_config = self.alerts.get(code, {})
+            price = round(float(store.price[row]), 2)
+            pre_close = float(store.pre_close[row])
+            change = round((price - pre_close) / pre_close * 100, 2) if pre_close > 0 else 0.0
+            
+            messages = []
+            if flag & TAKE_PROFIT:
+                messages.append(f"🎯 止盈触发: 当前价 {price} >= 止盈价 {alert_config.get('take_profit')}")
+            if flag & STOP_LOSS:
+                messages.append(f"⚠️ 止损触发: 当前价 {price} <= 止损价 {alert_config.get('stop_loss')}")
+            if flag & CHANGE_ALERT:
+                direction = "涨" if change > 0 else "跌"
+                messages.append(f"📊 异动提醒: {direction}幅 {change}% >= {alert_config.get('change_alert')}%")
+            
+            triggered.append(self._record_trigger(code, store.names[row] or code, price, change, messages, now))
+        
+        self._send_notifications(triggered)
+        return triggered
+    
     def check_alerts(self, code: str, stock_data: dict):
         """
-        检查是否触发预警
+        检查单只股票是否触发预警（兼容接口，监控节拍使用 check_alerts_batch）
         
         Args:
             code: 股票代码
@@ -143,8 +214,8 @@ class AlertManager:
             if now - self.alert_cooldowns[code] < cooldown:
                 return
         
-        price = float(stock_data["price"])
-        change = float(stock_data["change_percent"])
+        price = round(float(stock_data["price"]), 2)
+        change = round(float(stock_data["change_percent"]), 2)
         triggered = []
         
         # 止盈检查
@@ -164,52 +235,56 @@ class AlertManager:
             triggered.append(f"📊 异动提醒: {direction}幅 {change}% >= {change_alert}%")
         
         if triggered:
-            self.alert_cooldowns[code] = now
-            alert_info = {
-                "code": code,
-                "name": stock_data.get("name", code),
-                "price": price,
-                "change": change,
-                "messages": triggered,
-                "time": datetime.now().strftime("%H:%M:%S"),
-            }
-            self.triggered_alerts.append(alert_info)
-            print(f"预警触发: {alert_info}")
-            self._send_notification(alert_info)
+            alert_info = self._record_trigger(code, stock_data.get("name", code), price, change, triggered, now)
+            self._send_notifications([alert_info])
+    
+    def _record_trigger(
+        self,
+        code: str,
+        name: str,
+        price: float,
+        change: float,
+        messages: List[str],
+        now: float
+    ) -> dict:
+        """
+        记录触发的预警：更新冷却时间、加入触发列表
+        
+        Returns:
+            预警信息
+        """
+        self.alert_cooldowns[code] = now
+        self._next_alert_id += 1
+        alert_info = {
+            "id": self._next_alert_id,
+            "code": code,
+            "name": name,
+            "price": price,
+            "change": change,
+            "messages": messages,
+            "time": datetime.now().strftime("%H:%M:%S"),
+        }
+        self.triggered_alerts.append(alert_info)
+        if len(self.triggered_alerts) > self.MAX_PENDING_ALERTS:
+            del self.triggered_alerts[:-self.MAX_PENDING_ALERTS]
+        print(f"预警触发: {alert_info}")
+        return alert_info
     
     # ========== 推送通知 ==========
     
-    def _send_notification(self, alert_info: dict):
+    def _send_notifications(self, alerts: List[dict]):
         """
-        发送推送通知
+        提交推送通知（异步发送，同一批预警合并为每个渠道一条消息）
         
         Args:
-            alert_info: 预警信息
+            alerts: 预警信息列表
         """
-        title = f"股票预警 - {alert_info['name']}"
-        content = "\n".join(alert_info["messages"])
-        content += f"\n当前价: {alert_info['price']} | 涨跌幅: {alert_info['change']}%"
-        
-        # PushPlus 推送
-        token = self.settings.get("pushplus_token")
-        if token:
-            try:
-                requests.post(
-                    "http://www.pushplus.plus/send",
-                    json={"token": token, "title": title, "content": content},
-                    timeout=5
-                )
-            except Exception as e:
-                print(f"PushPlus 推送失败: {e}")
-        
-        # 钉钉推送
-        webhook = self.settings.get("dingtalk_webhook")
-        if webhook:
-            try:
-                requests.post(
-                    webhook,
-                    json={"msgtype": "text", "text": {"content": f"{title}\n{content}"}},
-                    timeout=5
-                )
-            except Exception as e:
-                print(f"钉钉推送失败: {e}")
+        self.dispatcher.submit(alerts)
+    
+    def get_notification_status(self) -> Dict:
+        """获取推送通知分发状态"""
+        return {"status": "success", "notification": self.dispatcher.get_status()}
+    
+    def close(self):
+        """停止后台推送线程"""
+        self.dispatcher.stop()
@@ -0,0 +1,567 @@
+"""
+策略回测引擎
+
+本文件负责在本地K线仓库（KlineStore）的日线历史上，对多只股票同时回测规则策略：
+1. 入场/出场信号：均线交叉（ma_cross）、通道突破（breakout）、首日买入持有（hold）
+2. 止盈止损：按入场价百分比，或直接使用预警配置中的止盈价/止损价（与 AlertEngine 规则一致）
+3. 交易约束：收盘出信号、次日开盘成交；T+1（买入当日不能卖出）；按手（100 股）买入
+4. 费用：佣金（双边，最低 5 元）+ 印花税（卖出）
+5. 结果：每只股票和组合的收益率、胜率、最大回撤、交易次数、换手率、夏普比率，以及组合权益曲线
+
+设计说明：
+- 全部股票按日期对齐为 (股票数, 交易日数) 的二维数组，停牌/未上市的位置为 NaN
+- 信号一次性向量计算；撮合按交易日逐日推进，每一步对全部股票做向量运算
+- 每只股票独立使用 initial_capital 全仓交易，组合结果为各股票权益之和
+- 收益率、胜率、最大回撤的口径与模拟交易（SimulationManager.calculate_result）一致，见 result_metrics
+"""
+
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core import indicators
+from core.kline_store import KlineStore
+
+
+# 佣金费率（双边）、最低佣金、印花税率（卖出）
+COMMISSION_RATE = 0.00025
+MIN_COMMISSION = 5.0
+STAMP_TAX_RATE = 0.0005
+# 每手股数
+LOT_SIZE = 100
+# 默认回测K线条数（约 10 年日线）
+DEFAULT_BARS = 2500
+# 一年的交易日数（年化换手率用）
+TRADING_DAYS_PER_YEAR = 242
+
+
+def result_metrics(
+    initial_capital: float,
+    final_capital: float,
+    position_value: float,
+    win_count: int,
+    round_trips: int,
+    total_trades: int,
+    max_drawdown: float,
+) -> Dict:
+    """
+    统一的收益统计口径（模拟交易与回测共用）
+
+    Args:
+        initial_capital: 初始资金
+        final_capital: 最终资产（现金 + 持仓市值）
+        position_value: 期末持仓市值
+        win_count: 盈利的平仓次数（卖出价高于买入价）
+        round_trips: 平仓次数
+        total_trades: 成交笔数（买入 + 卖出）
+        max_drawdown: 最大回撤（%）
+
+    Returns:
+        {final_capital, profit_rate, win_rate, max_drawdown, total_trades, position_value}
+    """
+    profit_rate = (final_capital - initial_capital) / initial_capital * 100 if initial_capital else 0
+    win_rate = (win_count / round_trips * 100) if round_trips > 0 else 0
+    return {
+        "final_capital": round(final_capital, 2),
+        "profit_rate": round(profit_rate, 2),
+        "win_rate": round(win_rate, 2),
+        "max_drawdown": round(max_drawdown, 2),
+        "total_trades": total_trades,
+        "position_value": round(position_value, 2),
+    }
+
+
+def max_drawdown(equity: np.ndarray) -> np.ndarray:
+    """最大回撤（%），时间维为最后一维"""
+    peak = np.maximum.accumulate(equity, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = np.where(peak > 0, (peak - equity) / peak * 100, 0.0)
+    return drawdown.max(axis=-1)
+
+
+class Panel:
+    """按日期对齐的多股票日线数据"""
+
+    __slots__ = ("codes", "dates", "open", "high", "low", "close")
+
+    def __init__(self, codes: List[str], dates: np.ndarray, open_: np.ndarray,
+                 high: np.ndarray, low: np.ndarray, close: np.ndarray):
+        self.codes = codes
+        self.dates = dates      # YYYYMMDD 整数
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+
+    def slice(self, start: int, end: int) -> "Panel":
+        """按交易日区间切片（视图，不复制数据）"""
+        return Panel(self.codes, self.dates[start:end], self.open[:, start:end],
+                     self.high[:, start:end], self.low[:, start:end], self.close[:, start:end])
+
+    @property
+    def bar(self) -> np.ndarray:
+        """当日是否有K线（停牌、未上市为 False）"""
+        return np.isfinite(self.open) & (self.open > 0)
+
+    def filled_close(self) -> np.ndarray:
+        """停牌日沿用前一收盘价的收盘价"""
+        close = self.close
+        valid = np.isfinite(close)
+        index = np.where(valid, np.arange(close.shape[1]), 0)
+        np.maximum.accumulate(index, axis=1, out=index)
+        filled = np.take_along_axis(close, index, axis=1)
+        # 上市前没有可沿用的价格
+        return np.where(np.maximum.accumulate(valid, axis=1), filled, np.nan)
+
+
+def summarize(panel: Panel, result: Dict[str, np.ndarray], initial_capital: float) -> Dict:
+    """
+    组合（全部股票权益之和）的统计
+
+    Args:
+        panel: 回测使用的日线数据
+        result: simulate() 的返回值
+        initial_capital: 每只股票的初始资金
+
+    Returns:
+        result_metrics 的字段 + {initial_capital, symbols, days, start_date, end_date,
+        turnover, annual_turnover, sharpe}
+    """
+    equity = result["equity"].sum(axis=0)
+    position_value = result["shares"] * result["last_close"]
+    total_initial = initial_capital * len(panel.codes)
+    years = max(len(panel.dates) / TRADING_DAYS_PER_YEAR, 1e-9)
+    # 单边换手率：成交额 / 2 / 平均权益
+    turnover = float(result["traded_value"].sum() / 2 / equity.mean())
+    # 年化夏普比率（日收益率，无风险利率按 0）
+    returns = np.diff(equity) / equity[:-1]
+    std = returns.std() if len(returns) > 1 else 0.0
+    sharpe = float(returns.mean() / std * np.sqrt(TRADING_DAYS_PER_YEAR)) if std > 0 else 0.0
+
+    summary = result_metrics(
+        total_initial, float((result["cash"] + position_value).sum()), float(position_value.sum()),
+        int(result["wins"].sum()), int(result["round_trips"].sum()),
+        int(result["trades"].sum()), float(max_drawdown(equity)),
+    )
+    summary.update({
+        "initial_capital": round(total_initial, 2),
+        "symbols": len(panel.codes),
+        "days": len(panel.dates),
+        "start_date": _format_date(panel.dates[0]),
+        "end_date": _format_date(panel.dates[-1]),
+        "turnover": round(turnover, 2),
+        "annual_turnover": round(turnover / years, 2),
+        "sharpe": round(sharpe, 3),
+    })
+    return summary
+
+
+# ========== 策略信号 ==========
+# 信号在收盘时产生，下一交易日开盘成交；返回 (入场, 出场) 布尔数组
+
+def _shift(x: np.ndarray, fill=np.nan) -> np.ndarray:
+    """沿时间维后移一位（取前一交易日的值）"""
+    out = np.empty_like(x)
+    out[:, 0] = fill
+    out[:, 1:] = x[:, :-1]
+    return out
+
+
+def _crossed_above(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """a 上穿 b（前一日两者都有效时才算交叉）"""
+    with np.errstate(invalid="ignore"):
+        above = a > b
+    prev_a, prev_b = _shift(a), _shift(b)
+    with np.errstate(invalid="ignore"):
+        return above & (prev_a <= prev_b)
+
+
+def ma_cross_signals(panel: Panel, fast: int = 5, slow: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+    """均线交叉：快线上穿慢线买入，下穿卖出"""
+    close = panel.filled_close()
+    fast_ma = indicators.sma(close, int(fast))
+    slow_ma = indicators.sma(close, int(slow))
+    bar = panel.bar
+    return (
+        _crossed_above(fast_ma, slow_ma) & bar,
+        _crossed_above(slow_ma, fast_ma) & bar,
+    )
+
+
+def breakout_signals(panel: Panel, window: int = 20, exit_window: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+    """通道突破：收盘价突破前 window 日最高价买入，跌破前 exit_window 日最低价卖出"""
+    high = _shift(indicators.hhv(panel.high, int(window)))
+    low = _shift(indicators.llv(panel.low, int(exit_window)))
+    close = panel.close
+    bar = panel.bar
+    with np.errstate(invalid="ignore"):
+        return (close > high) & bar, (close < low) & bar
+
+
+def hold_signals(panel: Panel) -> Tuple[np.ndarray, np.ndarray]:
+    """首个交易日买入并持有（只由止盈止损出场，用于单独检验预警规则）"""
+    bar = panel.bar
+    return bar & (np.cumsum(bar, axis=1) == 1), np.zeros_like(bar)
+
+
+# 策略名 → (信号函数, 默认参数)
+STRATEGIES: Dict[str, Tuple[Callable, Dict]] = {
+    "ma_cross": (ma_cross_signals, {"fast": 5, "slow": 20}),
+    "breakout": (breakout_signals, {"window": 20, "exit_window": 10}),
+    "hold": (hold_signals, {}),
+}
+# 周期类参数（必须为不小于 1 的整数）
+PERIOD_PARAMS = ("fast", "slow", "window", "exit_window")
+
+
+def validate_params(strategy: str, params: Dict) -> Optional[str]:
+    """
+    检查策略参数
+
+    Args:
+        strategy: 策略名（须在 STRATEGIES 中）
+        params: 策略参数（未提供的使用默认值）
+
+    Returns:
+        错误信息，参数有效时返回 None
+    """
+    params = {**STRATEGIES[strategy][1], **params}
+    try:
+        periods = {name: int(params[name]) for name in PERIOD_PARAMS if name in params}
+    except (TypeError, ValueError, OverflowError):
+        return "周期参数必须为整数"
+    for name, value in periods.items():
+        if value < 1:
+            return f"参数 {name} 必须为不小于 1 的整数"
+    if "fast" in periods and "slow" in periods and periods["fast"] >= periods["slow"]:
+        return "参数 fast 必须小于 slow"
+    return None
+
+
+# ========== 撮合 ==========
+
+def simulate(
+    panel: Panel,
+    entries: np.ndarray,
+    exits: np.ndarray,
+    initial_capital: float,
+    take_profit_pct: Optional[float] = None,
+    stop_loss_pct: Optional[float] = None,
+    take_profit_price: Optional[np.ndarray] = None,
+    stop_loss_price: Optional[np.ndarray] = None,
+    commission_rate: float = COMMISSION_RATE,
+    min_commission: float = MIN_COMMISSION,
+    stamp_tax_rate: float = STAMP_TAX_RATE,
+) -> Dict[str, np.ndarray]:
+    """
+    逐日撮合（每一步对全部股票向量运算）
+
+    每个交易日：
+    1. 开盘：执行上一交易日收盘产生的信号（停牌时顺延到复牌）
+    2. 盘中：持仓（非当日买入）触及止损/止盈价时卖出，跳空时按开盘价成交；同时触及按止损处理
+    3. 收盘：按收盘价计算权益，生成次日委托
+
+    Args:
+        panel: 对齐后的日线数据
+        entries / exits: 入场、出场信号
+        initial_capital: 每只股票的初始资金
+        take_profit_pct / stop_loss_pct: 相对入场价的止盈/止损百分比
+        take_profit_price / stop_loss_price: 每只股票的止盈/止损价（NaN 表示未设置）
+
+    Returns:
+        {equity, cash, shares, last_close, trades, round_trips, wins, traded_value}
+    """
+    n, days = panel.open.shape
+    cash = np.full(n, float(initial_capital))
+    shares = np.zeros(n)
+    entry_price = np.full(n, np.nan)
+    entry_day = np.full(n, -1)
+    last_close = np.zeros(n)
+    pending_buy = np.zeros(n, dtype=bool)
+    pending_sell = np.zeros(n, dtype=bool)
+
+    trades = np.zeros(n, dtype=np.int64)
+    round_trips = np.zeros(n, dtype=np.int64)
+    wins = np.zeros(n, dtype=np.int64)
+    traded_value = np.zeros(n)
+    equity = np.empty((n, days))
+
+    tp_price = np.full(n, np.nan) if take_profit_price is None else take_profit_price
+    sl_price = np.full(n, np.nan) if stop_loss_price is None else stop_loss_price
+    tp_ratio = 1 + take_profit_pct / 100 if take_profit_pct else np.nan
+    sl_ratio = 1 - stop_loss_pct / 100 if stop_loss_pct else np.nan
+    check_stops = bool(take_profit_pct or stop_loss_pct
+                       or np.isfinite(tp_price).any() or np.isfinite(sl_price).any())
+
+    bars = panel.bar
+    opens = np.nan_to_num(panel.open)
+    highs = np.nan_to_num(panel.high)
+    lows = np.nan_to_num(panel.low)
+    closes = panel.close
+
+    def sell(mask: np.ndarray, price: np.ndarray):
+        value = shares[mask] * price
+        fee = np.maximum(value * commission_rate, min_commission) + value * stamp_tax_rate
+        cash[mask] += value - fee
+        traded_value[mask] += value
+        trades[mask] += 1
+        round_trips[mask] += 1
+        wins[mask] += price > entry_price[mask]
+        shares[mask] = 0
+        entry_price[mask] = np.nan
+
+    for t in range(days):
+        bar = bars[:, t]
+        price = opens[:, t]
+
+        # 1. 开盘执行委托
+        selling = pending_sell & bar & (shares > 0) & (entry_day < t)
+        if selling.any():
+            sell(selling, price[selling])
+
+        buying = pending_buy & bar & (shares == 0)
+        if buying.any():
+            p = price[buying]
+            c = cash[buying]
+            lots = np.floor(c / (p * (1 + commission_rate)) / LOT_SIZE)
+            value = lots * LOT_SIZE * p
+            fee = np.maximum(value * commission_rate, min_commission)
+            # 最低佣金导致资金不足时少买一手
+            short = value + fee > c
+            lots[short] -= 1
+            lots = np.maximum(lots, 0)
+            value = lots * LOT_SIZE * p
+            fee = np.where(lots > 0, np.maximum(value * commission_rate, min_commission), 0.0)
+            filled = np.flatnonzero(buying)[lots > 0]
+            ok = lots > 0
+            cash[filled] -= value[ok] + fee[ok]
+            shares[filled] = lots[ok] * LOT_SIZE
+            entry_price[filled] = p[ok]
+            entry_day[filled] = t
+            traded_value[filled] += value[ok]
+            trades[filled] += 1
+
+        # 2. 盘中止损/止盈（T+1：买入当日不触发）
+        if check_stops:
+            holding = (shares > 0) & bar & (entry_day < t)
+            if holding.any():
+                stop = np.fmax(entry_price * sl_ratio, sl_price)
+                target = np.fmin(entry_price * tp_ratio, tp_price)
+                low = lows[:, t]
+                high = highs[:, t]
+                hit_stop = holding & (low <= stop)
+                hit_target = holding & ~hit_stop & (high >= target)
+                if hit_stop.any():
+                    sell(hit_stop, np.minimum(price, stop)[hit_stop])
+                if hit_target.any():
+                    sell(hit_target, np.maximum(price, target)[hit_target])
+
+        # 3. 收盘估值、生成次日委托
+        close = closes[:, t]
+        np.copyto(last_close, close, where=bar)
+        equity[:, t] = cash + shares * last_close
+        pending_buy = np.where(bar, entries[:, t], pending_buy) & (shares == 0)
+        pending_sell = np.where(bar, exits[:, t], pending_sell) & (shares > 0)
+
+    return {
+        "equity": equity,
+        "cash": cash,
+        "shares": shares,
+        "last_close": last_close,
+        "trades": trades,
+        "round_trips": round_trips,
+        "wins": wins,
+        "traded_value": traded_value,
+    }
+
+
+class BacktestEngine:
+    """
+    策略回测引擎
+
+    只读取本地K线仓库，不请求上游；本地没有数据的股票在结果的 missing 中列出
+    """
+
+    def __init__(self, kline_store: KlineStore):
+        """
+        初始化回测引擎
+
+        Args:
+            kline_store: K线本地仓库
+        """
+        self.kline_store = kline_store
+
+    def load_panel(
+        self,
+        codes: List[str],
+        count: int = DEFAULT_BARS,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Tuple[Panel, List[str]]:
+        """
+        读取并按日期对齐多只股票的日线
+
+        Args:
+            codes: 股票代码列表（已规范化）
+            count: 每只股票最多读取的K线条数
+            start_date / end_date: 日期范围 YYYY-MM-DD（可选）
+
+        Returns:
+            (Panel, 本地无数据的股票列表)
+        """
+        start = _parse_date(start_date) if start_date else 0
+        end = _parse_date(end_date) if end_date else 99999999
+
+        loaded, missing = [], []
+        for code in codes:
+            bars = self.kline_store.read_local(code, "day", count)
+            bars = bars[(bars["date"] >= start) & (bars["date"] <= end)]
+            if len(bars):
+                loaded.append((code, bars))
+            else:
+                missing.append(code)
+
+        dates = np.unique(np.concatenate([bars["date"] for _, bars in loaded])) if loaded else np.empty(0, np.int32)
+        shape = (len(loaded), len(dates))
+        fields = {name: np.full(shape, np.nan) for name in ("open", "high", "low", "close")}
+        for i, (_, bars) in enumerate(loaded):
+            cols = np.searchsorted(dates, bars["date"])
+            for name, arr in fields.items():
+                arr[i, cols] = bars[name]
+
+        panel = Panel([code for code, _ in loaded], dates, fields["open"], fields["high"],
+                      fields["low"], fields["close"])
+        return panel, missing
+
+    def run(
+        self,
+        codes: List[str],
+        strategy: str = "ma_cross",
+        params: Optional[Dict] = None,
+        initial_capital: float = 100000,
+        count: int = DEFAULT_BARS,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        take_profit_pct: Optional[float] = None,
+        stop_loss_pct: Optional[float] = None,
+        alerts: Optional[Dict[str, dict]] = None,
+        commission_rate: float = COMMISSION_RATE,
+        min_commission: float = MIN_COMMISSION,
+        stamp_tax_rate: float = STAMP_TAX_RATE,
+    ) -> Dict:
+        """
+        运行回测
+
+        Args:
+            codes: 股票代码列表（已规范化）
+            strategy: 策略名（见 STRATEGIES）
+            params: 策略参数（未提供的使用默认值）
+            initial_capital: 每只股票的初始资金
+            count: 每只股票最多使用的K线条数
+            start_date / end_date: 日期范围
+            take_profit_pct / stop_loss_pct: 相对入场价的止盈/止损百分比
+            alerts: 预警配置 {code: {take_profit, stop_loss, enabled}}，提供时按配置的价格止盈止损
+
+        Returns:
+            {"status", "summary", "symbols", "equity_curve", "missing", "elapsed_ms"}
+        """
+        if strategy not in STRATEGIES:
+            return {"status": "error", "message": f"不支持的策略: {strategy}"}
+        if initial_capital <= 0:
+            return {"status": "error", "message": "初始资金必须大于 0"}
+        if count <= 0:
+            return {"status": "error", "message": "K线条数必须大于 0"}
+        for value in (start_date, end_date):
+            if value:
+                try:
+                    _parse_date(value)
+                except ValueError:
+                    return {"status": "error", "message": f"日期格式应为 YYYY-MM-DD: {value}"}
+
+        started = time.perf_counter()
+        func, defaults = STRATEGIES[strategy]
+        params = {**defaults, **{k: v for k, v in (params or {}).items() if k in defaults}}
+        error = validate_params(strategy, params)
+        if error:
+            return {"status": "error", "message": error}
+
+        panel, missing = self.load_panel(codes, count, start_date, end_date)
+        if not panel.codes:
+            return {"status": "error", "message": "本地没有可用的K线数据", "missing": missing}
+
+        tp_price = sl_price = None
+        if alerts:
+            tp_price = np.full(len(panel.codes), np.nan)
+            sl_price = np.full(len(panel.codes), np.nan)
+            for i, code in enumerate(panel.codes):
+                config = alerts.get(code) or {}
+                if config.get("enabled", True):
+                    tp_price[i] = float(config.get("take_profit") or np.nan)
+                    sl_price[i] = float(config.get("stop_loss") or np.nan)
+
+        entries, exits = func(panel, **params)
+        result = simulate(
+            panel, entries, exits, initial_capital,
+            take_profit_pct, stop_loss_pct, tp_price, sl_price,
+            commission_rate, min_commission, stamp_tax_rate,
+        )
+
+        report = self._report(panel, result, initial_capital)
+        report.update({
+            "status": "success",
+            "strategy": strategy,
+            "params": params,
+            "missing": missing,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        })
+        return report
+
+    @staticmethod
+    def _report(panel: Panel, result: Dict[str, np.ndarray], initial_capital: float) -> Dict:
+        """汇总每只股票和组合的统计"""
+        equity = result["equity"]
+        position_value = result["shares"] * result["last_close"]
+        final_capital = result["cash"] + position_value
+        drawdowns = max_drawdown(equity)
+        bars = panel.bar.sum(axis=1)
+        # 单边换手率：成交额 / 2 / 平均权益
+        turnover = result["traded_value"] / 2 / equity.mean(axis=1)
+
+        symbols = []
+        for i, code in enumerate(panel.codes):
+            metrics = result_metrics(
+                initial_capital, float(final_capital[i]), float(position_value[i]),
+                int(result["wins"][i]), int(result["round_trips"][i]),
+                int(result["trades"][i]), float(drawdowns[i]),
+            )
+            metrics.update({
+                "stock_code": code,
+                "bars": int(bars[i]),
+                "turnover": round(float(turnover[i]), 2),
+            })
+            symbols.append(metrics)
+        symbols.sort(key=lambda s: s["profit_rate"], reverse=True)
+
+        total_equity = equity.sum(axis=0)
+        summary = summarize(panel, result, initial_capital)
+
+        peak = np.maximum.accumulate(total_equity)
+        curve_drawdown = (peak - total_equity) / peak * 100
+        equity_curve = [
+            {"date": _format_date(d), "equity": round(e, 2), "drawdown": round(dd, 2)}
+            for d, e, dd in zip(panel.dates.tolist(), total_equity.tolist(), curve_drawdown.tolist())
+        ]
+        return {"summary": summary, "symbols": symbols, "equity_curve": equity_curve}
+
+
+def _parse_date(value: str) -> int:
+    """'2024-01-02' → 20240102（格式错误时抛出 ValueError）"""
+    return int(datetime.strptime(value, "%Y-%m-%d").strftime("%Y%m%d"))
+
+
+def _format_date(value: int) -> str:
+    """20240102 → '2024-01-02'"""
+    value = int(value)
+    return f"{value // 10000:04d}-{value // 100 % 100:02d}-{value % 100:02d}"
@@ -0,0 +1,433 @@
+"""
+策略参数优化
+
+本文件负责在回测引擎（backtest_engine）之上做参数寻优，用历史数据校准均线周期、止盈止损比例等参数：
+1. 参数空间：网格搜索（grid，全部组合）或随机搜索（random，在区间内均匀采样）
+2. 滚动前推（walk-forward）：按 训练窗口 + 测试窗口 切分历史，每段在训练窗口上选出最优参数，
+   再在随后的测试窗口上检验，得到样本外表现
+3. 多进程并行：每个候选参数一个任务，分发到进程池（工作进程入口见 backtest_worker.py）
+4. 结果（参数排名、切分区间、每段最优参数及样本外表现）持久化为 JSON，可将最优止盈止损比例应用到预警配置
+
+设计说明：
+- 日线数据只读取和对齐一次，放入共享内存（multiprocessing.shared_memory），
+  工作进程在初始化时映射同一块内存，任务只传递参数，不再序列化价格数组
+- 指标只使用当日及以前的数据，因此每个候选只在完整区间上计算一次信号，各区间撮合时按列切片
+- 同一时间只运行一个优化任务，进度保存在内存中，完成（或失败）后写入文件
+
+目录结构：
+    {data_dir}/optimizations/{id}.json
+"""
+
+import os
+import json
+import uuid
+import random
+import itertools
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .backtest_engine import (
+    BacktestEngine, Panel, STRATEGIES, DEFAULT_BARS, validate_params,
+    COMMISSION_RATE, MIN_COMMISSION, STAMP_TAX_RATE,
+)
+from .backtest_worker import STOP_PARAMS, get_context, init_worker, evaluate
+
+
+# 可作为优化目标的统计字段（均为越大越好；calmar = 收益率 / 最大回撤）
+OBJECTIVES = ("sharpe", "profit_rate", "win_rate", "calmar")
+# 单次优化最多评估的候选参数数
+MAX_CANDIDATES = 500
+# 默认训练 / 测试窗口（交易日）
+DEFAULT_TRAIN_DAYS = 750
+DEFAULT_TEST_DAYS = 250
+# 结果中保留的排名条数
+TOP_N = 20
+
+
+# ========== 参数空间 ==========
+
+def grid_candidates(space: Dict[str, List[float]]) -> List[Dict]:
+    """网格搜索：全部取值组合"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_candidates(space: Dict[str, List[float]], samples: int, seed: Optional[int] = None) -> List[Dict]:
+    """
+    随机搜索：每个参数在 [下限, 上限] 内均匀采样（上下限都是整数时采样整数）
+
+    取值列表长度不是 2 时视为候选集合，从中随机选取
+    """
+    rng = random.Random(seed)
+    candidates, seen = [], set()
+    for _ in range(samples * 10):
+        if len(candidates) >= samples:
+            break
+        params = {}
+        for name, values in space.items():
+            if len(values) != 2:
+                params[name] = rng.choice(values)
+            elif all(float(v).is_integer() for v in values):
+                params[name] = rng.randint(int(min(values)), int(max(values)))
+            else:
+                params[name] = round(rng.uniform(min(values), max(values)), 2)
+        key = tuple(sorted(params.items()))
+        if key not in seen:
+            seen.add(key)
+            candidates.append(params)
+    return candidates
+
+
+def _valid(strategy: str, params: Dict) -> bool:
+    """过滤无意义的组合（快线周期不小于慢线、周期小于 1 等）"""
+    signal_params = {k: v for k, v in params.items() if k not in STOP_PARAMS}
+    if validate_params(strategy, signal_params) is not None:
+        return False
+    return all(params.get(k) is None or params[k] > 0 for k in STOP_PARAMS)
+
+
+def walk_forward_splits(days: int, train_days: int, test_days: int) -> List[Tuple[int, int, int]]:
+    """
+    滚动前推切分
+
+    Returns:
+        [(训练起点, 训练终点 / 测试起点, 测试终点), ...]，窗口按测试窗口长度滚动
+    """
+    if train_days <= 0 or test_days <= 0:
+        return []
+    return [
+        (start, start + train_days, start + train_days + test_days)
+        for start in range(0, days - train_days - test_days + 1, test_days)
+    ]
+
+
+def score(summary: Dict, objective: str) -> float:
+    """按优化目标取分数"""
+    if objective == "calmar":
+        drawdown = summary["max_drawdown"]
+        return summary["profit_rate"] / drawdown if drawdown > 0 else summary["profit_rate"]
+    return summary[objective]
+
+
+# ========== 优化器 ==========
+
+class BacktestOptimizer:
+    """
+    策略参数优化器
+
+    start() 在后台线程中运行优化并立即返回任务 ID，get() 查询进度和结果
+    """
+
+    def __init__(self, root_dir: Path):
+        """
+        初始化优化器
+
+        Args:
+            root_dir: 结果文件目录
+        """
+        self.root_dir = root_dir
+        self._lock = threading.Lock()
+        self._running: Optional[Dict] = None
+
+    # ========== 文件 ==========
+
+    def _path(self, job_id: str) -> Path:
+        return self.root_dir / f"{job_id}.json"
+
+    def _save(self, job: Dict):
+        """保存优化结果"""
+        try:
+            self.root_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self._path(job["id"]).with_suffix(".tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(job, f, ensure_ascii=False)
+            os.replace(tmp, self._path(job["id"]))
+        except Exception as e:
+            print(f"保存优化结果失败: {e}")
+
+    def _load(self, job_id: str) -> Optional[Dict]:
+        path = self._path(job_id)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"读取优化结果失败 {path}: {e}")
+            return None
+
+    # ========== 启动 ==========
+
+    def start(
+        self,
+        engine: BacktestEngine,
+        codes: List[str],
+        strategy: str,
+        space: Dict[str, List[float]],
+        method: str = "grid",
+        samples: int = 50,
+        seed: Optional[int] = None,
+        objective: str = "sharpe",
+        train_days: int = DEFAULT_TRAIN_DAYS,
+        test_days: int = DEFAULT_TEST_DAYS,
+        count: int = DEFAULT_BARS,
+        initial_capital: float = 100000,
+        workers: Optional[int] = None,
+        commission_rate: float = COMMISSION_RATE,
+        min_commission: float = MIN_COMMISSION,
+        stamp_tax_rate: float = STAMP_TAX_RATE,
+    ) -> Dict:
+        """
+        启动参数优化（后台运行）
+
+        Args:
+            engine: 回测引擎（用于读取本地K线）
+            codes: 股票代码列表（已规范化）
+            strategy: 策略名
+            space: 参数空间 {参数名: 取值列表}；随机搜索时 [下限, 上限]
+                   参数名为策略参数或 take_profit_pct / stop_loss_pct
+            method: grid / random
+            samples: 随机搜索的采样数
+            objective: 优化目标（见 OBJECTIVES）
+            train_days / test_days: 滚动前推的训练、测试窗口（交易日，为 0 时不做滚动前推）
+            count: 每只股票使用的K线条数
+            initial_capital: 每只股票的初始资金
+            workers: 进程数（默认 CPU 核数）
+            commission_rate / min_commission / stamp_tax_rate: 费用参数
+
+        Returns:
+            {"status": "success", "id": "..."} 或错误信息
+        """
+        if strategy not in STRATEGIES:
+            return {"status": "error", "message": f"不支持的策略: {strategy}"}
+        if objective not in OBJECTIVES:
+            return {"status": "error", "message": f"不支持的优化目标: {objective}"}
+        if count <= 0:
+            return {"status": "error", "message": "K线条数必须大于 0"}
+        if train_days < 0 or test_days < 0:
+            return {"status": "error", "message": "训练、测试窗口不能为负数"}
+        allowed = set(STRATEGIES[strategy][1]) | set(STOP_PARAMS)
+        unknown = [name for name in space if name not in allowed]
+        if unknown:
+            return {"status": "error", "message": f"未知参数: {', '.join(unknown)}"}
+        if not space or not all(space.values()):
+            return {"status": "error", "message": "参数空间为空"}
+
+        # 整数取值（如均线周期）保持为整数
+        space = {
+            name: [int(v) if float(v).is_integer() else v for v in values]
+            for name, values in space.items()
+        }
+        if method == "random":
+            candidates = random_candidates(space, min(samples, MAX_CANDIDATES), seed)
+        else:
+            candidates = grid_candidates(space)
+        candidates = [c for c in candidates if _valid(strategy, c)]
+        if not candidates:
+            return {"status": "error", "message": "没有有效的参数组合"}
+        if len(candidates) > MAX_CANDIDATES:
+            return {"status": "error", "message": f"参数组合过多（{len(candidates)}），最多 {MAX_CANDIDATES} 个"}
+
+        with self._lock:
+            if self._running is not None:
+                return {"status": "error", "message": "已有优化任务正在运行"}
+            job = {
+                "id": uuid.uuid4().hex[:12],
+                "status": "running",
+                "created_at": datetime.now().isoformat(),
+                "config": {
+                    "strategy": strategy,
+                    "space": space,
+                    "method": method,
+                    "objective": objective,
+                    "train_days": train_days,
+                    "test_days": test_days,
+                    "count": count,
+                    "initial_capital": initial_capital,
+                    "commission_rate": commission_rate,
+                    "min_commission": min_commission,
+                    "stamp_tax_rate": stamp_tax_rate,
+                },
+                "codes": codes,
+                "progress": {"done": 0, "total": len(candidates)},
+            }
+            self._running = job
+
+        options = {
+            "initial_capital": initial_capital,
+            "commission_rate": commission_rate,
+            "min_commission": min_commission,
+            "stamp_tax_rate": stamp_tax_rate,
+        }
+        threading.Thread(
+            target=self._run,
+            args=(job, engine, candidates, options, workers),
+            name="backtest-optimizer",
+            daemon=True,
+        ).start()
+        return {"status": "success", "id": job["id"], "candidates": len(candidates)}
+
+    # ========== 执行 ==========
+
+    def _run(self, job: Dict, engine: BacktestEngine, candidates: List[Dict], options: Dict,
+             workers: Optional[int]):
+        """后台执行优化"""
+        config = job["config"]
+        started = datetime.now()
+        try:
+            panel, missing = engine.load_panel(job["codes"], config["count"])
+            if not panel.codes:
+                raise ValueError("本地没有可用的K线数据")
+            job["missing"] = missing
+
+            days = len(panel.dates)
+            splits = walk_forward_splits(days, config["train_days"], config["test_days"])
+            # 区间 0 为完整区间，之后依次为每段的训练、测试区间
+            segments = [(0, days)]
+            for train_start, test_start, test_end in splits:
+                segments += [(train_start, test_start), (test_start, test_end)]
+
+            evaluations = self._evaluate_all(job, panel, config["strategy"], candidates, segments, options, workers)
+            job.update(self._rank(panel, candidates, evaluations, splits, config["objective"]))
+            job["status"] = "completed"
+        except Exception as e:
+            print(f"参数优化失败: {e}")
+            job["status"] = "failed"
+            job["message"] = str(e)
+        job["elapsed_seconds"] = round((datetime.now() - started).total_seconds(), 1)
+        job["finished_at"] = datetime.now().isoformat()
+        self._save(job)
+        with self._lock:
+            self._running = None
+
+    def _evaluate_all(self, job: Dict, panel: Panel, strategy: str, candidates: List[Dict],
+                      segments: List[Tuple[int, int]], options: Dict,
+                      workers: Optional[int]) -> List[List[Dict]]:
+        """将日线放入共享内存，用进程池评估全部候选参数"""
+        shape = (4, len(panel.codes), len(panel.dates))
+        shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+        try:
+            prices = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            prices[0], prices[1], prices[2], prices[3] = panel.open, panel.high, panel.low, panel.close
+            del prices
+
+            workers = max(1, min(workers or os.cpu_count() or 1, len(candidates)))
+            evaluations: List[Optional[List[Dict]]] = [None] * len(candidates)
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=get_context(),
+                initializer=init_worker,
+                initargs=(shm.name, shape, panel.codes, panel.dates),
+            ) as pool:
+                futures = {
+                    pool.submit(evaluate, strategy, params, segments, options): i
+                    for i, params in enumerate(candidates)
+                }
+                for future in as_completed(futures):
+                    evaluations[futures[future]] = future.result()
+                    job["progress"]["done"] += 1
+            job["workers"] = workers
+            return evaluations
+        finally:
+            shm.close()
+            shm.unlink()
+
+    @staticmethod
+    def _rank(panel: Panel, candidates: List[Dict], evaluations: List[List[Dict]],
+              splits: List[Tuple[int, int, int]], objective: str) -> Dict:
+        """按完整区间排名，并汇总滚动前推结果"""
+        ranking = sorted(
+            ({"params": params, "score": round(score(ev[0], objective), 4), "summary": ev[0]}
+             for params, ev in zip(candidates, evaluations)),
+            key=lambda r: r["score"],
+            reverse=True,
+        )
+
+        folds = []
+        for k, (train_start, test_start, test_end) in enumerate(splits):
+            train = [ev[1 + 2 * k] for ev in evaluations]
+            best = max(range(len(candidates)), key=lambda i: score(train[i], objective))
+            test = evaluations[best][2 + 2 * k]
+            folds.append({
+                "train": [train[best]["start_date"], train[best]["end_date"]],
+                "test": [test["start_date"], test["end_date"]],
+                "params": candidates[best],
+                "train_score": round(score(train[best], objective), 4),
+                "test_score": round(score(test, objective), 4),
+                "test_summary": test,
+            })
+
+        walk_forward = None
+        if folds:
+            # 样本外复利收益、平均分数、各参数被选中的次数
+            growth = float(np.prod([1 + f["test_summary"]["profit_rate"] / 100 for f in folds]))
+            selected: Dict[str, int] = {}
+            for fold in folds:
+                key = json.dumps(fold["params"], sort_keys=True)
+                selected[key] = selected.get(key, 0) + 1
+            walk_forward = {
+                "folds": folds,
+                "test_profit_rate": round((growth - 1) * 100, 2),
+                "mean_test_score": round(float(np.mean([f["test_score"] for f in folds])), 4),
+                "selected": [
+                    {"params": json.loads(key), "times": times}
+                    for key, times in sorted(selected.items(), key=lambda item: -item[1])
+                ],
+            }
+
+        return {
+            "symbols": len(panel.codes),
+            "days": len(panel.dates),
+            "best": ranking[0] if ranking else None,
+            "ranking": ranking[:TOP_N],
+            "walk_forward": walk_forward,
+        }
+
+    # ========== 查询 ==========
+
+    def get(self, job_id: str) -> Dict:
+        """获取优化任务（运行中返回进度，完成后返回结果）"""
+        running = self._running
+        if running is not None and running["id"] == job_id:
+            return {"status": "success", "optimization": {k: running[k] for k in ("id", "status", "created_at", "config", "progress")}}
+        job = self._load(job_id)
+        if job is None:
+            return {"status": "error", "message": "优化记录不存在"}
+        return {"status": "success", "optimization": job}
+
+    def get_all(self) -> Dict:
+        """获取全部优化记录摘要（按创建时间倒序）"""
+        items = []
+        running = self._running
+        if running is not None:
+            items.append({k: running[k] for k in ("id", "status", "created_at", "config", "progress")})
+        if self.root_dir.exists():
+            for path in self.root_dir.glob("*.json"):
+                job = self._load(path.stem)
+                if job is None:
+                    continue
+                items.append({
+                    "id": job["id"],
+                    "status": job["status"],
+                    "created_at": job["created_at"],
+                    "config": job["config"],
+                    "symbols": job.get("symbols"),
+                    "best": job.get("best"),
+                    "message": job.get("message"),
+                })
+        items.sort(key=lambda item: item["created_at"], reverse=True)
+        return {"status": "success", "optimizations": items}
+
+    def delete(self, job_id: str) -> Dict:
+        """删除优化记录"""
+        path = self._path(job_id)
+        if not path.exists():
+            return {"status": "error", "message": "优化记录不存在"}
+        path.unlink()
+        return {"status": "success", "message": "已删除"}
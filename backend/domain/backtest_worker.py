@@ -0,0 +1,82 @@
+"""
+策略参数优化的工作进程入口
+
+本文件是 backtest_optimizer 进程池中工作进程执行的全部代码：
+1. 初始化时映射父进程放入共享内存的日线数据
+2. 按候选参数计算信号并在各区间撮合，返回组合统计
+
+设计说明：
+- 工作进程以 forkserver（Linux）或 spawn（Windows、macOS）方式启动，不从多线程的主进程 fork，
+  避免子进程继承调度线程、分舱线程池、SQLite 连接持有的锁而死锁
+- 本模块只依赖 numpy 和 backtest_engine，工作进程不导入监控、API、AI 等模块；
+  domain 包的导出为延迟导入（见 domain/__init__.py），导入本模块不会加载 StockMonitor
+- spawn/forkserver 会在工作进程中重新导入主模块，main.py 因此不在模块顶层创建实例
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .backtest_engine import Panel, STRATEGIES, simulate, summarize
+
+
+# 止盈止损参数名（不属于策略信号参数）
+STOP_PARAMS = ("take_profit_pct", "stop_loss_pct")
+
+# 以下全局变量只在工作进程中使用
+_shm: Optional[shared_memory.SharedMemory] = None
+_panel: Optional[Panel] = None
+
+
+def get_context() -> multiprocessing.context.BaseContext:
+    """获取进程池的启动方式（有 forkserver 时使用 forkserver，否则使用 spawn）"""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def init_worker(shm_name: str, shape: Tuple[int, int, int], codes: List[str], dates: np.ndarray):
+    """工作进程初始化：映射共享内存中的日线数据"""
+    global _shm, _panel
+    # 工作进程与父进程共用资源跟踪进程，共享内存只由父进程释放
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    prices = np.ndarray(shape, dtype=np.float64, buffer=_shm.buf)
+    _panel = Panel(codes, dates, prices[0], prices[1], prices[2], prices[3])
+
+
+def evaluate(
+    strategy: str,
+    params: Dict,
+    segments: List[Tuple[int, int]],
+    options: Dict,
+) -> List[Dict]:
+    """
+    评估一个候选参数
+
+    Args:
+        strategy: 策略名
+        params: 候选参数（策略参数 + 止盈止损比例）
+        segments: 需要撮合的交易日区间 [(start, end), ...]
+        options: initial_capital 及费用参数
+
+    Returns:
+        每个区间的组合统计（见 summarize）
+    """
+    func, defaults = STRATEGIES[strategy]
+    signal_params = {k: v for k, v in params.items() if k in defaults}
+    stops = {k: params.get(k) for k in STOP_PARAMS}
+    entries, exits = func(_panel, **{**defaults, **signal_params})
+
+    summaries = []
+    for start, end in segments:
+        panel = _panel.slice(start, end)
+        result = simulate(
+            panel, entries[:, start:end], exits[:, start:end], options["initial_capital"],
+            stops["take_profit_pct"], stops["stop_loss_pct"],
+            commission_rate=options["commission_rate"],
+            min_commission=options["min_commission"],
+            stamp_tax_rate=options["stamp_tax_rate"],
+        )
+        summaries.append(summarize(panel, result, options["initial_capital"]))
+    return summaries
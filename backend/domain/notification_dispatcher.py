@@ -0,0 +1,243 @@
+"""
+预警通知分发器
+
+本文件负责预警推送通知的异步发送：
+1. 有界队列 + 后台工作线程，预警检测线程只入队，不等待网络 I/O
+2. 同一节拍触发的多条预警合并为每个渠道一条消息
+3. 发送失败按指数退避重试
+4. 重试耗尽或队列已满的消息写入死信日志（JSON Lines）
+
+支持渠道：
+- PushPlus（微信推送）
+- 钉钉机器人 Webhook
+"""
+
+import json
+import time
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from core.http_client import HttpClient, get_http_client
+
+
+class NotificationDispatcher:
+    """
+    预警通知分发器
+
+    后台线程消费通知队列，按渠道合并发送
+    """
+
+    def __init__(
+        self,
+        get_settings: Callable[[], Dict],
+        dead_letter_file: Path,
+        http: Optional[HttpClient] = None,
+        max_queue: int = 256,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+    ):
+        """
+        初始化通知分发器
+
+        Args:
+            get_settings: 获取当前设置的函数（读取 pushplus_token、dingtalk_webhook）
+            dead_letter_file: 死信日志文件路径
+            http: HTTP 客户端（不传则使用全局共享实例）
+            max_queue: 队列最大长度（按节拍批次计）
+            max_retries: 每个渠道的最大重试次数
+            backoff: 退避基数（秒），第 n 次重试等待 backoff * 2^(n-1)
+        """
+        self.get_settings = get_settings
+        self.dead_letter_file = dead_letter_file
+        self.http = http or get_http_client()
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self._queue: "queue.Queue[Optional[List[dict]]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopped = False
+
+        # 运行统计
+        self.sent_count = 0
+        self.failed_count = 0
+        self.recent_dead_letters: deque = deque(maxlen=20)
+
+    # ========== 生命周期 ==========
+
+    def _ensure_worker(self):
+        """首次入队时启动后台工作线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._worker,
+                    name="notification-dispatcher",
+                    daemon=True
+                )
+                self._thread.start()
+
+    def stop(self):
+        """停止后台线程（队列中剩余的消息会先发送完）"""
+        self._stopped = True
+        if self._thread is not None and self._thread.is_alive():
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass
+
+    # ========== 入队 ==========
+
+    def submit(self, alerts: List[dict]):
+        """
+        提交一个节拍触发的预警（非阻塞）
+
+        Args:
+            alerts: 预警信息列表（AlertManager._record_trigger 生成）
+        """
+        if not alerts or self._stopped:
+            return
+        settings = self.get_settings()
+        if not settings.get("pushplus_token") and not settings.get("dingtalk_webhook"):
+            return
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(list(alerts))
+        except queue.Full:
+            title, content = self._build_message(alerts)
+            self._write_dead_letter("queue", title, content, "通知队列已满")
+
+    # ========== 后台发送 ==========
+
+    def _worker(self):
+        """后台工作线程：逐批发送"""
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                break
+            try:
+                self._dispatch(batch)
+            except Exception as e:
+                print(f"通知发送异常: {e}")
+
+    def _dispatch(self, alerts: List[dict]):
+        """将一批预警合并后发送到各渠道"""
+        settings = self.get_settings()
+        title, content = self._build_message(alerts)
+
+        token = settings.get("pushplus_token")
+        if token:
+            self._send_with_retry(
+                "pushplus", title, content,
+                lambda: self._send_pushplus(token, title, content)
+            )
+
+        webhook = settings.get("dingtalk_webhook")
+        if webhook:
+            self._send_with_retry(
+                "dingtalk", title, content,
+                lambda: self._send_dingtalk(webhook, title, content)
+            )
+
+    @staticmethod
+    def _build_message(alerts: List[dict]):
+        """
+        合并多条预警为一条消息
+
+        Returns:
+            (title, content)
+        """
+        if len(alerts) == 1:
+            title = f"股票预警 - {alerts[0]['name']}"
+        else:
+            title = f"股票预警 - {len(alerts)} 只股票"
+
+        blocks = []
+        for alert_info in alerts:
+            lines = []
+            if len(alerts) > 1:
+                lines.append(f"【{alert_info['name']}】{alert_info['code']}")
+            lines.extend(alert_info["messages"])
+            lines.append(f"当前价: {alert_info['price']} | 涨跌幅: {alert_info['change']}%")
+            blocks.append("\n".join(lines))
+        return title, "\n\n".join(blocks)
+
+    def _send_with_retry(self, channel: str, title: str, content: str, send: Callable[[], None]):
+        """按指数退避重试发送，全部失败后写入死信日志"""
+        last_error = ""
+        for attempt in range(self.max_retries + 1):
+            try:
+                send()
+                self.sent_count += 1
+                return
+            except Exception as e:
+                last_error = str(e)
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff * (2 ** attempt))
+
+        self.failed_count += 1
+        print(f"{channel} 推送失败（已重试 {self.max_retries} 次）: {last_error}")
+        self._write_dead_letter(channel, title, content, last_error)
+
+    def _send_pushplus(self, token: str, title: str, content: str):
+        """PushPlus 推送"""
+        resp = self.http.post(
+            "http://www.pushplus.plus/send",
+            endpoint="notify",
+            json={"token": token, "title": title, "content": content}
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("code") != 200:
+            raise RuntimeError(f"PushPlus 返回错误: {data.get('msg')}")
+
+    def _send_dingtalk(self, webhook: str, title: str, content: str):
+        """钉钉推送"""
+        resp = self.http.post(
+            webhook,
+            endpoint="notify",
+            json={"msgtype": "text", "text": {"content": f"{title}\n{content}"}}
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("errcode", 0) != 0:
+            raise RuntimeError(f"钉钉返回错误: {data.get('errmsg')}")
+
+    # ========== 死信日志 ==========
+
+    def _write_dead_letter(self, channel: str, title: str, content: str, error: str):
+        """追加一条死信记录"""
+        record = {
+            "time": datetime.now().isoformat(),
+            "channel": channel,
+            "title": title,
+            "content": content,
+            "error": error,
+        }
+        self.recent_dead_letters.append(record)
+        try:
+            self.dead_letter_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.dead_letter_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"写入死信日志失败: {e}")
+
+    def get_status(self) -> Dict:
+        """
+        获取分发器状态
+
+        Returns:
+            {queued, sent_count, failed_count, recent_dead_letters}
+        """
+        return {
+            "queued": self._queue.qsize(),
+            "sent_count": self.sent_count,
+            "failed_count": self.failed_count,
+            "recent_dead_letters": list(self.recent_dead_letters),
+        }
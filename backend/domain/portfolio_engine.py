@@ -0,0 +1,232 @@
+"""
+组合实时盈亏引擎
+
+本文件负责将持仓台账（PositionLedger）与实时行情快照（QuoteStore）结合，
+每个监控节拍对全部持仓做一次向量化重估：
+1. 持仓数量、成本、已实现盈亏以数组存储，与行情行号建立映射
+2. 计算市值、浮动盈亏、当日盈亏、已实现盈亏
+3. 按自选股分组（StockManager.stock_groups）汇总持仓市值（敞口）
+4. 记录当日组合权益曲线
+
+设计说明：
+- 台账、行情行结构（QuoteStore.version）或分组变化时才重建数组和映射
+- 没有实时行情的持仓（不在自选股列表中）按成本计价，priced 标记为 False
+- 节拍内只做数组运算；持仓明细只在接口读取时生成
+"""
+
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.quote_store import QuoteStore
+from repositories.records_repo import code_key
+from .position_ledger import PositionLedger
+
+
+# 未分组持仓的分组名
+UNGROUPED = ""
+# 当日权益曲线最多保留的点数
+EQUITY_CURVE_POINTS = 5000
+
+
+class PortfolioEngine:
+    """
+    组合实时盈亏引擎
+
+    持仓数组按台账顺序排列，quote_rows 为对应的行情行号（-1 表示无行情）
+    """
+
+    def __init__(self, ledger: PositionLedger):
+        """
+        初始化组合引擎
+
+        Args:
+            ledger: 持仓台账
+        """
+        self.ledger = ledger
+        self._lock = threading.Lock()
+        self._compiled_key: Optional[Tuple[int, int]] = None
+        self._groups: Dict[str, str] = {}
+
+        # 持仓数组
+        self.codes: List[str] = []
+        self.quantity = np.empty(0, dtype=np.float64)
+        self.total_cost = np.empty(0, dtype=np.float64)
+        self.realized_pnl = np.empty(0, dtype=np.float64)
+        self.quote_rows = np.empty(0, dtype=np.int64)
+        self.group_ids = np.empty(0, dtype=np.int64)
+        self.group_names: List[str] = []
+
+        # 最近一次重估结果
+        self.price = np.empty(0, dtype=np.float64)
+        self.market_value = np.empty(0, dtype=np.float64)
+        self.unrealized_pnl = np.empty(0, dtype=np.float64)
+        self.day_pnl = np.empty(0, dtype=np.float64)
+        self.priced = np.empty(0, dtype=bool)
+        self.summary: Dict = {}
+
+        self._last_tick = -1
+        self._curve_date = ""
+        self.equity_curve: deque = deque(maxlen=EQUITY_CURVE_POINTS)
+
+    # ========== 编译 ==========
+
+    def _compile(self, store: QuoteStore, groups: Dict[str, str]):
+        """由台账、行情行结构和分组重建持仓数组"""
+        version, items = self.ledger.items()
+
+        quote_index = {code_key(code): row for code, row in store.index.items()}
+        group_of = {code_key(code): group for code, group in groups.items()}
+        group_names = [UNGROUPED]
+        group_lookup = {UNGROUPED: 0}
+
+        n = len(items)
+        self.codes = [stock_code for _, stock_code, _, _, _ in items]
+        self.quantity = np.fromiter((q for _, _, q, _, _ in items), dtype=np.float64, count=n)
+        self.total_cost = np.fromiter((c for _, _, _, c, _ in items), dtype=np.float64, count=n)
+        self.realized_pnl = np.fromiter((r for _, _, _, _, r in items), dtype=np.float64, count=n)
+        self.quote_rows = np.fromiter(
+            (quote_index.get(key, -1) for key, _, _, _, _ in items), dtype=np.int64, count=n
+        )
+
+        group_ids = np.zeros(n, dtype=np.int64)
+        for i, (key, _, _, _, _) in enumerate(items):
+            group = group_of.get(key, UNGROUPED)
+            if group not in group_lookup:
+                group_lookup[group] = len(group_names)
+                group_names.append(group)
+            group_ids[i] = group_lookup[group]
+        self.group_ids = group_ids
+        self.group_names = group_names
+
+        self._groups = dict(groups)
+        self._compiled_key = (version, store.version)
+
+    def _ensure_compiled(self, store: QuoteStore, groups: Dict[str, str]):
+        """台账、行情行结构或分组变化时重新编译"""
+        if self._compiled_key != (self.ledger.version, store.version) or groups != self._groups:
+            self._compile(store, groups)
+
+    # ========== 重估 ==========
+
+    def revalue(self, store: QuoteStore, groups: Dict[str, str]) -> Dict:
+        """
+        按当前行情重估全部持仓
+
+        Args:
+            store: 实时行情快照
+            groups: 股票分组 {code: group}
+
+        Returns:
+            组合汇总（见 summary）
+        """
+        with self._lock:
+            self._ensure_compiled(store, groups)
+
+            rows = self.quote_rows
+            priced = rows >= 0
+            safe_rows = np.where(priced, rows, 0)
+            price = store.price[safe_rows]
+            pre_close = store.pre_close[safe_rows]
+            priced &= price > 0
+
+            quantity = self.quantity
+            avg_cost = np.divide(
+                self.total_cost, quantity, out=np.zeros_like(quantity), where=quantity > 0
+            )
+            # 无行情的持仓按成本计价
+            price = np.where(priced, price, avg_cost)
+            pre_close = np.where(priced & (pre_close > 0), pre_close, price)
+
+            market_value = quantity * price
+            unrealized = market_value - self.total_cost
+            day_pnl = quantity * (price - pre_close)
+
+            self.price = price
+            self.market_value = market_value
+            self.unrealized_pnl = unrealized
+            self.day_pnl = day_pnl
+            self.priced = priced
+
+            exposure = np.bincount(self.group_ids, weights=market_value, minlength=len(self.group_names))
+            total_value = float(market_value.sum())
+            total_cost = float(self.total_cost.sum())
+            total_unrealized = float(unrealized.sum())
+            total_day_pnl = float(day_pnl.sum())
+            total_realized = float(self.realized_pnl.sum())
+
+            self.summary = {
+                "holdings": int(np.count_nonzero(quantity)),
+                "market_value": round(total_value, 2),
+                "total_cost": round(total_cost, 2),
+                "unrealized_pnl": round(total_unrealized, 2),
+                "realized_pnl": round(total_realized, 2),
+                "total_pnl": round(total_unrealized + total_realized, 2),
+                "day_pnl": round(total_day_pnl, 2),
+                "groups": {
+                    name: round(float(value), 2)
+                    for name, value in zip(self.group_names, exposure) if value
+                },
+                "unpriced": int(np.count_nonzero((quantity != 0) & ~priced)),
+            }
+
+            if store.tick != self._last_tick:
+                self._last_tick = store.tick
+                self._record_equity(total_value, total_unrealized + total_realized, total_day_pnl)
+
+            return self.summary
+
+    def _record_equity(self, market_value: float, total_pnl: float, day_pnl: float):
+        """追加当日权益曲线（跨日时清空）"""
+        now = datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        if today != self._curve_date:
+            self._curve_date = today
+            self.equity_curve.clear()
+        self.equity_curve.append({
+            "time": now.strftime("%H:%M:%S"),
+            "market_value": round(market_value, 2),
+            "total_pnl": round(total_pnl, 2),
+            "day_pnl": round(day_pnl, 2),
+        })
+
+    # ========== 读取 ==========
+
+    def get_holdings(self, include_closed: bool = False) -> List[Dict]:
+        """
+        获取最近一次重估的持仓明细
+
+        Args:
+            include_closed: 是否包含已清仓的股票
+
+        Returns:
+            持仓明细列表（按市值倒序）
+        """
+        with self._lock:
+            holdings = []
+            for i, code in enumerate(self.codes):
+                quantity = self.quantity[i]
+                if not quantity and not include_closed:
+                    continue
+                holdings.append({
+                    "stock_code": code,
+                    "quantity": int(quantity),
+                    "price": round(float(self.price[i]), 3),
+                    "avg_cost": round(float(self.total_cost[i] / quantity), 3) if quantity > 0 else 0,
+                    "market_value": round(float(self.market_value[i]), 2),
+                    "unrealized_pnl": round(float(self.unrealized_pnl[i]), 2),
+                    "realized_pnl": round(float(self.realized_pnl[i]), 2),
+                    "day_pnl": round(float(self.day_pnl[i]), 2),
+                    "group": self.group_names[self.group_ids[i]],
+                    "priced": bool(self.priced[i]),
+                })
+        holdings.sort(key=lambda h: h["market_value"], reverse=True)
+        return holdings
+
+    def get_equity_curve(self) -> List[Dict]:
+        """获取当日权益曲线"""
+        with self._lock:
+            return list(self.equity_curve)
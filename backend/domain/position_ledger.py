@@ -0,0 +1,224 @@
+"""
+持仓台账
+
+本文件负责按股票维护持仓的运行状态，避免每次查询持仓都重放全部交易记录：
+1. 每只股票一个台账：持仓数量、持仓成本、已实现盈亏、未平仓批次
+2. 新增交易记录时，若交易时间不早于台账最后一笔，直接在台账上增量计算
+3. 补录更早的交易、修改或删除记录时，只对该股票重新折算
+4. 启动时一次性遍历全部交易记录建立台账
+5. 写入记录与更新台账须在同一把股票锁内完成（symbol_lock），
+   否则并发的重新折算可能读到已写入的记录，随后增量计算再应用一次
+
+计算规则与原 calculate_position 一致：
+- 买入（B）：累加成本和数量
+- 卖出（S）：有持仓时按平均成本等比例扣减成本，卖出价与平均成本之差计入已实现盈亏
+- 做T（T）：不影响持仓
+- 未平仓批次按先进先出扣减，仅用于展示
+"""
+
+import threading
+from typing import Callable, Dict, List, Tuple
+
+from repositories.records_repo import code_key
+
+
+class Position:
+    """单只股票的持仓状态"""
+
+    __slots__ = ("stock_code", "quantity", "total_cost", "realized_pnl", "lots", "last_time", "trade_count")
+
+    def __init__(self, stock_code: str):
+        self.stock_code = stock_code
+        self.quantity = 0
+        self.total_cost = 0.0
+        self.realized_pnl = 0.0
+        self.lots: List[List] = []  # [交易时间, 价格, 剩余数量]
+        self.last_time = ""
+        self.trade_count = 0
+
+    def apply(self, record: Dict):
+        """按时间顺序应用一笔交易"""
+        trade_type = record["type"]
+        price = record["price"]
+        quantity = record["quantity"]
+        trade_time = record.get("trade_time", "") or ""
+
+        if trade_type == "B":  # 买入
+            self.total_cost += price * quantity
+            self.quantity += quantity
+            self.lots.append([trade_time, price, quantity])
+        elif trade_type == "S":  # 卖出
+            if self.quantity > 0:
+                # 按比例减少成本
+                cost_per_share = self.total_cost / self.quantity
+                self.total_cost -= cost_per_share * quantity
+                self.quantity -= quantity
+                self.realized_pnl += (price - cost_per_share) * quantity
+                self._consume_lots(quantity)
+        # 做T（当天买卖，不影响持仓成本）
+
+        self.last_time = max(self.last_time, trade_time)
+        self.trade_count += 1
+
+    def _consume_lots(self, quantity: int):
+        """先进先出扣减未平仓批次"""
+        while quantity > 0 and self.lots:
+            lot = self.lots[0]
+            used = min(lot[2], quantity)
+            lot[2] -= used
+            quantity -= used
+            if lot[2] <= 0:
+                self.lots.pop(0)
+
+    def to_dict(self) -> Dict:
+        """转换为接口返回格式"""
+        avg_cost = self.total_cost / self.quantity if self.quantity > 0 else 0
+        return {
+            "stock_code": self.stock_code,
+            "quantity": self.quantity,
+            "avg_cost": round(avg_cost, 3),
+            "total_cost": round(self.total_cost, 2),
+            "realized_pnl": round(self.realized_pnl, 2),
+            "trade_count": self.trade_count,
+            "lots": [
+                {"trade_time": t, "price": p, "quantity": q}
+                for t, p, q in self.lots
+            ],
+        }
+
+
+class PositionLedger:
+    """
+    持仓台账
+
+    按股票代码索引键（后 6 位）分组，load(key) 返回该股票按交易时间正序的全部记录
+    """
+
+    def __init__(self, load: Callable[[str], List[Dict]]):
+        """
+        初始化台账
+
+        Args:
+            load: 按代码索引键加载交易记录的函数（用于重新折算）
+        """
+        self.load = load
+        self._positions: Dict[str, Position] = {}
+        self._lock = threading.Lock()
+        self._symbol_locks: Dict[str, threading.RLock] = {}
+        self.refolds = 0
+        self.version = 0  # 台账变化计数（组合引擎据此重建持仓数组）
+
+    def symbol_lock(self, stock_code: str) -> threading.RLock:
+        """
+        获取单只股票的写入锁（可重入）
+
+        调用方写入交易记录时应持有该锁直到台账更新完成：
+            with ledger.symbol_lock(code):
+                repo.insert(...)
+                ledger.on_added(record)
+        """
+        key = code_key(stock_code)
+        with self._lock:
+            lock = self._symbol_locks.get(key)
+            if lock is None:
+                lock = self._symbol_locks[key] = threading.RLock()
+            return lock
+
+    def _fold(self, key: str, records: List[Dict]) -> Position:
+        """由有序交易记录折算持仓"""
+        position = Position(records[-1]["stock_code"] if records else key)
+        for record in records:
+            position.apply(record)
+        return position
+
+    def rebuild(self, records: List[Dict]):
+        """
+        由全部交易记录（按交易时间正序）建立台账
+
+        Args:
+            records: 全部交易记录
+        """
+        grouped: Dict[str, List[Dict]] = {}
+        for record in records:
+            grouped.setdefault(code_key(record["stock_code"]), []).append(record)
+        with self._lock:
+            self._positions = {key: self._fold(key, items) for key, items in grouped.items()}
+            self.version += 1
+
+    def refold(self, stock_code: str):
+        """重新折算单只股票"""
+        key = code_key(stock_code)
+        with self.symbol_lock(stock_code):
+            records = self.load(key)
+            with self._lock:
+                if records:
+                    self._positions[key] = self._fold(key, records)
+                else:
+                    self._positions.pop(key, None)
+                self.refolds += 1
+                self.version += 1
+
+    def on_added(self, record: Dict):
+        """新增交易记录"""
+        key = code_key(record["stock_code"])
+        with self.symbol_lock(record["stock_code"]):
+            with self._lock:
+                position = self._positions.get(key)
+                if position is None:
+                    position = self._positions[key] = Position(record["stock_code"])
+                if (record.get("trade_time", "") or "") >= position.last_time:
+                    position.stock_code = record["stock_code"]
+                    position.apply(record)
+                    self.version += 1
+                    return
+            # 补录更早的交易：按时间重新折算
+            self.refold(record["stock_code"])
+
+    def on_changed(self, record: Dict):
+        """交易记录被修改或删除"""
+        self.refold(record["stock_code"])
+
+    def get(self, stock_code: str) -> Dict:
+        """
+        获取单只股票的持仓
+
+        Args:
+            stock_code: 股票代码（带前缀或不带前缀）
+
+        Returns:
+            持仓字典（无交易记录时数量为 0）
+        """
+        with self._lock:
+            position = self._positions.get(code_key(stock_code))
+            result = position.to_dict() if position else Position(stock_code).to_dict()
+        result["stock_code"] = stock_code
+        return result
+
+    def items(self) -> Tuple[int, List[Tuple[str, str, int, float, float]]]:
+        """
+        获取全部持仓的数值快照
+
+        Returns:
+            (version, [(代码索引键, 股票代码, 数量, 持仓成本, 已实现盈亏), ...])
+        """
+        with self._lock:
+            return self.version, [
+                (key, p.stock_code, p.quantity, p.total_cost, p.realized_pnl)
+                for key, p in self._positions.items()
+            ]
+
+    def get_all(self, include_closed: bool = False) -> List[Dict]:
+        """
+        获取全部持仓
+
+        Args:
+            include_closed: 是否包含已清仓的股票
+
+        Returns:
+            持仓列表
+        """
+        with self._lock:
+            return [
+                p.to_dict() for p in self._positions.values()
+                if include_closed or p.quantity != 0
+            ]
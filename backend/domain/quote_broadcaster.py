@@ -0,0 +1,124 @@
+"""
+行情推送广播器
+
+本文件负责将监控节拍产生的数据推送给订阅者（SSE 连接）：
+1. 行情增量：只推送本节拍发生变化的股票，以及被移除的股票
+2. 指数、涨跌统计：数据变化时推送
+3. 预警：触发时立即推送
+4. 快照：订阅者连接时由 API 层先发送一次完整快照
+
+设计说明：
+- 广播器与传输方式无关，订阅者以回调函数形式注册
+- 每个事件只序列化一次 JSON，所有订阅者共享
+- 无订阅者时跳过增量计算，不增加监控节拍开销
+"""
+
+import json
+import threading
+from typing import Callable, Dict, List, Optional
+
+from core.quote_store import QuoteStore
+
+
+class QuoteBroadcaster:
+    """
+    行情推送广播器
+
+    维护订阅者列表和上一次推送的行情，用于计算增量
+    """
+
+    def __init__(self):
+        """初始化广播器"""
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Callable[[str, object], None]] = {}
+        self._next_id = 1
+        self._last_quotes: Dict[str, dict] = {}
+        self._last_tick = -1
+
+    @property
+    def subscriber_count(self) -> int:
+        """当前订阅者数量"""
+        return len(self._subscribers)
+
+    def subscribe(self, callback: Callable[[str, object], None]) -> int:
+        """
+        注册订阅者
+
+        Args:
+            callback: 回调函数 callback(event, payload)，payload 为 JSON 字符串
+                      在监控线程中调用，不应阻塞
+
+        Returns:
+            订阅 ID（用于取消订阅）
+        """
+        with self._lock:
+            subscriber_id = self._next_id
+            self._next_id += 1
+            self._subscribers[subscriber_id] = callback
+            return subscriber_id
+
+    def unsubscribe(self, subscriber_id: int):
+        """取消订阅"""
+        with self._lock:
+            self._subscribers.pop(subscriber_id, None)
+
+    def publish(self, event: str, data: object) -> int:
+        """
+        向所有订阅者推送事件
+
+        Args:
+            event: 事件类型（quotes/index/market_stats/alerts 等）
+            data: 事件数据（需可 JSON 序列化）
+
+        Returns:
+            成功推送的订阅者数量
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.items())
+        if not subscribers:
+            return 0
+
+        payload = json.dumps(data, ensure_ascii=False)
+        delivered = 0
+        for subscriber_id, callback in subscribers:
+            try:
+                callback(event, payload)
+                delivered += 1
+            except Exception as e:
+                print(f"推送失败，移除订阅者 {subscriber_id}: {e}")
+                self.unsubscribe(subscriber_id)
+        return delivered
+
+    def publish_quotes(self, store: QuoteStore):
+        """
+        计算并推送行情增量
+
+        Args:
+            store: 行情快照
+        """
+        if not self._subscribers or store.tick == self._last_tick:
+            return
+
+        current = store.to_dict()
+        self._last_tick = store.tick
+
+        changed = {
+            code: quote for code, quote in current.items()
+            if self._last_quotes.get(code) != quote
+        }
+        removed = [code for code in self._last_quotes if code not in current]
+        self._last_quotes = current
+
+        if changed or removed:
+            self.publish("quotes", {"changed": changed, "removed": removed})
+
+    def publish_alerts(self, alerts: Optional[List[dict]]) -> bool:
+        """
+        推送触发的预警
+
+        Returns:
+            是否已推送给至少一个订阅者
+        """
+        if not alerts:
+            return False
+        return self.publish("alerts", alerts) > 0
@@ -4,13 +4,13 @@
 本文件负责管理用户的交易记录和 AI 分析记录：
 1. 交易记录的增删改查
 2. AI 分析记录的存储和查询
-3. 持仓计算（根据交易记录计算成本和数量）
+3. 持仓计算（按股票维护增量持仓台账，见 position_ledger.py）
 4. 交易风格分析
 5. 数据导入导出（Markdown 格式）
 
 数据存储：
-- trade_records.json: 交易记录
-- ai_records.json: AI 分析记录
+- records.db: SQLite 数据库（交易记录、AI 分析记录，见 repositories/records_repo.py）
+- records.json: 旧版 JSON 存储，首次启动时一次性迁移到 records.db
 """
 
 import json
@@ -19,6 +19,9 @@ from datetime import datetime
 from typing import List, Dict, Optional
 from pathlib import Path
 
+from repositories.records_repo import RecordsRepository
+from .position_ledger import PositionLedger, Position
+
 
 class RecordsManager:
     """
@@ -36,33 +39,28 @@ class RecordsManager:
         """
         self.data_dir = data_dir
         self.records_file = data_dir / "records.json"
-        self.trade_records: List[Dict] = []
-        self.ai_records: List[Dict] = []
-        self._load_data()
-    
-    def _load_data(self):
-        """从文件加载数据"""
-        if self.records_file.exists():
-            try:
-                with open(self.records_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.trade_records = data.get('trade_records', [])
-                    self.ai_records = data.get('ai_records', [])
-                    print(f"已加载 {len(self.trade_records)} 条交易记录, {len(self.ai_records)} 条AI分析记录")
-            except Exception as e:
-                print(f"加载记录数据失败: {e}")
+        self.repo = RecordsRepository(data_dir / "records.db")
+        self._migrate_json()
+        self.ledger = PositionLedger(lambda key: self.repo.scan('trade_records', key))
+        self.ledger.rebuild(self.repo.scan('trade_records'))
+        print(
+            f"已加载 {self.repo.count('trade_records')} 条交易记录, "
+            f"{self.repo.count('ai_records')} 条AI分析记录"
+        )
     
-    def _save_data(self):
-        """保存数据到文件"""
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+    def _migrate_json(self):
+        """将旧版 records.json 一次性迁移到 SQLite（迁移后重命名为 records.json.migrated）"""
+        if not self.records_file.exists():
+            return
         try:
-            with open(self.records_file, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'trade_records': self.trade_records,
-                    'ai_records': self.ai_records
-                }, f, ensure_ascii=False, indent=2)
+            with open(self.records_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.repo.insert_many('trade_records', data.get('trade_records', []))
+            self.repo.insert_many('ai_records', data.get('ai_records', []))
+            self.records_file.replace(self.records_file.with_name("records.json.migrated"))
+            print(f"已迁移 records.json 到 SQLite")
         except Exception as e:
-            print(f"保存记录数据失败: {e}")
+            print(f"迁移记录数据失败: {e}")
     
     # ========== 交易记录管理 ==========
     
@@ -109,8 +107,9 @@ class RecordsManager:
             "created_at": datetime.now().isoformat()
         }
         
-        self.trade_records.append(record)
-        self._save_data()
+        with self.ledger.symbol_lock(stock_code):
+            self.repo.insert('trade_records', record)
+            self.ledger.on_added(record)
         
         return {"status": "success", "record": record, "message": "交易记录添加成功"}
     
@@ -125,18 +124,23 @@ class RecordsManager:
         Returns:
             {"status": "success/error", "record": {...}, "message": "..."}
         """
-        for record in self.trade_records:
-            if record["id"] == record_id:
-                # 更新允许的字段
-                allowed_fields = ["type", "price", "quantity", "reason", "trade_time", "mood", "level", "stock_name"]
-                for key, value in updates.items():
-                    if key in allowed_fields:
-                        record[key] = value
-                record["updated_at"] = datetime.now().isoformat()
-                self._save_data()
-                return {"status": "success", "record": record, "message": "更新成功"}
-        
-        return {"status": "error", "message": "记录不存在"}
+        record = self.repo.get('trade_records', record_id)
+        if record is None:
+            return {"status": "error", "message": "记录不存在"}
+        
+        with self.ledger.symbol_lock(record["stock_code"]):
+            record = self.repo.get('trade_records', record_id)
+            if record is None:
+                return {"status": "error", "message": "记录不存在"}
+            # 更新允许的字段
+            allowed_fields = ["type", "price", "quantity", "reason", "trade_time", "mood", "level", "stock_name"]
+            for key, value in updates.items():
+                if key in allowed_fields:
+                    record[key] = value
+            record["updated_at"] = datetime.now().isoformat()
+            self.repo.update('trade_records', record)
+            self.ledger.on_changed(record)
+        return {"status": "success", "record": record, "message": "更新成功"}
     
     def delete_trade_record(self, record_id: str) -> Dict:
         """
@@ -148,38 +152,29 @@ class RecordsManager:
         Returns:
             {"status": "success/error", "message": "..."}
         """
-        for i, record in enumerate(self.trade_records):
-            if record["id"] == record_id:
-                deleted = self.trade_records.pop(i)
-                self._save_data()
-                return {"status": "success", "deleted": deleted, "message": "删除成功"}
-        
-        return {"status": "error", "message": "记录不存在"}
+        deleted = self.repo.get('trade_records', record_id)
+        if deleted is None:
+            return {"status": "error", "message": "记录不存在"}
+        with self.ledger.symbol_lock(deleted["stock_code"]):
+            if not self.repo.delete('trade_records', record_id):
+                return {"status": "error", "message": "记录不存在"}
+            self.ledger.on_changed(deleted)
+        return {"status": "success", "deleted": deleted, "message": "删除成功"}
     
-    def get_trade_records(self, stock_code: str = None, limit: int = 100) -> Dict:
+    def get_trade_records(self, stock_code: str = None, limit: int = 100, offset: int = 0) -> Dict:
         """
-        获取交易记录
+        获取交易记录（按交易时间倒序）
         
         Args:
-            stock_code: 股票代码（可选，不传则返回所有）
+            stock_code: 股票代码（可选，不传则返回所有；支持带前缀或不带前缀）
             limit: 返回数量限制
+            offset: 分页偏移
             
         Returns:
             {"status": "success", "records": [...]}
         """
-        records = self.trade_records
-        
-        if stock_code:
-            # 支持模糊匹配（带前缀或不带前缀）
-            records = [r for r in records if 
-                      r["stock_code"] == stock_code or
-                      r["stock_code"].endswith(stock_code) or
-                      stock_code.endswith(r["stock_code"])]
-        
-        # 按交易时间倒序
-        records = sorted(records, key=lambda x: x.get("trade_time", ""), reverse=True)
-        
-        return {"status": "success", "records": records[:limit]}
+        records = self.repo.query('trade_records', stock_code, limit, offset)
+        return {"status": "success", "records": records}
     
     def get_trade_records_for_analysis(self, stock_code: str, limit: int = 10) -> List[Dict]:
         """
@@ -240,38 +235,26 @@ class RecordsManager:
             "datetime": datetime.now().strftime("%Y-%m-%d %H:%M")
         }
         
-        self.ai_records.append(record)
+        self.repo.insert('ai_records', record)
         
         # 只保留最近 200 条 AI 记录
-        if len(self.ai_records) > 200:
-            self.ai_records = self.ai_records[-200:]
-        
-        self._save_data()
+        self.repo.trim('ai_records', 200)
         return {"status": "success", "record": record}
     
-    def get_ai_records(self, stock_code: str = None, limit: int = 50) -> Dict:
+    def get_ai_records(self, stock_code: str = None, limit: int = 50, offset: int = 0) -> Dict:
         """
-        获取 AI 分析记录
+        获取 AI 分析记录（按时间倒序）
         
         Args:
             stock_code: 股票代码（可选）
             limit: 返回数量限制
+            offset: 分页偏移
             
         Returns:
             {"status": "success", "records": [...]}
         """
-        records = self.ai_records
-        
-        if stock_code:
-            records = [r for r in records if 
-                      r["stock_code"] == stock_code or
-                      r["stock_code"].endswith(stock_code) or
-                      stock_code.endswith(r["stock_code"])]
-        
-        # 按时间倒序
-        records = sorted(records, key=lambda x: x.get("datetime", ""), reverse=True)
-        
-        return {"status": "success", "records": records[:limit]}
+        records = self.repo.query('ai_records', stock_code, limit, offset)
+        return {"status": "success", "records": records}
     
     def get_ai_records_for_analysis(self, stock_code: str, limit: int = 5) -> List[Dict]:
         """
@@ -297,7 +280,7 @@ class RecordsManager:
     
     def calculate_position(self, stock_code: str) -> Dict:
         """
-        根据交易记录计算持仓成本和数量
+        获取持仓成本和数量（读取持仓台账）
         
         使用加权平均法计算成本
         
@@ -307,44 +290,27 @@ class RecordsManager:
         Returns:
             {"status": "success", "position": {...}}
         """
-        result = self.get_trade_records(stock_code, 1000)
-        records = result.get("records", [])
-        
-        # 按时间正序处理
-        records = sorted(records, key=lambda x: x.get("trade_time", ""))
-        
-        position = 0  # 当前持仓数量
-        total_cost = 0  # 总成本
+        if len(stock_code) >= 6:
+            return {"status": "success", "position": self.ledger.get(stock_code)}
         
+        # 不完整的代码无法对应到台账，按原规则匹配后折算
+        records = self.repo.query('trade_records', stock_code, self.repo.count('trade_records'), ascending=True)
+        position = Position(stock_code)
         for record in records:
-            trade_type = record["type"]
-            price = record["price"]
-            quantity = record["quantity"]
-            
-            if trade_type == "B":  # 买入
-                total_cost += price * quantity
-                position += quantity
-            elif trade_type == "S":  # 卖出
-                if position > 0:
-                    # 按比例减少成本
-                    cost_per_share = total_cost / position
-                    total_cost -= cost_per_share * quantity
-                    position -= quantity
-            elif trade_type == "T":  # 做T（当天买卖，不影响持仓成本）
-                pass
-        
-        # 计算平均成本
-        avg_cost = total_cost / position if position > 0 else 0
+            position.apply(record)
+        return {"status": "success", "position": position.to_dict()}
+    
+    def get_positions(self, include_closed: bool = False) -> Dict:
+        """
+        获取全部股票的持仓
         
-        return {
-            "status": "success",
-            "position": {
-                "stock_code": stock_code,
-                "quantity": position,
-                "avg_cost": round(avg_cost, 3),
-                "total_cost": round(total_cost, 2)
-            }
-        }
+        Args:
+            include_closed: 是否包含已清仓的股票
+            
+        Returns:
+            {"status": "success", "positions": [...]}
+        """
+        return {"status": "success", "positions": self.ledger.get_all(include_closed)}
     
     # ========== 交易风格分析 ==========
     
@@ -411,10 +377,7 @@ class RecordsManager:
         Returns:
             股票代码列表
         """
-        codes = set()
-        for record in self.trade_records:
-            codes.add(record["stock_code"])
-        return list(codes)
+        return self.repo.distinct_codes('trade_records')
     
     # ========== 导入导出 ==========
     
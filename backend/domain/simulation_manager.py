@@ -4,21 +4,28 @@
 本文件负责实盘模拟交易功能：
 1. 模拟会话管理（创建、暂停、继续、放弃、删除）
 2. 模拟交易执行（买入、卖出、跳过）
-3. 收益计算（收益率、胜率、最大回撤）
+3. 收益计算（收益率、胜率、最大回撤，口径与策略回测共用）
 4. AI 评分分析数据格式化
 
 模拟规则：
 - 使用历史 K 线数据进行模拟
 - 支持 7-50 个交易日的模拟周期
 - 模拟结束时自动清仓计算收益
+
+数据存储：
+- 会话变更以事件追加到日志（见 repositories/simulation_journal.py），定期压缩为快照
+- 内存中按 ID 哈希存储会话，并维护 股票代码→ID、状态→ID 二级索引
 """
 
-import json
 import uuid
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Set
 from pathlib import Path
 
+from repositories.records_repo import code_key, code_matches
+from repositories.simulation_journal import SimulationJournal
+from .backtest_engine import result_metrics
+
 
 class SimulationManager:
     """
@@ -35,29 +42,67 @@ class SimulationManager:
             data_dir: 数据存储目录
         """
         self.data_dir = data_dir
-        self.simulations_file = data_dir / "simulations.json"
-        self.sessions: List[Dict] = []
+        # 会话 ID → 会话（按创建顺序）
+        self.sessions: Dict[str, Dict] = {}
+        # 二级索引：股票代码索引键 → 会话 ID，状态 → 会话 ID
+        self._code_index: Dict[str, Set[str]] = {}
+        self._status_index: Dict[str, Set[str]] = {}
+        self.journal = SimulationJournal(data_dir)
         self._load_data()
+        self.journal.start(lambda: list(self.sessions.values()))
     
     def _load_data(self):
-        """加载模拟数据"""
-        if self.simulations_file.exists():
-            try:
-                with open(self.simulations_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.sessions = data.get('sessions', [])
-                    print(f"已加载 {len(self.sessions)} 条模拟记录")
-            except Exception as e:
-                print(f"加载模拟数据失败: {e}")
-    
-    def _save_data(self):
-        """保存模拟数据"""
-        self.data_dir.mkdir(parents=True, exist_ok=True)
+        """加载模拟数据（快照 + 日志重放）"""
         try:
-            with open(self.simulations_file, 'w', encoding='utf-8') as f:
-                json.dump({'sessions': self.sessions}, f, ensure_ascii=False, indent=2)
+            self.sessions = {s["id"]: s for s in self.journal.load()}
+            print(f"已加载 {len(self.sessions)} 条模拟记录")
         except Exception as e:
-            print(f"保存模拟数据失败: {e}")
+            print(f"加载模拟数据失败: {e}")
+        self._rebuild_indexes()
+    
+    # ========== 索引维护 ==========
+    
+    def _rebuild_indexes(self):
+        """根据全部会话重建二级索引"""
+        self._code_index = {}
+        self._status_index = {}
+        for session in self.sessions.values():
+            self._index(session)
+    
+    def _index(self, session: Dict):
+        """将会话加入二级索引"""
+        self._code_index.setdefault(code_key(session["stock_code"]), set()).add(session["id"])
+        self._status_index.setdefault(session["status"], set()).add(session["id"])
+    
+    def _unindex(self, session: Dict):
+        """将会话移出二级索引"""
+        self._code_index.get(code_key(session["stock_code"]), set()).discard(session["id"])
+        self._status_index.get(session["status"], set()).discard(session["id"])
+    
+    def _set_status(self, session: Dict, status: str):
+        """修改会话状态并同步状态索引"""
+        self._status_index.get(session["status"], set()).discard(session["id"])
+        session["status"] = status
+        self._status_index.setdefault(status, set()).add(session["id"])
+    
+    def _record(self, op: str, session: Dict, fields: Iterable[str], trade: Optional[Dict] = None):
+        """
+        追加会话变更事件（调用方需持有 journal.lock）
+        
+        Args:
+            op: 事件类型
+            session: 变更后的会话
+            fields: 发生变化的字段
+            trade: 新增的交易记录（可选）
+        """
+        event = {"id": session["id"], "set": {k: session[k] for k in fields if k in session}}
+        if trade is not None:
+            event["trade"] = trade
+        self.journal.append(op, **event)
+    
+    def close(self):
+        """关闭日志（落盘）"""
+        self.journal.close()
     
     # ========== 会话管理 ==========
     
@@ -111,8 +156,10 @@ class SimulationManager:
             "updated_at": datetime.now().isoformat()
         }
         
-        self.sessions.append(session)
-        self._save_data()
+        with self.journal.lock:
+            self.sessions[session["id"]] = session
+            self._index(session)
+            self.journal.append("created", session=session)
         
         return {"status": "success", "session": session}
     
@@ -126,9 +173,9 @@ class SimulationManager:
         Returns:
             {"status": "success/error", "session": {...}, "message": "..."}
         """
-        for session in self.sessions:
-            if session["id"] == session_id:
-                return {"status": "success", "session": session}
+        session = self.sessions.get(session_id)
+        if session:
+            return {"status": "success", "session": session}
         return {"status": "error", "message": "会话不存在"}
     
     def get_sessions(
@@ -148,16 +195,21 @@ class SimulationManager:
         Returns:
             {"status": "success", "sessions": [...], "total": 数量}
         """
-        sessions = self.sessions
+        # 通过二级索引缩小候选集
+        ids: Optional[Set[str]] = None
+        if stock_code and len(stock_code) >= 6:
+            ids = set(self._code_index.get(code_key(stock_code), ()))
+        if status:
+            status_ids = self._status_index.get(status, set())
+            ids = status_ids.copy() if ids is None else ids & status_ids
         
-        if stock_code:
-            sessions = [s for s in sessions if 
-                       s["stock_code"] == stock_code or
-                       s["stock_code"].endswith(stock_code) or
-                       stock_code.endswith(s["stock_code"])]
+        if ids is None:
+            sessions = list(self.sessions.values())
+        else:
+            sessions = [self.sessions[i] for i in ids]
         
-        if status:
-            sessions = [s for s in sessions if s["status"] == status]
+        if stock_code:
+            sessions = [s for s in sessions if code_matches(s["stock_code"], stock_code)]
         
         # 按更新时间倒序
         sessions = sorted(sessions, key=lambda x: x.get("updated_at", ""), reverse=True)
@@ -166,46 +218,50 @@ class SimulationManager:
     
     def pause_session(self, session_id: str) -> Dict:
         """暂停会话"""
-        for session in self.sessions:
-            if session["id"] == session_id:
-                if session["status"] == "running":
-                    session["status"] = "paused"
-                    session["updated_at"] = datetime.now().isoformat()
-                    self._save_data()
-                    return {"status": "success", "session": session}
+        with self.journal.lock:
+            session = self.sessions.get(session_id)
+            if not session:
+                return {"status": "error", "message": "会话不存在"}
+            if session["status"] != "running":
                 return {"status": "error", "message": "会话状态不允许暂停"}
-        return {"status": "error", "message": "会话不存在"}
+            self._set_status(session, "paused")
+            session["updated_at"] = datetime.now().isoformat()
+            self._record("paused", session, ("status", "updated_at"))
+            return {"status": "success", "session": session}
     
     def resume_session(self, session_id: str) -> Dict:
         """继续会话"""
-        for session in self.sessions:
-            if session["id"] == session_id:
-                if session["status"] == "paused":
-                    session["status"] = "running"
-                    session["updated_at"] = datetime.now().isoformat()
-                    self._save_data()
-                    return {"status": "success", "session": session}
+        with self.journal.lock:
+            session = self.sessions.get(session_id)
+            if not session:
+                return {"status": "error", "message": "会话不存在"}
+            if session["status"] != "paused":
                 return {"status": "error", "message": "会话状态不允许继续"}
-        return {"status": "error", "message": "会话不存在"}
+            self._set_status(session, "running")
+            session["updated_at"] = datetime.now().isoformat()
+            self._record("resumed", session, ("status", "updated_at"))
+            return {"status": "success", "session": session}
     
     def abandon_session(self, session_id: str) -> Dict:
         """放弃会话"""
-        for session in self.sessions:
-            if session["id"] == session_id:
-                session["status"] = "abandoned"
-                session["updated_at"] = datetime.now().isoformat()
-                self._save_data()
-                return {"status": "success", "session": session}
-        return {"status": "error", "message": "会话不存在"}
+        with self.journal.lock:
+            session = self.sessions.get(session_id)
+            if not session:
+                return {"status": "error", "message": "会话不存在"}
+            self._set_status(session, "abandoned")
+            session["updated_at"] = datetime.now().isoformat()
+            self._record("abandoned", session, ("status", "updated_at"))
+            return {"status": "success", "session": session}
     
     def delete_session(self, session_id: str) -> Dict:
         """删除会话"""
-        for i, session in enumerate(self.sessions):
-            if session["id"] == session_id:
-                deleted = self.sessions.pop(i)
-                self._save_data()
-                return {"status": "success", "deleted": deleted}
-        return {"status": "error", "message": "会话不存在"}
+        with self.journal.lock:
+            deleted = self.sessions.pop(session_id, None)
+            if not deleted:
+                return {"status": "error", "message": "会话不存在"}
+            self._unindex(deleted)
+            self.journal.append("deleted", id=session_id)
+            return {"status": "success", "deleted": deleted}
     
     # ========== 交易执行 ==========
     
@@ -232,66 +288,67 @@ class SimulationManager:
         Returns:
             {"status": "success/error", "session": {...}, "trade": {...}, "message": "..."}
         """
-        session = None
-        for s in self.sessions:
-            if s["id"] == session_id:
-                session = s
-                break
-        
-        if not session:
-            return {"status": "error", "message": "会话不存在"}
-        
-        if session["status"] != "running":
-            return {"status": "error", "message": "会话已结束或暂停"}
-        
-        # 执行交易
-        if trade_type == "buy":
-            cost = price * quantity
-            if cost > session["current_capital"]:
-                return {"status": "error", "message": "资金不足"}
+        with self.journal.lock:
+            session = self.sessions.get(session_id)
+            if not session:
+                return {"status": "error", "message": "会话不存在"}
             
-            # 更新持仓成本（加权平均）
-            total_cost = session["cost_price"] * session["position"] + cost
-            session["position"] += quantity
-            session["cost_price"] = total_cost / session["position"] if session["position"] > 0 else 0
-            session["current_capital"] -= cost
+            if session["status"] != "running":
+                return {"status": "error", "message": "会话已结束或暂停"}
             
-        elif trade_type == "sell":
-            if quantity > session["position"]:
-                return {"status": "error", "message": "持仓不足"}
+            # 执行交易
+            if trade_type == "buy":
+                cost = price * quantity
+                if cost > session["current_capital"]:
+                    return {"status": "error", "message": "资金不足"}
+                
+                # 更新持仓成本（加权平均）
+                total_cost = session["cost_price"] * session["position"] + cost
+                session["position"] += quantity
+                session["cost_price"] = total_cost / session["position"] if session["position"] > 0 else 0
+                session["current_capital"] -= cost
+                
+            elif trade_type == "sell":
+                if quantity > session["position"]:
+                    return {"status": "error", "message": "持仓不足"}
+                
+                session["position"] -= quantity
+                session["current_capital"] += price * quantity
+                
+                # 清仓时重置成本
+                if session["position"] == 0:
+                    session["cost_price"] = 0
             
-            session["position"] -= quantity
-            session["current_capital"] += price * quantity
+            # 记录交易
+            trade = {
+                "day": session["current_day"],
+                "date": current_date,
+                "type": trade_type,
+                "price": price,
+                "quantity": quantity,
+                "reason": reason,
+                "capital_after": session["current_capital"],
+                "position_after": session["position"]
+            }
+            session["trades"].append(trade)
             
-            # 清仓时重置成本
-            if session["position"] == 0:
-                session["cost_price"] = 0
-        
-        # 记录交易
-        trade = {
-            "day": session["current_day"],
-            "date": current_date,
-            "type": trade_type,
-            "price": price,
-            "quantity": quantity,
-            "reason": reason,
-            "capital_after": session["current_capital"],
-            "position_after": session["position"]
-        }
-        session["trades"].append(trade)
-        
-        # 进入下一天
-        session["current_day"] += 1
-        session["updated_at"] = datetime.now().isoformat()
-        
-        # 检查是否结束
-        if session["current_day"] >= session["total_days"]:
-            session["status"] = "completed"
-            session["final_price"] = price
-        
-        self._save_data()
-        
-        return {"status": "success", "session": session, "trade": trade}
+            # 进入下一天
+            session["current_day"] += 1
+            session["updated_at"] = datetime.now().isoformat()
+            
+            # 检查是否结束
+            if session["current_day"] >= session["total_days"]:
+                self._set_status(session, "completed")
+                session["final_price"] = price
+            
+            self._record(
+                "trade", session,
+                ("position", "cost_price", "current_capital", "current_day",
+                 "updated_at", "status", "final_price"),
+                trade
+            )
+            
+            return {"status": "success", "session": session, "trade": trade}
     
     def complete_session(self, session_id: str, final_price: float) -> Dict:
         """
@@ -304,41 +361,48 @@ class SimulationManager:
         Returns:
             {"status": "success/error", "session": {...}, "message": "..."}
         """
-        for session in self.sessions:
-            if session["id"] == session_id:
-                session["final_price"] = final_price
-                
-                # 如果还有持仓，自动清仓
-                if session["position"] > 0:
-                    auto_sell_amount = session["position"] * final_price
-                    session["current_capital"] += auto_sell_amount
-                    
-                    # 记录自动清仓交易
-                    auto_trade = {
-                        "day": session["current_day"],
-                        "date": session.get("end_date", ""),
-                        "type": "sell",
-                        "price": final_price,
-                        "quantity": session["position"],
-                        "reason": "模拟结束自动清仓",
-                        "capital_after": session["current_capital"],
-                        "position_after": 0,
-                        "auto": True
-                    }
-                    session["trades"].append(auto_trade)
-                    session["position"] = 0
-                    session["cost_price"] = 0
-                
-                # 计算最终收益率
-                profit_rate = ((session["current_capital"] - session["initial_capital"]) 
-                              / session["initial_capital"] * 100)
-                session["final_profit_rate"] = round(profit_rate, 2)
+        with self.journal.lock:
+            session = self.sessions.get(session_id)
+            if not session:
+                return {"status": "error", "message": "会话不存在"}
+            
+            session["final_price"] = final_price
+            auto_trade = None
+            
+            # 如果还有持仓，自动清仓
+            if session["position"] > 0:
+                auto_sell_amount = session["position"] * final_price
+                session["current_capital"] += auto_sell_amount
                 
-                session["updated_at"] = datetime.now().isoformat()
-                self._save_data()
-                return {"status": "success", "session": session}
-        
-        return {"status": "error", "message": "会话不存在"}
+                # 记录自动清仓交易
+                auto_trade = {
+                    "day": session["current_day"],
+                    "date": session.get("end_date", ""),
+                    "type": "sell",
+                    "price": final_price,
+                    "quantity": session["position"],
+                    "reason": "模拟结束自动清仓",
+                    "capital_after": session["current_capital"],
+                    "position_after": 0,
+                    "auto": True
+                }
+                session["trades"].append(auto_trade)
+                session["position"] = 0
+                session["cost_price"] = 0
+            
+            # 计算最终收益率
+            profit_rate = ((session["current_capital"] - session["initial_capital"]) 
+                          / session["initial_capital"] * 100)
+            session["final_profit_rate"] = round(profit_rate, 2)
+            
+            session["updated_at"] = datetime.now().isoformat()
+            self._record(
+                "completed", session,
+                ("final_price", "current_capital", "position", "cost_price",
+                 "final_profit_rate", "updated_at"),
+                auto_trade
+            )
+            return {"status": "success", "session": session}
     
     # ========== 收益计算 ==========
     
@@ -358,9 +422,6 @@ class SimulationManager:
         final_capital = session["current_capital"] + position_value
         initial_capital = session["initial_capital"]
         
-        # 收益率
-        profit_rate = (final_capital - initial_capital) / initial_capital * 100
-        
         # 计算胜率
         trades = [t for t in session["trades"] if t["type"] != "skip"]
         win_count = 0
@@ -375,8 +436,6 @@ class SimulationManager:
                 if trade["price"] > buy_price:
                     win_count += 1
         
-        win_rate = (win_count / total_trades * 100) if total_trades > 0 else 0
-        
         # 计算最大回撤
         max_capital = initial_capital
         max_drawdown = 0
@@ -388,14 +447,10 @@ class SimulationManager:
             if drawdown > max_drawdown:
                 max_drawdown = drawdown
         
-        return {
-            "final_capital": round(final_capital, 2),
-            "profit_rate": round(profit_rate, 2),
-            "win_rate": round(win_rate, 2),
-            "max_drawdown": round(max_drawdown, 2),
-            "total_trades": len(trades),
-            "position_value": round(position_value, 2)
-        }
+        return result_metrics(
+            initial_capital, final_capital, position_value,
+            win_count, total_trades, len(trades), max_drawdown
+        )
     
     # ========== AI 分析数据格式化 ==========
     
@@ -6,6 +6,7 @@
 2. AlertManager - 预警管理
 3. StockDataFetcher - 股票数据获取
 4. IndexDataFetcher - 指数数据获取
+5. PortfolioEngine - 组合实时盈亏（可选，由 main.py 注入）
 
 主要功能：
 - 启动/停止监控循环
@@ -15,8 +16,9 @@
 """
 
 import os
-import time
+import re
 import json
+import time
 from typing import Dict, List, Optional
 from datetime import datetime
 from pathlib import Path
@@ -30,8 +32,21 @@ from core.config import (
 )
 from core.stock_data import StockDataFetcher
 from core.index_data import IndexDataFetcher
+from core.scheduler import TickScheduler
+from core.http_client import get_http_client
+from core.quote_store import QuoteStore
+from core.response_cache import ResponseCache, CacheEntry, ttl_for
+from core.kline_store import KlineStore
+from core.intraday_stream import IntradayAccumulator
+from core.tick_recorder import TickRecorder
+from core.fundamentals import FundamentalsTable
+from core.bulkhead import get_bulkhead_stats
 from .stock_manager import StockManager
 from .alert_manager import AlertManager
+from .backtest_engine import BacktestEngine
+from .backtest_optimizer import BacktestOptimizer
+from .quote_broadcaster import QuoteBroadcaster
+from .portfolio_engine import PortfolioEngine
 
 
 class StockMonitor:
@@ -42,6 +57,16 @@ class StockMonitor:
     提供统一的对外接口
     """
     
+    # 各数据源的超时时间（秒），超时后放弃本次结果，不影响其他数据源
+    SOURCE_TIMEOUTS = {
+        "index": 8,
+        "market_stats": 30,
+        "quotes": 10,
+        "fundamentals": 30,
+    }
+    # 本地尚无日K线的股票，重新读取量比基准的间隔（秒）
+    PROFILE_RETRY_INTERVAL = 300
+    
     def __init__(self):
         """初始化股票监控器"""
         # 禁用代理
@@ -58,16 +83,45 @@ class StockMonitor:
         # 初始化各管理器
         self.stock_manager = StockManager(self.data_dir / "stocks.json")
         self.alert_manager = AlertManager(self.data_dir / "alerts.json", self.settings)
-        self.stock_fetcher = StockDataFetcher()
-        self.index_fetcher = IndexDataFetcher()
+        # 行情获取器共享同一个连接池
+        self.http = get_http_client()
+        self.stock_fetcher = StockDataFetcher(self.http)
+        self.index_fetcher = IndexDataFetcher(self.http)
+        # K线本地仓库（只下载缺失的尾部K线）
+        self.kline_store = KlineStore(self.data_dir / "kline", self.stock_fetcher.get_kline_data)
+        self.stock_fetcher.kline_store = self.kline_store
+        # 盘中逐笔快照（环形缓冲区，收盘后写入日文件）
+        self.tick_recorder = TickRecorder(self.data_dir / "ticks")
+        # 自选股基本面（批量慢节奏刷新，额外数据优先读取）
+        self.fundamentals = FundamentalsTable()
+        self.stock_fetcher.fundamentals = self.fundamentals
+        # 策略参数优化（后台多进程运行，结果写入数据目录）
+        self.optimizer = BacktestOptimizer(self.data_dir / "optimizations")
         
         # 运行状态
         self.running = False
+        self.scheduler = TickScheduler()
+        self._register_jobs()
         
-        # 实时数据缓存
-        self.data: Dict[str, dict] = {}
+        # 实时数据缓存（列式存储，API 读取时渲染为字典）
+        self.data = QuoteStore()
+        # 盘中流式指标（VWAP、量比、滚动波动率），随行情节拍增量更新
+        self.intraday = IntradayAccumulator()
         self.index_data: Dict[str, dict] = {}
         self.market_stats: Dict = {}
+        
+        # 推送通道（SSE 订阅者）
+        self.broadcaster = QuoteBroadcaster()
+        
+        # 组合实时盈亏（依赖交易记录，由 set_portfolio_engine 注入）
+        self.portfolio: Optional[PortfolioEngine] = None
+        # 量比基准最近一次读取失败的时间（monotonic），用于限制重试频率
+        self._profile_attempts: Dict[str, float] = {}
+        # 最近一次推送的组合汇总（API 线程也会重估组合，不能用引擎当前的 summary 判断变化）
+        self._published_portfolio: Optional[Dict] = None
+        
+        # 股票详情类数据缓存（分时、K线、资金流向等）
+        self.response_cache = ResponseCache()
     
     def _disable_proxy(self):
         """禁用系统代理"""
@@ -105,44 +159,335 @@ class StockMonitor:
     
     # ========== 监控控制 ==========
     
+    def _register_jobs(self):
+        """
+        注册各数据源的调度任务
+        
+        指数、涨跌统计、自选股行情并发刷新，互不阻塞
+        """
+        refresh_interval = lambda: self.settings.get("refresh_interval", 5)
+        
+        self.scheduler.add_job(
+            "index",
+            self.index_fetcher.fetch_index_data,
+            interval=refresh_interval,
+            timeout=self.SOURCE_TIMEOUTS["index"],
+            on_result=self._on_index_data,
+        )
+        self.scheduler.add_job(
+            "market_stats",
+            self.index_fetcher.fetch_market_stats,
+            interval=lambda: self.settings.get("market_stats_interval", 15),
+            timeout=self.SOURCE_TIMEOUTS["market_stats"],
+            on_result=self._on_market_stats,
+        )
+        self.scheduler.add_job(
+            "quotes",
+            self._fetch_stock_data,
+            interval=refresh_interval,
+            timeout=self.SOURCE_TIMEOUTS["quotes"],
+            on_result=self._on_stock_data,
+            condition=lambda: bool(self.stock_manager.stocks),
+        )
+        self.scheduler.add_job(
+            "fundamentals",
+            self._fetch_fundamentals,
+            interval=lambda: self.settings.get("fundamentals_interval", 600),
+            timeout=self.SOURCE_TIMEOUTS["fundamentals"],
+            condition=lambda: bool(self.stock_manager.stocks),
+        )
+        self.scheduler.add_job(
+            "tick_flush",
+            lambda: self.tick_recorder.flush(),
+            interval=60,
+            timeout=30,
+        )
+    
     def start(self):
-        """启动监控"""
+        """启动监控（阻塞，直到调用 stop）"""
         self.running = True
         print("监控已启动")
-        while self.running:
-            # 获取大盘指数
-            self.index_data = self.index_fetcher.fetch_index_data()
-            self.market_stats = self.index_fetcher.fetch_market_stats()
-            
-            # 获取股票数据
-            if self.stock_manager.stocks:
-                self._fetch_stock_data()
-            
-            time.sleep(self.settings.get("refresh_interval", 5))
+        self.scheduler.run()
     
     def stop(self):
         """停止监控"""
         self.running = False
+        self.scheduler.stop()
+        self.tick_recorder.flush(force=True)
+        self.alert_manager.close()
         print("监控已停止")
     
-    def _fetch_stock_data(self):
-        """获取股票实时数据"""
-        new_data = self.stock_fetcher.fetch_realtime_data(self.stock_manager.stocks)
+    def get_scheduler_status(self) -> Dict:
+        """获取各数据源调度状态"""
+        return {
+            "status": "success",
+            "jobs": self.scheduler.get_status(),
+            "quote_chunk_errors": self.stock_fetcher.last_chunk_errors,
+            "response_cache": self.response_cache.get_stats(),
+            "upstreams": self.http.get_stats(),
+            "kline_store": self.kline_store.get_stats(),
+            "intraday": self.intraday.get_stats(),
+            "tick_recorder": self.tick_recorder.get_stats(),
+            "fundamentals": self.fundamentals.get_stats(),
+            "bulkheads": get_bulkhead_stats(),
+        }
+    
+    def _on_index_data(self, index_data: Dict[str, dict]):
+        """指数数据回调（获取失败时保留上一次数据）"""
+        if index_data:
+            changed = index_data != self.index_data
+            self.index_data = index_data
+            if changed:
+                self.broadcaster.publish("index", index_data)
+    
+    def _on_market_stats(self, market_stats: Dict):
+        """涨跌统计回调"""
+        if market_stats:
+            changed = market_stats != self.market_stats
+            self.market_stats = market_stats
+            if changed:
+                self.broadcaster.publish("market_stats", market_stats)
+    
+    def _fetch_stock_data(self) -> Dict[str, dict]:
+        """获取股票实时数据（只请求上游，不修改状态）"""
+        return self.stock_fetcher.fetch_realtime_quotes(
+            list(self.stock_manager.stocks),
+            chunk_size=self.settings.get("quote_chunk_size", 80)
+        )
+    
+    def _on_stock_data(self, new_data: Dict[str, dict]):
+        """自选股行情回调：更新快照、检查预警、推送增量（超时的结果不会到达这里）"""
+        # 原地更新列式行情快照
+        rows = self.data.update_many(new_data)
+        self.intraday.update(self.data, rows)
+        self.tick_recorder.record(self.data, rows)
+        self._load_intraday_profiles()
         
-        # 更新数据并检查预警
-        for code, stock_data in new_data.items():
-            self.data[code] = stock_data
-            
-            # 更新股票列表中的代码格式
-            if code not in self.stock_manager.stocks:
+        # 更新股票列表中的代码格式
+        watched = set(self.stock_manager.stocks)
+        for code in new_data:
+            if code not in watched:
                 raw_code = code[2:]
                 if raw_code in self.stock_manager.stocks:
                     self.stock_manager.stocks.remove(raw_code)
                     self.stock_manager.stocks.append(code)
                     self.stock_manager._save_data()
-            
-            # 检查预警
-            self.alert_manager.check_alerts(code, stock_data)
+        
+        # 批量检查预警
+        triggered = self.alert_manager.check_alerts_batch(self.data, rows)
+        
+        # 推送行情增量和触发的预警
+        self.broadcaster.publish_quotes(self.data)
+        if self.broadcaster.publish_alerts(triggered):
+            # 已推送送达的预警不再留给轮询接口，避免推送断开回退轮询时重复提醒
+            self.alert_manager.discard_pending(triggered)
+        if self.broadcaster.subscriber_count:
+            self.broadcaster.publish("intraday", self.intraday.snapshot(self.data))
+        
+        # 重估组合盈亏
+        self._revalue_portfolio()
+    
+    def _fetch_fundamentals(self):
+        """批量刷新自选股基本面（失败的批次保留上一次数据）"""
+        rows = self.stock_fetcher.get_fundamentals_batch(list(self.stock_manager.stocks))
+        if rows:
+            self.fundamentals.update_many(rows)
+    
+    def get_fundamentals(self, sort: Optional[str] = None, order: str = "desc") -> Dict:
+        """
+        获取自选股基本面列表
+        
+        Args:
+            sort: 排序字段（pe_ratio、pb_ratio、turnover_rate、total_mv 等，不传按自选股顺序）
+            order: 排序方向 asc/desc
+        """
+        codes = [self.stock_fetcher.normalize_code(c) for c in self.stock_manager.stocks]
+        data = self.fundamentals.view(sort, descending=order != "asc", codes=codes)
+        return {"status": "success", "data": data, **self.fundamentals.get_stats()}
+    
+    # ========== 盘中指标 ==========
+    
+    def _load_intraday_profiles(self):
+        """
+        从本地K线仓库读取近 5 日平均成交量作为量比基准（不请求上游）
+        
+        本地尚无日K线时保持未读取状态，每 PROFILE_RETRY_INTERVAL 秒重试一次，
+        K线仓库补齐后（如打开详情页、回测）即可开始计算量比
+        """
+        today = int(datetime.now().strftime("%Y%m%d"))
+        now = time.monotonic()
+        for code in self.intraday.missing_profiles():
+            if now - self._profile_attempts.get(code, -self.PROFILE_RETRY_INTERVAL) < self.PROFILE_RETRY_INTERVAL:
+                continue
+            bars = self.kline_store.read_local(code, "day", 6)
+            bars = bars[bars["date"] < today][-5:]
+            if len(bars):
+                self._profile_attempts.pop(code, None)
+                self.intraday.set_profile(code, float(bars["volume"].mean()))
+            else:
+                self._profile_attempts[code] = now
+    
+    def get_intraday_indicators(self, code: Optional[str] = None) -> Dict:
+        """
+        获取盘中流式指标
+        
+        Args:
+            code: 股票代码（可选，不传返回全部自选股）
+        """
+        indicators = self.intraday.snapshot(self.data)
+        if code is None:
+            return {"status": "success", "data": indicators}
+        code = self.stock_manager.normalize_code(code)
+        if code not in indicators:
+            return {"status": "error", "message": "暂无该股票的实时行情"}
+        return {"status": "success", "data": indicators[code]}
+    
+    def get_ticks(self, code: str, date: Optional[str] = None, minutes: bool = False) -> Dict:
+        """
+        获取本地记录的盘中数据
+        
+        Args:
+            code: 股票代码
+            date: 日期 YYYYMMDD（默认当日）
+            minutes: 是否聚合为分钟线
+        """
+        if date is not None and not re.fullmatch(r"[0-9]{8}", date):
+            return {"status": "error", "message": "日期格式应为 YYYYMMDD"}
+        code = self.stock_manager.normalize_code(code)
+        ticks = self.tick_recorder.get_ticks(code, date)
+        if minutes:
+            return {"status": "success", "data": TickRecorder.to_minutes(ticks)}
+        return {
+            "status": "success",
+            "data": [
+                {
+                    "time": datetime.fromtimestamp(ts).strftime("%H:%M:%S"),
+                    "price": round(price, 3),
+                    "volume": volume,
+                    "amount": amount,
+                }
+                for ts, price, volume, amount in ticks.tolist()
+            ],
+        }
+    
+    # ========== 组合盈亏 ==========
+    
+    def set_portfolio_engine(self, engine: PortfolioEngine):
+        """注入组合盈亏引擎"""
+        self.portfolio = engine
+    
+    def _revalue_portfolio(self):
+        """按当前行情重估组合并推送汇总（有变化时）"""
+        if self.portfolio is None:
+            return
+        summary = self.portfolio.revalue(self.data, self.stock_manager.stock_groups)
+        if summary != self._published_portfolio:
+            self._published_portfolio = summary
+            self.broadcaster.publish("portfolio", summary)
+    
+    def get_portfolio(self, include_closed: bool = False) -> Dict:
+        """获取组合汇总和持仓明细"""
+        if self.portfolio is None:
+            return {"status": "error", "message": "组合引擎未启用"}
+        summary = self.portfolio.revalue(self.data, self.stock_manager.stock_groups)
+        return {
+            "status": "success",
+            "summary": summary,
+            "holdings": self.portfolio.get_holdings(include_closed),
+        }
+    
+    def get_portfolio_equity(self) -> Dict:
+        """获取组合当日权益曲线"""
+        if self.portfolio is None:
+            return {"status": "error", "message": "组合引擎未启用"}
+        return {"status": "success", "curve": self.portfolio.get_equity_curve()}
+    
+    # ========== 策略回测 ==========
+    
+    def run_backtest(self, codes: Optional[List[str]] = None, use_alerts: bool = False, **options) -> Dict:
+        """
+        在本地K线历史上回测策略
+        
+        Args:
+            codes: 股票代码列表（默认全部自选股）
+            use_alerts: 是否按预警配置的止盈价/止损价出场
+            options: 其余参数见 BacktestEngine.run
+        """
+        normalize = self.stock_fetcher.normalize_code
+        codes = [normalize(code) for code in (codes or self.stock_manager.stocks)]
+        alerts = {normalize(code): config for code, config in self.alert_manager.alerts.items()} if use_alerts else None
+        return BacktestEngine(self.kline_store).run(codes, alerts=alerts, **options)
+    
+    def start_optimization(self, codes: Optional[List[str]] = None, **options) -> Dict:
+        """
+        启动策略参数优化（后台运行）
+        
+        Args:
+            codes: 股票代码列表（默认全部自选股）
+            options: 其余参数见 BacktestOptimizer.start
+        """
+        normalize = self.stock_fetcher.normalize_code
+        codes = [normalize(code) for code in (codes or self.stock_manager.stocks)]
+        if not codes:
+            return {"status": "error", "message": "没有可优化的股票"}
+        return self.optimizer.start(BacktestEngine(self.kline_store), codes, **options)
+    
+    def get_optimizations(self) -> Dict:
+        """获取参数优化记录列表"""
+        return self.optimizer.get_all()
+    
+    def get_optimization(self, job_id: str) -> Dict:
+        """获取参数优化进度或结果"""
+        return self.optimizer.get(job_id)
+    
+    def delete_optimization(self, job_id: str) -> Dict:
+        """删除参数优化记录"""
+        return self.optimizer.delete(job_id)
+    
+    def apply_optimization(self, job_id: str, codes: Optional[List[str]] = None) -> Dict:
+        """
+        将优化得到的止盈/止损比例应用到预警配置
+        
+        止盈价 = 基准价 * (1 + 止盈比例)，止损价 = 基准价 * (1 - 止损比例)；
+        基准价取实时价格，没有实时行情时取本地最后一根日线收盘价。预警的其余设置保持不变
+        
+        Args:
+            job_id: 优化记录 ID
+            codes: 要应用的股票（默认该次优化中仍在自选股列表里的全部股票）
+        """
+        result = self.optimizer.get(job_id)
+        if result.get("status") != "success":
+            return result
+        job = result["optimization"]
+        if job["status"] != "completed" or not job.get("best"):
+            return {"status": "error", "message": "优化尚未完成"}
+        params = job["best"]["params"]
+        take_profit_pct = params.get("take_profit_pct")
+        stop_loss_pct = params.get("stop_loss_pct")
+        if not take_profit_pct and not stop_loss_pct:
+            return {"status": "error", "message": "该次优化不包含止盈止损参数"}
+        
+        targets = codes or [code for code in job["codes"] if code in self.stock_manager.stocks]
+        applied, skipped = {}, []
+        for code in targets:
+            # 行情快照的字典视图中价格为格式化后的字符串
+            quote = self.data.get(code) or {}
+            price = float(quote.get("price") or 0)
+            if price <= 0:
+                bars = self.kline_store.read_local(code, "day", 1)
+                price = float(bars["close"][-1]) if len(bars) else 0
+            if price <= 0:
+                skipped.append(code)
+                continue
+            config = dict(self.alert_manager.alerts.get(code) or {})
+            if take_profit_pct:
+                config["take_profit"] = round(price * (1 + take_profit_pct / 100), 2)
+            if stop_loss_pct:
+                config["stop_loss"] = round(price * (1 - stop_loss_pct / 100), 2)
+            self.alert_manager.set_alert(code, config)
+            applied[code] = {"take_profit": config.get("take_profit"), "stop_loss": config.get("stop_loss")}
+        
+        return {"status": "success", "params": params, "applied": applied, "skipped": skipped}
     
     # ========== 设置相关 ==========
     
@@ -167,9 +512,13 @@ class StockMonitor:
         """删除股票"""
         result = self.stock_manager.remove_stock(code)
         # 清理相关数据
-        if code in self.data:
-            del self.data[code]
+        self.data.remove(code)
+        self.intraday.remove(code)
+        self._profile_attempts.pop(code, None)
+        self.tick_recorder.remove(code)
+        self.fundamentals.remove(self.stock_fetcher.normalize_code(code))
         self.alert_manager.remove_alert(code)
+        self.broadcaster.publish_quotes(self.data)
         return result
     
     def reorder_stocks(self, new_order: List[str]) -> Dict:
@@ -182,10 +531,18 @@ class StockMonitor:
     
     def get_stocks(self) -> Dict:
         """获取股票列表和数据"""
-        result = self.stock_manager.get_stocks_data(self.data, self.alert_manager.alerts)
+        result = self.stock_manager.get_stocks_data(self.data.to_dict(), self.alert_manager.alerts)
         result["index_data"] = self.index_data
         return result
     
+    def get_stream_snapshot(self) -> Dict:
+        """获取推送通道的连接快照（股票列表和数据 + 涨跌统计 + 组合汇总）"""
+        snapshot = self.get_stocks()
+        snapshot["market_stats"] = self.market_stats
+        if self.portfolio is not None:
+            snapshot["portfolio"] = self.portfolio.revalue(self.data, self.stock_manager.stock_groups)
+        return snapshot
+    
     # ========== 分组管理（代理到 StockManager）==========
     
     def set_stock_group(self, code: str, group: str) -> Dict:
@@ -218,36 +575,68 @@ class StockMonitor:
         """获取触发的预警"""
         return self.alert_manager.get_triggered_alerts()
     
-    # ========== 股票数据（代理到 StockDataFetcher）==========
+    def get_notification_status(self) -> Dict:
+        """获取推送通知分发状态"""
+        return self.alert_manager.get_notification_status()
+    
+    # ========== 股票数据（代理到 StockDataFetcher，带缓存）==========
+    
+    def get_cached_entry(self, kind: str, code: str, *params) -> CacheEntry:
+        """
+        获取股票详情类数据的缓存条目（未命中时请求上游）
+        
+        Args:
+            kind: 数据类型 minute/history_minute/kline/money_flow/extra/dragon_tiger
+            code: 股票代码
+            params: 额外参数（如 K线周期、条数）
+        """
+        loaders = {
+            "minute": self.stock_fetcher.get_minute_data,
+            "history_minute": self.stock_fetcher.get_history_minute_data,
+            "kline": self.kline_store.get_kline_data,
+            "money_flow": self.stock_fetcher.get_money_flow,
+            "extra": self.stock_fetcher.get_stock_extra_data,
+            "dragon_tiger": self.stock_fetcher.get_dragon_tiger,
+        }
+        code = self.stock_fetcher.normalize_code(code)
+        return self.response_cache.get_or_load(
+            (kind, code) + params,
+            lambda: loaders[kind](code, *params),
+            ttl_for(kind),
+        )
     
     def get_minute_data(self, code: str) -> Dict:
         """获取分时数据"""
-        return self.stock_fetcher.get_minute_data(code)
+        return self.get_cached_entry("minute", code).value
     
     def get_history_minute_data(self, code: str, date: str) -> Dict:
         """获取历史分时数据"""
-        return self.stock_fetcher.get_history_minute_data(code, date)
+        return self.get_cached_entry("history_minute", code, date).value
     
     def get_kline_data(self, code: str, period: str = "day", count: int = 120) -> Dict:
         """获取K线数据"""
-        return self.stock_fetcher.get_kline_data(code, period, count)
+        return self.get_cached_entry("kline", code, period, count).value
     
     def get_money_flow(self, code: str) -> Dict:
         """获取资金流向"""
-        return self.stock_fetcher.get_money_flow(code)
+        return self.get_cached_entry("money_flow", code).value
     
     def get_stock_extra_data(self, code: str) -> Dict:
         """获取股票额外数据"""
-        return self.stock_fetcher.get_stock_extra_data(code)
+        return self.get_cached_entry("extra", code).value
     
     def get_dragon_tiger(self, code: str) -> Dict:
         """获取龙虎榜数据"""
-        return self.stock_fetcher.get_dragon_tiger(code)
+        return self.get_cached_entry("dragon_tiger", code).value
+    
+    def get_quote(self, code: str) -> Dict:
+        """获取实时行情快照（不请求上游，不在自选股中时为空）"""
+        return self.data.get(self.stock_fetcher.normalize_code(code), {})
     
     def get_stock_detail(self, code: str) -> Dict:
         """获取股票详情"""
         code = self.stock_fetcher.normalize_code(code)
-        basic = self.data.get(code, {})
+        basic = self.get_quote(code)
         minute = self.get_minute_data(code)
         kline = self.get_kline_data(code, "day", 60)
         money_flow = self.get_money_flow(code)
@@ -403,4 +792,10 @@ class StockMonitor:
         self._ensure_data_dir()
         self._load_settings()
         self.stock_manager = StockManager(self.data_dir / "stocks.json")
+        self.kline_store = KlineStore(self.data_dir / "kline", self.stock_fetcher.get_kline_data)
+        self.stock_fetcher.kline_store = self.kline_store
+        self.tick_recorder.flush(force=True)
+        self.tick_recorder = TickRecorder(self.data_dir / "ticks")
+        self.optimizer = BacktestOptimizer(self.data_dir / "optimizations")
+        self.alert_manager.close()
         self.alert_manager = AlertManager(self.data_dir / "alerts.json", self.settings)
@@ -8,6 +8,9 @@
 4. 注册所有 API 路由
 5. 启动后台监控线程
 
+各模块实例在 lifespan 中创建：参数优化的工作进程以 spawn/forkserver 方式启动时会重新导入本模块，
+模块顶层只做导入和路由注册，不创建监控、数据库等实例
+
 架构说明：
 - api/: API 路由层（类似前端 views）
 - schemas/: 数据模型定义（类似前端 types）
@@ -17,15 +20,17 @@
 - core/: 核心配置和工具
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import threading
+import multiprocessing
 import uvicorn
 
-# 导入核心模块（从 domain 层）
-from domain import StockMonitor, RecordsManager, SimulationManager, NotesManager
 from core.config import get_data_dir
+from core.bulkhead import BulkheadFull
+from providers import close_async_clients
 
 # 导入 API 路由
 from api import (
@@ -40,6 +45,9 @@ from api import (
     simulation_router,
     notes_router,
     data_router,
+    stream_router,
+    portfolio_router,
+    backtest_router,
 )
 
 # 导入依赖注入函数
@@ -53,23 +61,58 @@ from api import records as records_api
 from api import simulation as simulation_api
 from api import notes as notes_api
 from api import data as data_api
+from api import stream as stream_api
+from api import portfolio as portfolio_api
+from api import backtest as backtest_api
 
 
 # ========== 创建实例 ==========
-monitor = StockMonitor()
-records_manager = RecordsManager(get_data_dir())
-notes_manager = NotesManager(get_data_dir())
-simulation_manager = SimulationManager(get_data_dir())
+def create_instances():
+    """
+    创建各模块实例并注入 API 层
+
+    Returns:
+        (monitor, simulation_manager)
+    """
+    # 导入核心模块（从 domain 层）
+    from domain import StockMonitor, RecordsManager, SimulationManager, NotesManager
+    from domain.portfolio_engine import PortfolioEngine
+
+    monitor = StockMonitor()
+    records_manager = RecordsManager(get_data_dir())
+    notes_manager = NotesManager(get_data_dir())
+    simulation_manager = SimulationManager(get_data_dir())
+    monitor.set_portfolio_engine(PortfolioEngine(records_manager.ledger))
+
+    # ========== 依赖注入 ==========
+    stocks_api.set_monitor(monitor)
+    stock_detail_api.set_monitor(monitor)
+    settings_api.set_monitor(monitor)
+    alerts_api.set_monitor(monitor)
+    market_api.set_monitor(monitor)
+    data_api.set_monitor(monitor)
+    stream_api.set_monitor(monitor)
+    portfolio_api.set_monitor(monitor)
+    backtest_api.set_monitor(monitor)
+    ai_api.set_dependencies(monitor, records_manager)
+    records_api.set_records_manager(records_manager)
+    simulation_api.set_dependencies(monitor, simulation_manager)
+    notes_api.set_notes_manager(notes_manager)
+
+    return monitor, simulation_manager
 
 
 # ========== 应用生命周期管理 ==========
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """应用生命周期：启动时开启监控线程，关闭时停止监控"""
+    """应用生命周期：启动时创建实例并开启监控线程，关闭时停止监控"""
+    monitor, simulation_manager = create_instances()
     monitor_thread = threading.Thread(target=monitor.start, daemon=True)
     monitor_thread.start()
     yield
     monitor.stop()
+    simulation_manager.close()
+    await close_async_clients()
 
 
 # ========== 初始化 FastAPI 应用 ==========
@@ -90,17 +133,10 @@ app.add_middleware(
 )
 
 
-# ========== 依赖注入 ==========
-stocks_api.set_monitor(monitor)
-stock_detail_api.set_monitor(monitor)
-settings_api.set_monitor(monitor)
-alerts_api.set_monitor(monitor)
-market_api.set_monitor(monitor)
-data_api.set_monitor(monitor)
-ai_api.set_dependencies(monitor, records_manager)
-records_api.set_records_manager(records_manager)
-simulation_api.set_dependencies(monitor, simulation_manager)
-notes_api.set_notes_manager(notes_manager)
+# 分舱等待队列已满时快速失败（503），不无限排队
+@app.exception_handler(BulkheadFull)
+async def bulkhead_full_handler(request: Request, exc: BulkheadFull):
+    return JSONResponse(status_code=503, content={"status": "error", "message": str(exc)})
 
 
 # ========== 注册路由 ==========
@@ -115,8 +151,13 @@ app.include_router(records_router)
 app.include_router(simulation_router)
 app.include_router(notes_router)
 app.include_router(data_router)
+app.include_router(stream_router)
+app.include_router(portfolio_router)
+app.include_router(backtest_router)
 
 
 # ========== 启动入口 ==========
 if __name__ == "__main__":
+    # 打包后的程序中，参数优化的工作进程从这里进入
+    multiprocessing.freeze_support()
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -13,6 +13,7 @@ AI 模型提供商模块
 2. 统一的 ProviderConfig 配置结构
 3. 协议映射 PROTOCOL_MAP
 4. 厂商注册表 PROVIDER_REGISTRY
+5. 同步 chat() 与异步 achat() 共用请求构建和响应解析
 """
 
 from .config import ProviderConfig, PROVIDER_REGISTRY, get_provider_list
@@ -25,6 +26,7 @@ from .protocols import (
     GLMProtocol,
     PROTOCOL_MAP,
     get_protocol,
+    close_async_clients,
 )
 
 __all__ = [
@@ -39,4 +41,5 @@ __all__ = [
     "GLMProtocol",
     "PROTOCOL_MAP",
     "get_protocol",
+    "close_async_clients",
 ]
@@ -9,20 +9,29 @@ AI 模型协议抽象模块
 5. DoubaoProtocol - 字节豆包原生协议
 6. GLMProtocol - 智谱 GLM 原生协议
 
-每个协议实现两个核心方法：
+每个协议实现三个核心方法：
 - get_models(): 获取可用模型列表
-- chat(): 调用模型进行对话
+- _build_chat_request(): 构建对话请求（地址、请求头、请求体）
+- _parse_chat_response(): 从响应中提取回复文本
+
+基类据此提供同步 chat() 和异步 achat()；
+异步请求使用按代理地址共享的 httpx.AsyncClient（连接复用，不占用线程）；
+请求经过按主机的熔断器，模型服务连续故障时快速失败
 """
 
+import asyncio
+import functools
 import json
 import logging
 import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 import requests
 import urllib3
+from urllib.parse import urlsplit
 
+from core.http_client import CircuitBreaker, get_http_client
 from .config import ProviderConfig, PROVIDER_REGISTRY
 
 # 禁用 SSL 警告
@@ -38,6 +47,10 @@ try:
 except ImportError:
     HAS_HTTPX = False
 
+# 异步客户端连接池限制
+ASYNC_MAX_CONNECTIONS = 32
+ASYNC_MAX_KEEPALIVE = 8
+
 
 # ========== 错误码映射 ==========
 ERROR_MESSAGES = {
@@ -56,7 +69,8 @@ class BaseProtocol(ABC):
     
     所有协议实现都需要继承此类并实现以下方法：
     - get_models(): 获取模型列表
-    - chat(): 调用模型对话
+    - _build_chat_request(): 构建对话请求
+    - _parse_chat_response(): 解析对话响应
     """
     
     @staticmethod
@@ -79,6 +93,46 @@ class BaseProtocol(ABC):
             proxy = f"http://{proxy}"
         return {"http": proxy, "https": proxy}
     
+    @staticmethod
+    def _get_proxy_url(proxy: str = None) -> Optional[str]:
+        """构建 httpx 的代理地址"""
+        if not proxy:
+            return None
+        proxy = proxy.strip()
+        if not proxy.startswith("http://") and not proxy.startswith("https://"):
+            return f"http://{proxy}"
+        return proxy
+    
+    @staticmethod
+    def _get_breaker(url: str) -> CircuitBreaker:
+        """获取模型服务主机的熔断器（与行情接口共用 HttpClient 的熔断器表）"""
+        return get_http_client().get_breaker(urlsplit(url).hostname or "")
+    
+    @staticmethod
+    def _record_status(breaker: CircuitBreaker, status_code: int):
+        """
+        按响应状态码记录熔断结果
+        
+        只有 5xx 计为失败；429、401 等与 API Key 相关，不代表服务不可用
+        """
+        if status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+    
+    @staticmethod
+    def _raise_requests_error(e: Exception):
+        """将 httpx 异常转换为 requests 异常（调用方统一按 requests 异常处理）"""
+        if isinstance(e, httpx.HTTPStatusError):
+            raise requests.exceptions.HTTPError(response=e.response)
+        if isinstance(e, httpx.ProxyError):
+            raise requests.exceptions.ProxyError(str(e))
+        if isinstance(e, httpx.ConnectError):
+            raise requests.exceptions.ConnectionError(str(e))
+        if isinstance(e, httpx.TimeoutException):
+            raise requests.exceptions.Timeout(str(e))
+        raise e
+    
     @staticmethod
     def _make_request(method: str, url: str, proxy: str = None, **kwargs) -> Dict:
         """
@@ -87,45 +141,133 @@ class BaseProtocol(ABC):
         优先使用 httpx（更好的代理和 SSL 支持），回退到 requests
         """
         timeout = kwargs.pop("timeout", 60)
+        breaker = BaseProtocol._get_breaker(url)
+        breaker.before_request()
+        # 未记录成功或失败就退出时（如代理地址格式错误）释放半开试探名额
+        recorded = False
+        try:
+            if HAS_HTTPX:
+                try:
+                    with httpx.Client(
+                        proxy=BaseProtocol._get_proxy_url(proxy),
+                        timeout=timeout,
+                        verify=False,
+                        follow_redirects=True,
+                    ) as client:
+                        if method.upper() == "GET":
+                            response = client.get(url, **kwargs)
+                        else:
+                            response = client.post(url, **kwargs)
+                except httpx.RequestError as e:
+                    breaker.record_failure()
+                    recorded = True
+                    BaseProtocol._raise_requests_error(e)
+            else:
+                proxies = BaseProtocol._get_requests_proxies(proxy)
+                try:
+                    if method.upper() == "GET":
+                        response = requests.get(url, proxies=proxies, timeout=timeout, verify=False, **kwargs)
+                    else:
+                        response = requests.post(url, proxies=proxies, timeout=timeout, verify=False, **kwargs)
+                except requests.exceptions.RequestException:
+                    breaker.record_failure()
+                    recorded = True
+                    raise
+            BaseProtocol._record_status(breaker, response.status_code)
+            recorded = True
+        finally:
+            if not recorded:
+                breaker.release()
         
         if HAS_HTTPX:
-            proxy_url = None
-            if proxy:
-                proxy = proxy.strip()
-                if not proxy.startswith("http://") and not proxy.startswith("https://"):
-                    proxy_url = f"http://{proxy}"
-                else:
-                    proxy_url = proxy
-            
             try:
-                with httpx.Client(
-                    proxy=proxy_url,
-                    timeout=timeout,
-                    verify=False,
-                    follow_redirects=True,
-                ) as client:
-                    if method.upper() == "GET":
-                        response = client.get(url, **kwargs)
-                    else:
-                        response = client.post(url, **kwargs)
-                    response.raise_for_status()
-                    return response.json()
+                response.raise_for_status()
             except httpx.HTTPStatusError as e:
-                raise requests.exceptions.HTTPError(response=e.response)
-            except httpx.ProxyError as e:
-                raise requests.exceptions.ProxyError(str(e))
-            except httpx.ConnectError as e:
-                raise requests.exceptions.ConnectionError(str(e))
-            except httpx.TimeoutException as e:
-                raise requests.exceptions.Timeout(str(e))
+                BaseProtocol._raise_requests_error(e)
         else:
-            proxies = BaseProtocol._get_requests_proxies(proxy)
-            if method.upper() == "GET":
-                response = requests.get(url, proxies=proxies, timeout=timeout, verify=False, **kwargs)
-            else:
-                response = requests.post(url, proxies=proxies, timeout=timeout, verify=False, **kwargs)
             response.raise_for_status()
-            return response.json()
+        return response.json()
+    
+    @staticmethod
+    async def _make_request_async(method: str, url: str, proxy: str = None, **kwargs) -> Dict:
+        """
+        统一的异步 HTTP 请求方法
+        
+        使用共享的 httpx.AsyncClient；未安装 httpx 时在线程池中执行同步请求
+        """
+        if not HAS_HTTPX:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                None, functools.partial(BaseProtocol._make_request, method, url, proxy, **kwargs)
+            )
+        
+        timeout = kwargs.pop("timeout", 60)
+        breaker = BaseProtocol._get_breaker(url)
+        breaker.before_request()
+        # 未记录成功或失败就退出时（请求被取消、代理地址格式错误等）释放半开试探名额
+        recorded = False
+        try:
+            client = get_async_client(BaseProtocol._get_proxy_url(proxy))
+            try:
+                response = await client.request(method.upper(), url, timeout=timeout, **kwargs)
+            except httpx.RequestError as e:
+                breaker.record_failure()
+                recorded = True
+                BaseProtocol._raise_requests_error(e)
+            BaseProtocol._record_status(breaker, response.status_code)
+            recorded = True
+        finally:
+            if not recorded:
+                breaker.release()
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            BaseProtocol._raise_requests_error(e)
+        return response.json()
+    
+    def chat(
+        self,
+        config: ProviderConfig,
+        api_key: str,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        proxy: str = None,
+        base_url: str = None,
+    ) -> str:
+        """
+        调用模型进行对话
+        
+        Args:
+            config: 提供商配置
+            api_key: API Key
+            model: 模型 ID
+            system_prompt: 系统提示词
+            user_prompt: 用户提示词
+            proxy: 代理地址
+            base_url: 自定义 API 地址
+            
+        Returns:
+            模型回复文本
+        """
+        url, headers, data = self._build_chat_request(config, api_key, model, system_prompt, user_prompt, base_url)
+        res_json = self._make_request("POST", url, proxy=proxy, headers=headers, json=data, timeout=90)
+        return self._parse_chat_response(res_json)
+    
+    async def achat(
+        self,
+        config: ProviderConfig,
+        api_key: str,
+        model: str,
+        system_prompt: str,
+        user_prompt: str,
+        proxy: str = None,
+        base_url: str = None,
+    ) -> str:
+        """调用模型进行对话（异步，参数同 chat）"""
+        url, headers, data = self._build_chat_request(config, api_key, model, system_prompt, user_prompt, base_url)
+        res_json = await self._make_request_async("POST", url, proxy=proxy, headers=headers, json=data, timeout=90)
+        return self._parse_chat_response(res_json)
     
     @abstractmethod
     def get_models(self, config: ProviderConfig, api_key: str, proxy: str = None, base_url: str = None) -> List[Dict]:
@@ -144,18 +286,17 @@ class BaseProtocol(ABC):
         pass
     
     @abstractmethod
-    def chat(
+    def _build_chat_request(
         self,
         config: ProviderConfig,
         api_key: str,
         model: str,
         system_prompt: str,
         user_prompt: str,
-        proxy: str = None,
         base_url: str = None,
-    ) -> str:
+    ) -> Tuple[str, Dict, Dict]:
         """
-        调用模型进行对话
+        构建对话请求
         
         Args:
             config: 提供商配置
@@ -163,7 +304,20 @@ class BaseProtocol(ABC):
             model: 模型 ID
             system_prompt: 系统提示词
             user_prompt: 用户提示词
-            proxy: 代理地址
+            base_url: 自定义 API 地址
+            
+        Returns:
+            (url, headers, json_body)
+        """
+        pass
+    
+    @abstractmethod
+    def _parse_chat_response(self, res_json: Dict) -> str:
+        """
+        从响应中提取模型回复文本
+        
+        Args:
+            res_json: 响应 JSON
             
         Returns:
             模型回复文本
@@ -208,17 +362,16 @@ class OpenAICompatibleProtocol(BaseProtocol):
             logger.warning(f"获取模型列表失败 ({config.id}): {e}")
             return config.default_models or []
     
-    def chat(
+    def _build_chat_request(
         self,
         config: ProviderConfig,
         api_key: str,
         model: str,
         system_prompt: str,
         user_prompt: str,
-        proxy: str = None,
         base_url: str = None,
-    ) -> str:
-        """调用 OpenAI 兼容格式的聊天接口"""
+    ) -> Tuple[str, Dict, Dict]:
+        """构建 OpenAI 兼容格式的聊天请求"""
         base = base_url or config.base_url
         url = f"{base}/v1/chat/completions"
         headers = {
@@ -232,8 +385,10 @@ class OpenAICompatibleProtocol(BaseProtocol):
                 {"role": "user", "content": user_prompt},
             ],
         }
-        
-        res_json = self._make_request("POST", url, proxy=proxy, headers=headers, json=data, timeout=90)
+        return url, headers, data
+    
+    def _parse_chat_response(self, res_json: Dict) -> str:
+        """解析 OpenAI 兼容格式的聊天响应"""
         return res_json["choices"][0]["message"]["content"]
 
 
@@ -264,17 +419,16 @@ class GeminiProtocol(BaseProtocol):
             logger.warning(f"获取 Gemini 模型列表失败: {e}")
             return config.default_models or []
     
-    def chat(
+    def _build_chat_request(
         self,
         config: ProviderConfig,
         api_key: str,
         model: str,
         system_prompt: str,
         user_prompt: str,
-        proxy: str = None,
         base_url: str = None,
-    ) -> str:
-        """调用 Gemini 聊天接口"""
+    ) -> Tuple[str, Dict, Dict]:
+        """构建 Gemini 聊天请求"""
         if not model:
             model = "gemini-1.5-flash"
         
@@ -284,9 +438,10 @@ class GeminiProtocol(BaseProtocol):
         # Gemini 使用 contents 格式
         full_prompt = f"{system_prompt}\n\nUser Request:\n{user_prompt}"
         data = {"contents": [{"parts": [{"text": full_prompt}]}]}
-        
-        res_json = self._make_request("POST", url, proxy=proxy, headers=headers, json=data, timeout=90)
-        
+        return url, headers, data
+    
+    def _parse_chat_response(self, res_json: Dict) -> str:
+        """解析 Gemini 聊天响应"""
         try:
             return res_json["candidates"][0]["content"]["parts"][0]["text"]
         except (KeyError, IndexError):
@@ -302,17 +457,16 @@ class ClaudeProtocol(BaseProtocol):
         """Claude 没有公开的模型列表 API，返回默认模型"""
         return config.default_models or []
     
-    def chat(
+    def _build_chat_request(
         self,
         config: ProviderConfig,
         api_key: str,
         model: str,
         system_prompt: str,
         user_prompt: str,
-        proxy: str = None,
         base_url: str = None,
-    ) -> str:
-        """调用 Claude 聊天接口"""
+    ) -> Tuple[str, Dict, Dict]:
+        """构建 Claude 聊天请求"""
         url = f"{config.base_url}/v1/messages"
         headers = {
             "x-api-key": api_key,
@@ -325,8 +479,10 @@ class ClaudeProtocol(BaseProtocol):
             "messages": [{"role": "user", "content": user_prompt}],
             "max_tokens": 4096,
         }
-        
-        res_json = self._make_request("POST", url, proxy=proxy, headers=headers, json=data, timeout=90)
+        return url, headers, data
+    
+    def _parse_chat_response(self, res_json: Dict) -> str:
+        """解析 Claude 聊天响应"""
         return res_json["content"][0]["text"]
 
 
@@ -349,18 +505,17 @@ class DoubaoProtocol(BaseProtocol):
         # 豆包需要用户自己创建 endpoint，这里返回默认模型作为参考
         return config.default_models or []
     
-    def chat(
+    def _build_chat_request(
         self,
         config: ProviderConfig,
         api_key: str,
         model: str,
         system_prompt: str,
         user_prompt: str,
-        proxy: str = None,
         base_url: str = None,
-    ) -> str:
+    ) -> Tuple[str, Dict, Dict]:
         """
-        调用豆包聊天接口
+        构建豆包聊天请求
         
         豆包使用 OpenAI 兼容格式，但 model 字段需要填入 endpoint_id
         """
@@ -376,8 +531,10 @@ class DoubaoProtocol(BaseProtocol):
                 {"role": "user", "content": user_prompt},
             ],
         }
-        
-        res_json = self._make_request("POST", url, proxy=proxy, headers=headers, json=data, timeout=90)
+        return url, headers, data
+    
+    def _parse_chat_response(self, res_json: Dict) -> str:
+        """解析豆包聊天响应"""
         return res_json["choices"][0]["message"]["content"]
 
 
@@ -432,17 +589,16 @@ class GLMProtocol(BaseProtocol):
         # GLM 没有公开的模型列表 API，返回默认模型
         return config.default_models or []
     
-    def chat(
+    def _build_chat_request(
         self,
         config: ProviderConfig,
         api_key: str,
         model: str,
         system_prompt: str,
         user_prompt: str,
-        proxy: str = None,
         base_url: str = None,
-    ) -> str:
-        """调用 GLM 聊天接口"""
+    ) -> Tuple[str, Dict, Dict]:
+        """构建 GLM 聊天请求"""
         url = f"{config.base_url}/chat/completions"
         
         # 生成 JWT Token
@@ -459,11 +615,54 @@ class GLMProtocol(BaseProtocol):
                 {"role": "user", "content": user_prompt},
             ],
         }
-        
-        res_json = self._make_request("POST", url, proxy=proxy, headers=headers, json=data, timeout=90)
+        return url, headers, data
+    
+    def _parse_chat_response(self, res_json: Dict) -> str:
+        """解析 GLM 聊天响应"""
         return res_json["choices"][0]["message"]["content"]
 
 
+# ========== 共享异步客户端 ==========
+# {代理地址: (事件循环, 客户端)}，客户端绑定创建时的事件循环
+_async_clients: Dict[Optional[str], Tuple[Any, Any]] = {}
+
+
+def get_async_client(proxy_url: Optional[str] = None) -> "httpx.AsyncClient":
+    """
+    获取共享的异步 HTTP 客户端（按代理地址区分，必须在事件循环中调用）
+    
+    Args:
+        proxy_url: 代理地址（已规范化）
+        
+    Returns:
+        httpx.AsyncClient 实例
+    """
+    loop = asyncio.get_running_loop()
+    cached = _async_clients.get(proxy_url)
+    if cached is not None and cached[0] is loop:
+        return cached[1]
+    client = httpx.AsyncClient(
+        proxy=proxy_url,
+        verify=False,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=ASYNC_MAX_CONNECTIONS,
+            max_keepalive_connections=ASYNC_MAX_KEEPALIVE,
+        ),
+    )
+    _async_clients[proxy_url] = (loop, client)
+    return client
+
+
+async def close_async_clients():
+    """关闭当前事件循环创建的共享异步客户端（应用关闭时调用）"""
+    loop = asyncio.get_running_loop()
+    for proxy_url, (client_loop, client) in list(_async_clients.items()):
+        if client_loop is loop:
+            await client.aclose()
+            _async_clients.pop(proxy_url, None)
+
+
 # ========== 协议映射表 ==========
 PROTOCOL_MAP: Dict[str, BaseProtocol] = {
     "openai": OpenAICompatibleProtocol(),
@@ -4,10 +4,10 @@
 本模块负责数据的持久化存储，包括：
 - 交易记录存储
 - AI 分析记录存储
-- 模拟会话存储
+- 模拟会话存储（simulation_journal: 追加写日志 + 快照）
 - 笔记存储
 
-注意：当前实现使用 JSON 文件存储，后续可扩展为数据库
+注意：交易记录使用 SQLite 存储，模拟会话使用追加写日志，其余仍使用 JSON / Markdown 文件存储
 """
 
 from .records_repo import RecordsRepository
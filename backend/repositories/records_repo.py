@@ -2,13 +2,234 @@
 交易记录数据存储
 
 封装交易记录和 AI 分析记录的存储操作
-当前使用 JSON 文件存储，后续可替换为数据库
+使用 SQLite（WAL 模式）存储，每次增删改只写入单条记录
+
+表结构：
+- trade_records: 交易记录（按 code_key + trade_time 建索引）
+- ai_records: AI 分析记录（按 code_key + datetime 建索引）
+
+每条记录的完整内容以 JSON 存于 data 列，查询条件列单独存储并建索引，
+记录新增字段时无需迁移表结构
 """
 
-# 注意：当前实现复用 records.py 中的 RecordsManager
-# 后续可将其重构为纯数据访问层
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trade_records (
+    id TEXT PRIMARY KEY,
+    stock_code TEXT NOT NULL,
+    code_key TEXT NOT NULL,
+    trade_time TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_trade_code_time ON trade_records(code_key, trade_time);
+CREATE INDEX IF NOT EXISTS idx_trade_time ON trade_records(trade_time);
+
+CREATE TABLE IF NOT EXISTS ai_records (
+    id TEXT PRIMARY KEY,
+    stock_code TEXT NOT NULL,
+    code_key TEXT NOT NULL,
+    datetime TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_ai_code_time ON ai_records(code_key, datetime);
+CREATE INDEX IF NOT EXISTS idx_ai_time ON ai_records(datetime);
+"""
+
+# 表名 → 排序列
+TIME_COLUMNS = {"trade_records": "trade_time", "ai_records": "datetime"}
+
+
+def code_key(stock_code: str) -> str:
+    """
+    股票代码索引键（去掉 sh/sz 等前缀，取后 6 位）
+
+    "sh600000" 与 "600000" 的索引键相同，用于兼容带前缀/不带前缀的模糊匹配
+    """
+    return (stock_code or "")[-6:]
+
+
+def code_matches(record_code: str, stock_code: str) -> bool:
+    """与原 JSON 实现一致的代码匹配规则（带前缀或不带前缀）"""
+    return (
+        record_code == stock_code
+        or record_code.endswith(stock_code)
+        or stock_code.endswith(record_code)
+    )
+
+
+class RecordsRepository:
+    """
+    交易记录 SQLite 存储
+
+    单连接 + 锁，适用于 FastAPI 同步路由所在的线程池
+    """
+
+    def __init__(self, db_file: Path):
+        """
+        初始化存储
+
+        Args:
+            db_file: 数据库文件路径
+        """
+        self.db_file = db_file
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    # ========== 写入 ==========
+
+    @staticmethod
+    def _row_values(table: str, record: Dict) -> Tuple:
+        code = record.get("stock_code", "")
+        return (
+            record["id"],
+            code,
+            code_key(code),
+            record.get(TIME_COLUMNS[table], "") or "",
+            json.dumps(record, ensure_ascii=False),
+        )
+
+    def insert(self, table: str, record: Dict):
+        """插入一条记录"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {table} (id, stock_code, code_key, {TIME_COLUMNS[table]}, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                self._row_values(table, record)
+            )
+
+    def insert_many(self, table: str, records: List[Dict]):
+        """批量插入记录（单个事务）"""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO {table} (id, stock_code, code_key, {TIME_COLUMNS[table]}, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [self._row_values(table, r) for r in records]
+            )
+
+    def update(self, table: str, record: Dict):
+        """更新一条记录（整条覆盖）"""
+        record_id, code, key, time_value, data = self._row_values(table, record)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE {table} SET stock_code = ?, code_key = ?, {TIME_COLUMNS[table]} = ?, data = ? "
+                "WHERE id = ?",
+                (code, key, time_value, data, record_id)
+            )
+
+    def delete(self, table: str, record_id: str) -> bool:
+        """删除一条记录"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(f"DELETE FROM {table} WHERE id = ?", (record_id,))
+            return cursor.rowcount > 0
+
+    def trim(self, table: str, keep: int):
+        """只保留最近插入的 keep 条记录"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"DELETE FROM {table} WHERE rowid NOT IN "
+                f"(SELECT rowid FROM {table} ORDER BY rowid DESC LIMIT ?)",
+                (keep,)
+            )
+
+    # ========== 查询 ==========
+
+    def get(self, table: str, record_id: str) -> Optional[Dict]:
+        """按 ID 获取记录"""
+        with self._lock:
+            row = self._conn.execute(f"SELECT data FROM {table} WHERE id = ?", (record_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def query(
+        self,
+        table: str,
+        stock_code: Optional[str] = None,
+        limit: int = 100,
+        offset: int = 0,
+        ascending: bool = False,
+    ) -> List[Dict]:
+        """
+        按时间排序分页查询
+
+        Args:
+            table: trade_records / ai_records
+            stock_code: 股票代码（可选，带前缀或不带前缀均可）
+            limit: 返回数量
+            offset: 跳过数量
+            ascending: 是否按时间正序
+
+        Returns:
+            记录列表
+        """
+        order = "ASC" if ascending else "DESC"
+        time_column = TIME_COLUMNS[table]
+
+        if not stock_code:
+            sql = f"SELECT data FROM {table} ORDER BY {time_column} {order}, rowid LIMIT ? OFFSET ?"
+            with self._lock:
+                rows = self._conn.execute(sql, (limit, offset)).fetchall()
+            return [json.loads(row[0]) for row in rows]
+
+        if len(stock_code) >= 6:
+            # 索引查询：候选集按 code_key 过滤，再按原规则精确匹配
+            sql = (
+                f"SELECT stock_code, data FROM {table} WHERE code_key = ? "
+                f"ORDER BY {time_column} {order}, rowid"
+            )
+            params: Tuple = (code_key(stock_code),)
+        else:
+            sql = f"SELECT stock_code, data FROM {table} ORDER BY {time_column} {order}, rowid"
+            params = ()
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        matched = [data for code, data in rows if code_matches(code, stock_code)]
+        return [json.loads(data) for data in matched[offset:offset + limit]]
+
+    def scan(self, table: str, key: Optional[str] = None) -> List[Dict]:
+        """
+        按时间正序读取全部记录（不分页）
+
+        Args:
+            table: trade_records / ai_records
+            key: 股票代码索引键（可选，见 code_key）
+
+        Returns:
+            记录列表
+        """
+        time_column = TIME_COLUMNS[table]
+        if key is None:
+            sql = f"SELECT data FROM {table} ORDER BY {time_column}, rowid"
+            params: Tuple = ()
+        else:
+            sql = f"SELECT data FROM {table} WHERE code_key = ? ORDER BY {time_column}, rowid"
+            params = (key,)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
 
-from domain.records_manager import RecordsManager
+    def count(self, table: str) -> int:
+        """记录总数"""
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
 
-# 导出别名，保持接口一致
-RecordsRepository = RecordsManager
+    def distinct_codes(self, table: str) -> List[str]:
+        """所有出现过的股票代码"""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT DISTINCT stock_code FROM {table}").fetchall()
+        return [row[0] for row in rows]
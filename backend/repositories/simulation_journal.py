@@ -0,0 +1,243 @@
+"""
+模拟会话日志存储
+
+以追加写日志 + 定期快照的方式持久化模拟会话：
+1. 每次会话变更只追加一行事件（JSON Lines），不再重写全部会话
+2. 内存中保存物化后的会话状态，启动时由 快照 + 日志重放 恢复
+3. 每次追加都 flush 到操作系统，fsync 由后台线程批量执行（默认每秒一次）
+4. 日志事件数超过阈值时，后台线程将当前状态写入快照并轮换日志
+
+文件：
+- simulations.snapshot.json: 快照 {"seq": 最后事件序号, "sessions": [...]}
+- simulations.journal.jsonl: 快照之后的事件
+- simulations.journal.compacting.jsonl: 压缩过程中被轮换出的旧日志（压缩完成后删除）
+- simulations.json: 旧版全量 JSON，首次加载时作为初始快照迁移
+
+事件类型：
+- created: {"session": {...}}
+- trade / paused / resumed / abandoned / completed: {"id", "set": {字段: 新值}, "trade": {...}?}
+- deleted: {"id"}
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+class SimulationJournal:
+    """
+    模拟会话追加写日志
+
+    调用方在修改内存状态并追加事件时需持有 lock，保证快照与事件序号一致
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        fsync_interval: float = 1.0,
+        compact_threshold: int = 1000,
+    ):
+        """
+        初始化日志
+
+        Args:
+            data_dir: 数据存储目录
+            fsync_interval: 批量 fsync 间隔（秒）
+            compact_threshold: 日志事件数超过该值时触发压缩
+        """
+        self.data_dir = data_dir
+        self.snapshot_file = data_dir / "simulations.snapshot.json"
+        self.journal_file = data_dir / "simulations.journal.jsonl"
+        self.compacting_file = data_dir / "simulations.journal.compacting.jsonl"
+        self.legacy_file = data_dir / "simulations.json"
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+
+        self.lock = threading.RLock()
+        self._seq = 0
+        self._journal_events = 0
+        self._dirty = False
+        self._file = None
+        self._state_provider: Optional[Callable[[], List[Dict]]] = None
+
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ========== 加载 ==========
+
+    @staticmethod
+    def apply(sessions: Dict[str, Dict], event: Dict):
+        """将一个事件应用到会话字典 {id: session}"""
+        op = event.get("op")
+        if op == "created":
+            session = event["session"]
+            sessions[session["id"]] = session
+        elif op == "deleted":
+            sessions.pop(event["id"], None)
+        else:
+            session = sessions.get(event.get("id"))
+            if session is None:
+                return
+            session.update(event.get("set", {}))
+            if "trade" in event:
+                session.setdefault("trades", []).append(event["trade"])
+
+    def _replay(self, path: Path, sessions: Dict[str, Dict], after_seq: int) -> int:
+        """重放日志文件，返回应用的事件数（末尾不完整的行被忽略）"""
+        if not path.exists():
+            return 0
+        applied = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # 崩溃时最后一行可能未写完整
+                    break
+                if event.get("seq", 0) <= after_seq:
+                    continue
+                self.apply(sessions, event)
+                self._seq = max(self._seq, event["seq"])
+                applied += 1
+        return applied
+
+    def load(self) -> List[Dict]:
+        """
+        加载会话（快照 + 日志重放）
+
+        Returns:
+            会话列表（按创建顺序）
+        """
+        sessions: Dict[str, Dict] = {}
+        snapshot_seq = 0
+
+        if self.snapshot_file.exists():
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            snapshot_seq = snapshot.get("seq", 0)
+            sessions = {s["id"]: s for s in snapshot.get("sessions", [])}
+        elif self.legacy_file.exists():
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+            sessions = {s["id"]: s for s in legacy.get("sessions", [])}
+            self._write_snapshot(json.dumps({"seq": 0, "sessions": list(sessions.values())}, ensure_ascii=False))
+            self.legacy_file.replace(self.legacy_file.with_name("simulations.json.migrated"))
+            print("已迁移 simulations.json 到日志存储")
+
+        self._seq = snapshot_seq
+        self._journal_events = self._replay(self.compacting_file, sessions, snapshot_seq)
+        self._journal_events += self._replay(self.journal_file, sessions, snapshot_seq)
+        return list(sessions.values())
+
+    # ========== 写入 ==========
+
+    def start(self, state_provider: Callable[[], List[Dict]]):
+        """
+        打开日志文件并启动后台线程
+
+        Args:
+            state_provider: 返回当前全部会话的函数（压缩时调用，调用时已持有 lock）
+        """
+        self._state_provider = state_provider
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        if self.compacting_file.exists():
+            # 上次压缩未完成：已加载的状态包含两份日志的全部事件，直接写入快照
+            self._write_snapshot(json.dumps({"seq": self._seq, "sessions": state_provider()}, ensure_ascii=False))
+            self.compacting_file.unlink()
+            self.journal_file.unlink(missing_ok=True)
+            self._journal_events = 0
+        self._file = open(self.journal_file, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._worker, name="simulation-journal", daemon=True)
+        self._thread.start()
+
+    def append(self, op: str, **fields):
+        """
+        追加一个事件
+
+        Args:
+            op: 事件类型
+            fields: 事件内容
+        """
+        with self.lock:
+            self._seq += 1
+            event = {"seq": self._seq, "op": op, **fields}
+            self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self._dirty = True
+            self._journal_events += 1
+            if self._journal_events >= self.compact_threshold:
+                self._wakeup.set()
+
+    def _fsync(self):
+        """将已写入的事件落盘"""
+        with self.lock:
+            if not self._dirty or self._file is None:
+                return
+            os.fsync(self._file.fileno())
+            self._dirty = False
+
+    # ========== 压缩 ==========
+
+    def _write_snapshot(self, text: str):
+        """原子写入快照"""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.snapshot_file.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_file)
+
+    def compact(self):
+        """将当前状态写入快照并清空日志"""
+        with self.lock:
+            if self._file is None or self._state_provider is None:
+                return
+            # 在锁内序列化状态并轮换日志，锁外写快照
+            text = json.dumps({"seq": self._seq, "sessions": self._state_provider()}, ensure_ascii=False)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self.journal_file, self.compacting_file)
+            self._file = open(self.journal_file, 'a', encoding='utf-8')
+            self._journal_events = 0
+            self._dirty = False
+
+        self._write_snapshot(text)
+        self.compacting_file.unlink(missing_ok=True)
+
+    def _worker(self):
+        """后台线程：批量 fsync，按需压缩"""
+        while not self._stop.is_set():
+            self._wakeup.wait(self.fsync_interval)
+            self._wakeup.clear()
+            try:
+                self._fsync()
+                if self._journal_events >= self.compact_threshold:
+                    self.compact()
+            except Exception as e:
+                print(f"模拟日志后台任务失败: {e}")
+
+    def close(self):
+        """停止后台线程并落盘"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        with self.lock:
+            if self._file is not None:
+                self._fsync()
+                self._file.close()
+                self._file = None
+
+    def get_stats(self) -> Dict:
+        """
+        获取日志状态
+
+        Returns:
+            {seq, journal_events}
+        """
+        return {"seq": self._seq, "journal_events": self._journal_events}
@@ -10,6 +10,7 @@ from .records import TradeRecordRequest, TradeRecordUpdateRequest, ImportMdReque
 from .simulation import SimulationCreateRequest, SimulationTradeRequest, SimulationAnalyzeRequest
 from .notes import NoteRequest, NoteUpdateRequest, NoteRenameRequest, NoteConvertRequest
 from .data import ImportDataRequest
+from .backtest import BacktestRequest, OptimizeRequest, ApplyOptimizationRequest
 
 __all__ = [
     "AnalyzeRequest",
@@ -25,4 +26,7 @@ __all__ = [
     "NoteRenameRequest",
     "NoteConvertRequest",
     "ImportDataRequest",
+    "BacktestRequest",
+    "OptimizeRequest",
+    "ApplyOptimizationRequest",
 ]
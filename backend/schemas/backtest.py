@@ -0,0 +1,47 @@
+"""
+策略回测相关数据模型
+"""
+
+from pydantic import BaseModel
+from typing import Optional, List, Dict
+
+
+class BacktestRequest(BaseModel):
+    """策略回测请求"""
+    strategy: str = "ma_cross"
+    params: Dict[str, float] = {}
+    codes: Optional[List[str]] = None
+    initial_capital: float = 100000
+    count: int = 2500
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    take_profit_pct: Optional[float] = None
+    stop_loss_pct: Optional[float] = None
+    use_alerts: bool = False
+    commission_rate: float = 0.00025
+    min_commission: float = 5
+    stamp_tax_rate: float = 0.0005
+
+
+class OptimizeRequest(BaseModel):
+    """策略参数优化请求"""
+    strategy: str = "ma_cross"
+    space: Dict[str, List[float]]
+    method: str = "grid"
+    samples: int = 50
+    seed: Optional[int] = None
+    objective: str = "sharpe"
+    train_days: int = 750
+    test_days: int = 250
+    codes: Optional[List[str]] = None
+    initial_capital: float = 100000
+    count: int = 2500
+    workers: Optional[int] = None
+    commission_rate: float = 0.00025
+    min_commission: float = 5
+    stamp_tax_rate: float = 0.0005
+
+
+class ApplyOptimizationRequest(BaseModel):
+    """应用优化结果到预警请求"""
+    codes: Optional[List[str]] = None
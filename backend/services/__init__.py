@@ -3,6 +3,7 @@
 
 本模块包含各种业务服务：
 - ai_service: AI 分析服务（支持多模型提供商）
+- analysis_context: AI 分析数据上下文（请求内去重、并发获取）
 """
 
 from .ai_service import AIService
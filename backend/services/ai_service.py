@@ -14,20 +14,25 @@ AI 分析服务模块
 
 主要功能：
 1. get_models(): 获取指定提供商的可用模型列表
-2. call_llm(): 调用 LLM 进行分析
-3. call_llm_with_signal(): 调用 LLM 并返回结构化结果
+2. call_llm() / call_llm_async(): 调用 LLM 进行分析
+3. call_llm_with_signal() / call_llm_with_signal_async(): 调用 LLM 并返回结构化结果
 4. format_data_for_prompt(): 格式化股票数据为提示词
+
+异步版本使用共享的异步 HTTP 客户端，等待模型响应期间不占用线程
 """
 
+import asyncio
 import json
 import time
 import logging
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 import requests
 
 from providers import PROVIDER_REGISTRY, get_protocol, get_provider_list
+from core.http_client import UpstreamUnavailable
+from core import indicators
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -42,6 +47,9 @@ ERROR_MESSAGES = {
     503: "服务暂时不可用，请稍后重试",
 }
 
+# 系统提示词
+SYSTEM_PROMPT = "你是一个专业的股票分析师，擅长技术面分析和基本面分析。请根据提供的股票数据，给出专业的趋势预测和操作建议。重点关注成交量变化与价格走势的配合关系。输出格式使用Markdown。"
+
 
 class AIService:
     """
@@ -98,6 +106,70 @@ class AIService:
             logger.error(f"获取模型列表失败: {e}")
             return []
     
+    @staticmethod
+    def _resolve_protocol(provider: str) -> Tuple[Any, Any, Optional[str]]:
+        """
+        获取提供商配置和协议实例
+        
+        Returns:
+            (config, protocol, error)，失败时 error 为错误信息
+        """
+        # 兼容旧的 provider 名称
+        provider_id = provider.lower()
+        if provider_id == "gpt":
+            provider_id = "openai"
+        
+        # 获取提供商配置
+        config = PROVIDER_REGISTRY.get(provider_id)
+        if not config:
+            return None, None, f"不支持的模型提供商: {provider}"
+        
+        # 获取协议实例
+        protocol = get_protocol(config.protocol)
+        if not protocol:
+            return config, None, f"未知的协议: {config.protocol}"
+        return config, protocol, None
+    
+    @staticmethod
+    def _handle_llm_error(e: Exception, attempt: int, max_retries: int, proxy: str = None) -> Tuple[Optional[float], str]:
+        """
+        处理 LLM 调用异常
+        
+        Returns:
+            (重试前等待秒数, 失败信息)，不重试时等待秒数为 None
+        """
+        can_retry = attempt < max_retries - 1
+        
+        if isinstance(e, requests.exceptions.HTTPError):
+            status_code = getattr(getattr(e, "response", None), "status_code", 0)
+            friendly_msg = ERROR_MESSAGES.get(status_code, f"HTTP 错误 {status_code}")
+            logger.error(f"LLM调用失败 (尝试 {attempt + 1}/{max_retries}): {friendly_msg}")
+            
+            if status_code == 429 and can_retry:
+                wait_time = (attempt + 1) * 5
+                logger.info(f"等待 {wait_time} 秒后重试...")
+                return wait_time, ""
+            return None, f"分析失败: {friendly_msg}"
+        
+        if isinstance(e, UpstreamUnavailable):
+            return None, "分析失败: 模型服务暂不可用（连续请求失败，已暂停请求），请稍后重试"
+        
+        if isinstance(e, requests.exceptions.ProxyError):
+            return None, f"分析失败: 代理连接失败（当前: {proxy}）"
+        
+        if isinstance(e, requests.exceptions.ConnectionError):
+            error_str = str(e)
+            if "ProxyError" in error_str or "proxy" in error_str.lower():
+                return None, f"分析失败: 代理连接失败"
+            return None, f"分析失败: 网络连接失败"
+        
+        if isinstance(e, requests.exceptions.Timeout):
+            if can_retry:
+                return 2, ""
+            return None, "分析失败: 请求超时"
+        
+        return None, f"分析失败: {str(e)}"
+    
     @staticmethod
     def call_llm(
         provider: str,
@@ -122,91 +194,57 @@ class AIService:
         Returns:
             模型回复文本
         """
-        system_prompt = "你是一个专业的股票分析师，擅长技术面分析和基本面分析。请根据提供的股票数据，给出专业的趋势预测和操作建议。重点关注成交量变化与价格走势的配合关系。输出格式使用Markdown。"
-        
-        # 兼容旧的 provider 名称
-        provider_id = provider.lower()
-        if provider_id == "gpt":
-            provider_id = "openai"
+        config, protocol, error = AIService._resolve_protocol(provider)
+        if error:
+            return error
         
-        # 获取提供商配置
-        config = PROVIDER_REGISTRY.get(provider_id)
-        if not config:
-            return f"不支持的模型提供商: {provider}"
-        
-        # 获取协议实例
-        protocol = get_protocol(config.protocol)
-        if not protocol:
-            return f"未知的协议: {config.protocol}"
-        
-        last_error = None
         for attempt in range(max_retries):
             try:
-                return protocol.chat(config, api_key, model, system_prompt, prompt, proxy, base_url)
-                
-            except requests.exceptions.HTTPError as e:
-                last_error = e
-                status_code = getattr(getattr(e, "response", None), "status_code", 0)
-                friendly_msg = ERROR_MESSAGES.get(status_code, f"HTTP 错误 {status_code}")
-                logger.error(f"LLM调用失败 (尝试 {attempt + 1}/{max_retries}): {friendly_msg}")
-                
-                if status_code == 429 and attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 5
-                    logger.info(f"等待 {wait_time} 秒后重试...")
-                    time.sleep(wait_time)
-                    continue
-                return f"分析失败: {friendly_msg}"
-                
-            except requests.exceptions.ProxyError as e:
-                return f"分析失败: 代理连接失败（当前: {proxy}）"
-                
-            except requests.exceptions.ConnectionError as e:
-                error_str = str(e)
-                if "ProxyError" in error_str or "proxy" in error_str.lower():
-                    return f"分析失败: 代理连接失败"
-                return f"分析失败: 网络连接失败"
-                
-            except requests.exceptions.Timeout:
-                if attempt < max_retries - 1:
-                    time.sleep(2)
-                    continue
-                return "分析失败: 请求超时"
-                
+                return protocol.chat(config, api_key, model, SYSTEM_PROMPT, prompt, proxy, base_url)
             except Exception as e:
-                return f"分析失败: {str(e)}"
+                wait_time, message = AIService._handle_llm_error(e, attempt, max_retries, proxy)
+                if wait_time is None:
+                    return message
+                time.sleep(wait_time)
         
         return f"分析失败: 重试 {max_retries} 次后仍然失败"
     
     @staticmethod
-    def call_llm_with_signal(
+    async def call_llm_async(
         provider: str,
         api_key: str,
         model: str,
         prompt: str,
         proxy: str = None,
         max_retries: int = 3,
-        is_precise: bool = False,
-        current_price: float = 0,
-        future_dates: List[str] = None,
         base_url: str = None,
-    ) -> Dict[str, Any]:
+    ) -> str:
         """
-        调用 LLM 并返回结构化结果
-        
-        Args:
-            provider: 提供商 ID
-            api_key: API Key
-            model: 模型 ID
-            prompt: 用户提示词
-            proxy: 代理地址
-            max_retries: 最大重试次数
-            is_precise: 是否精准分析
-            current_price: 当前价格
-            future_dates: 未来日期列表
-            
-        Returns:
-            {"result": str, "signal": str, "summary": str, "prediction": list}
+        调用 LLM API（异步，参数和返回值同 call_llm）
         """
+        config, protocol, error = AIService._resolve_protocol(provider)
+        if error:
+            return error
+        
+        for attempt in range(max_retries):
+            try:
+                return await protocol.achat(config, api_key, model, SYSTEM_PROMPT, prompt, proxy, base_url)
+            except Exception as e:
+                wait_time, message = AIService._handle_llm_error(e, attempt, max_retries, proxy)
+                if wait_time is None:
+                    return message
+                await asyncio.sleep(wait_time)
+        
+        return f"分析失败: 重试 {max_retries} 次后仍然失败"
+    
+    @staticmethod
+    def _build_structured_prompt(
+        prompt: str,
+        is_precise: bool = False,
+        current_price: float = 0,
+        future_dates: List[str] = None,
+    ) -> str:
+        """在提示词后追加结构化输出要求（信号、摘要，精准分析时还有价格预测）"""
         # 构建结构化输出要求
         if is_precise and future_dates:
             structured_prompt = prompt + f"""
@@ -258,10 +296,11 @@ signal 取值说明：
 - cautious: 谨慎，建议观望
 - bearish: 看跌，建议卖出或减仓
 """
-        
-        # 调用 LLM
-        result = AIService.call_llm(provider, api_key, model, structured_prompt, proxy, max_retries, base_url)
-        
+        return structured_prompt
+    
+    @staticmethod
+    def _parse_llm_result(result: str, is_precise: bool = False, current_price: float = 0) -> Dict[str, Any]:
+        """从模型回复中提取信号、摘要和价格预测"""
         # 检查是否失败
         if result.startswith("分析失败"):
             return {
@@ -286,6 +325,60 @@ signal 取值说明：
             "prediction": prediction
         }
     
+    @staticmethod
+    def call_llm_with_signal(
+        provider: str,
+        api_key: str,
+        model: str,
+        prompt: str,
+        proxy: str = None,
+        max_retries: int = 3,
+        is_precise: bool = False,
+        current_price: float = 0,
+        future_dates: List[str] = None,
+        base_url: str = None,
+    ) -> Dict[str, Any]:
+        """
+        调用 LLM 并返回结构化结果
+        
+        Args:
+            provider: 提供商 ID
+            api_key: API Key
+            model: 模型 ID
+            prompt: 用户提示词
+            proxy: 代理地址
+            max_retries: 最大重试次数
+            is_precise: 是否精准分析
+            current_price: 当前价格
+            future_dates: 未来日期列表
+            
+        Returns:
+            {"result": str, "signal": str, "summary": str, "prediction": list}
+        """
+        structured_prompt = AIService._build_structured_prompt(prompt, is_precise, current_price, future_dates)
+        result = AIService.call_llm(provider, api_key, model, structured_prompt, proxy, max_retries, base_url)
+        return AIService._parse_llm_result(result, is_precise, current_price)
+    
+    @staticmethod
+    async def call_llm_with_signal_async(
+        provider: str,
+        api_key: str,
+        model: str,
+        prompt: str,
+        proxy: str = None,
+        max_retries: int = 3,
+        is_precise: bool = False,
+        current_price: float = 0,
+        future_dates: List[str] = None,
+        base_url: str = None,
+    ) -> Dict[str, Any]:
+        """
+        调用 LLM 并返回结构化结果（异步，参数和返回值同 call_llm_with_signal）
+        """
+        structured_prompt = AIService._build_structured_prompt(prompt, is_precise, current_price, future_dates)
+        result = await AIService.call_llm_async(provider, api_key, model, structured_prompt, proxy, max_retries, base_url)
+        return AIService._parse_llm_result(result, is_precise, current_price)
+    
     @staticmethod
     def extract_signal_from_result(result: str) -> Dict[str, str]:
         """
@@ -460,6 +553,22 @@ signal 取值说明：
             if ma_parts:
                 prompt_parts.append(f"- 均线: {', '.join(ma_parts)}")
             
+            # 技术指标
+            if extra_data.get("macd"):
+                m = extra_data["macd"]
+                prompt_parts.append(f"- MACD: DIF={m['dif']}, DEA={m['dea']}, MACD柱={m['macd']}")
+            if extra_data.get("rsi"):
+                r = extra_data["rsi"]
+                prompt_parts.append(f"- RSI: RSI6={r['rsi6']}, RSI14={r['rsi14']}")
+            if extra_data.get("kdj"):
+                k = extra_data["kdj"]
+                prompt_parts.append(f"- KDJ: K={k['k']}, D={k['d']}, J={k['j']}")
+            if extra_data.get("boll"):
+                b = extra_data["boll"]
+                prompt_parts.append(f"- 布林带: 上轨={b['upper']}, 中轨={b['mid']}, 下轨={b['lower']}")
+            if extra_data.get("atr") is not None:
+                prompt_parts.append(f"- ATR(14): {extra_data['atr']}")
+            
             # 基本面数据
             prompt_parts.append(f"\n### 基本面数据\n")
             if extra_data.get("pe_ratio") is not None:
@@ -505,8 +614,9 @@ signal 取值说明：
             last_k = kline_data[-15:]
             prompt_parts.append(f"最近 {len(last_k)} 个交易日数据:")
             
-            volumes = [k["volume"] for k in kline_data[-30:] if k.get("volume")]
-            avg_volume = sum(volumes) / len(volumes) if volumes else 0
+            volumes = indicators.ohlcv(kline_data[-30:])["volume"]
+            volumes = volumes[volumes > 0]
+            avg_volume = float(volumes.mean()) if volumes.size else 0
             
             header = "| 日期 | 开盘 | 收盘 | 最高 | 最低 | 涨跌幅 | 成交量 | 量比 |"
             prompt_parts.append(header)
@@ -0,0 +1,116 @@
+"""
+AI 分析数据上下文
+
+本文件负责为单次 AI 分析请求组装所需数据：
+1. 请求内去重：同一份数据（分时、K线、资金流向等）只获取一次；
+   K线按本次需要的最大条数获取一次，较短的条数从中切片
+2. 并发获取：互不依赖的数据在线程池中同时请求，整体耗时约为最慢的一次请求
+3. 部分失败：单项失败或超时时使用空值，不影响其余数据和提示词生成
+
+使用示例：
+    context = AnalysisContext(monitor, records_manager, code)
+    data = context.load(PRECISE_RESOURCES, kline_count=240)
+"""
+
+from typing import Any, Callable, Dict, Iterable, List
+
+from core.parallel import gather
+
+
+# 单次分析等待数据的整体超时（秒）
+FETCH_TIMEOUT = 15
+# 线程池大小（精准分析同时请求的数据项数）
+MAX_WORKERS = 8
+
+# 快速分析 / 精准分析需要的数据
+FAST_RESOURCES = ("minute", "kline", "money_flow")
+PRECISE_RESOURCES = FAST_RESOURCES + (
+    "stats_history", "extra", "dragon_tiger", "trade_history", "ai_history",
+)
+
+
+class AnalysisContext:
+    """
+    单次分析请求的数据上下文
+
+    已获取的数据保存在上下文中，重复 load() 只请求尚未获取的部分
+    """
+
+    def __init__(self, monitor, records_manager, code: str):
+        """
+        初始化上下文
+
+        Args:
+            monitor: StockMonitor 实例
+            records_manager: RecordsManager 实例
+            code: 股票代码
+        """
+        self.monitor = monitor
+        self.records_manager = records_manager
+        self.code = code
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self._kline_count = 0
+
+    def basic(self) -> Dict:
+        """实时行情（本地快照，不请求上游）"""
+        return self.monitor.get_quote(self.code)
+
+    def _loaders(self, kline_count: int) -> Dict[str, Callable[[], Any]]:
+        """数据项 → 加载函数（返回值为提示词直接使用的部分）"""
+        monitor, code = self.monitor, self.code
+        return {
+            "minute": lambda: monitor.get_minute_data(code).get("data", []),
+            "kline": lambda: monitor.get_kline_data(code, "day", kline_count).get("data", []),
+            "money_flow": lambda: monitor.get_money_flow(code).get("data", []),
+            "stats_history": lambda: monitor.get_market_stats_history(3).get("data", []),
+            "extra": lambda: monitor.get_stock_extra_data(code).get("data", {}),
+            "dragon_tiger": lambda: monitor.get_dragon_tiger(code).get("data", []),
+            "trade_history": lambda: self.records_manager.get_trade_records_for_analysis(code, 10),
+            "ai_history": lambda: self.records_manager.get_ai_records_for_analysis(code, 5),
+        }
+
+    def load(self, names: Iterable[str], kline_count: int = 120, timeout: float = FETCH_TIMEOUT) -> Dict[str, Any]:
+        """
+        并发获取尚未获取的数据项
+
+        Args:
+            names: 数据项名称（见 PRECISE_RESOURCES）
+            kline_count: 需要的日K线条数
+            timeout: 整体等待超时（秒）
+
+        Returns:
+            {数据项: 数据}，失败或超时的数据项为空值
+        """
+        names = list(dict.fromkeys(names))
+        pending = [name for name in names if name not in self.results]
+        # 已获取的K线条数不足时按新的条数重新获取
+        if "kline" in names and kline_count > self._kline_count:
+            if "kline" not in pending:
+                pending.append("kline")
+            self._kline_count = kline_count
+
+        if pending:
+            loaders = self._loaders(self._kline_count)
+            results, errors = gather(
+                {name: loaders[name] for name in pending},
+                executor="analysis",
+                timeout=timeout,
+                max_workers=MAX_WORKERS,
+            )
+            for name in pending:
+                if name in results:
+                    self.results[name] = results[name]
+                    self.errors.pop(name, None)
+                else:
+                    print(f"分析数据获取失败 {self.code} {name}: {errors.get(name)}")
+                    self.errors[name] = errors.get(name, "unknown")
+
+        data = {name: self.results.get(name, {} if name == "extra" else []) for name in names}
+        if "kline" in data:
+            data["kline"] = self.kline(kline_count)
+        return data
+
+    def kline(self, count: int) -> List[Dict]:
+        """已获取的日K线中最近 count 条"""
+        return (self.results.get("kline") or [])[-count:]
@@ -24,6 +24,12 @@ export const removeStock = async (code: string) => {
   return response.data
 }
 
+// 获取自选股基本面（可按字段排序，order: asc/desc）
+export const getFundamentals = async (sort?: string, order: "asc" | "desc" = "desc") => {
+  const response = await api.get("/stocks/fundamentals", { params: { sort, order } })
+  return response.data
+}
+
 // 获取设置
 export const getSettings = async () => {
   const response = await api.get("/settings")
@@ -92,6 +98,15 @@ export const getTriggeredAlerts = async () => {
   return response.data
 }
 
+// 订阅实时推送（SSE），返回 EventSource，调用方负责 close()
+export const subscribeStream = (handlers: Record<string, (data: any) => void>) => {
+  const source = new EventSource(`${api.defaults.baseURL}/stream`)
+  for (const [event, handler] of Object.entries(handlers)) {
+    source.addEventListener(event, (e) => handler(JSON.parse((e as MessageEvent).data)))
+  }
+  return source
+}
+
 // 获取股票详情（分时、K线、资金流向）
 export const getStockDetail = async (code: string) => {
   const response = await api.get(`/stock/${code}/detail`)
@@ -130,6 +145,20 @@ export const getMarketStats = async () => {
   return response.data
 }
 
+// 获取组合实时盈亏（汇总 + 持仓明细）
+export const getPortfolio = async (includeClosed = false) => {
+  const response = await api.get("/portfolio", {
+    params: { include_closed: includeClosed },
+  })
+  return response.data
+}
+
+// 获取组合当日权益曲线
+export const getPortfolioEquity = async () => {
+  const response = await api.get("/portfolio/equity")
+  return response.data
+}
+
 // 获取涨跌统计历史
 export const getMarketStatsHistory = async (days: number = 30) => {
   const response = await api.get("/market/stats/history", { params: { days } })
@@ -472,6 +501,70 @@ export const analyzeSimulation = async (data: {
   return response.data
 }
 
+// ========== 策略回测 API ==========
+
+// 获取支持的回测策略及默认参数
+export const getBacktestStrategies = async () => {
+  const response = await api.get("/backtest/strategies")
+  return response.data
+}
+
+// 运行策略回测（不传 codes 时回测全部自选股）
+export const runBacktest = async (data: {
+  strategy: string
+  params?: Record<string, number>
+  codes?: string[]
+  initial_capital?: number
+  count?: number
+  start_date?: string
+  end_date?: string
+  take_profit_pct?: number
+  stop_loss_pct?: number
+  use_alerts?: boolean
+}) => {
+  const response = await api.post("/backtest", data)
+  return response.data
+}
+
+// 启动策略参数优化（后台运行，返回优化记录 ID）
+export const startOptimization = async (data: {
+  strategy: string
+  space: Record<string, number[]>
+  method?: "grid" | "random"
+  samples?: number
+  objective?: "sharpe" | "profit_rate" | "win_rate" | "calmar"
+  train_days?: number
+  test_days?: number
+  codes?: string[]
+}) => {
+  const response = await api.post("/backtest/optimize", data)
+  return response.data
+}
+
+// 获取参数优化记录列表
+export const getOptimizations = async () => {
+  const response = await api.get("/backtest/optimizations")
+  return response.data
+}
+
+// 获取参数优化进度或结果
+export const getOptimization = async (id: string) => {
+  const response = await api.get(`/backtest/optimizations/${id}`)
+  return response.data
+}
+
+// 删除参数优化记录
+export const deleteOptimization = async (id: string) => {
+  const response = await api.delete(`/backtest/optimizations/${id}`)
+  return response.data
+}
+
+// 将最优止盈/止损比例应用到预警配置
+export const applyOptimization = async (id: string, codes?: string[]) => {
+  const response = await api.post(`/backtest/optimizations/${id}/apply`, { codes })
+  return response.data
+}
+
 // ========== 交易风格分析 API ==========
 
 // 获取交易风格分析
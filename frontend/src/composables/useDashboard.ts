@@ -11,6 +11,7 @@ import {
   reorderStocks,
   setAlert,
   getTriggeredAlerts,
+  subscribeStream,
   setFocusedStock,
   setStockGroup,
   addGroupApi,
@@ -42,6 +43,8 @@ export function useDashboard() {
   // 定时器
   let intervalId: ReturnType<typeof setInterval> | null = null
   let alertCheckId: ReturnType<typeof setInterval> | null = null
+  // 实时推送连接（断开时回退到轮询）
+  let streamSource: EventSource | null = null
 
   // ========== 计算属性 ==========
   const indexList = computed(() => {
@@ -97,26 +100,41 @@ export function useDashboard() {
   }
 
   // ========== 数据操作 ==========
+  const applyStocks = (res: any) => {
+    if (stockOrder.value.length === 0) {
+      stockOrder.value = res.stocks
+    }
+    const dataMap = res.data
+    stockData.value = stockOrder.value.map((code: string) => dataMap[code]).filter(Boolean)
+    alerts.value = res.alerts || {}
+    stockGroups.value = res.groups || {}
+    indexData.value = res.index_data || {}
+    focusedStock.value = res.focused_stock || (res.stocks.length > 0 ? res.stocks[0] : null)
+
+    const usedGroups = new Set(Object.values(stockGroups.value))
+    const backendGroups = res.group_list || []
+    const allGroups = new Set([...backendGroups, ...usedGroups])
+    groupList.value = Array.from(allGroups) as string[]
+
+    updateTray()
+    if (res.focused_data) updateTrayIcon(res.focused_data)
+  }
+
+  // 推送通道的行情增量：只替换变化的股票
+  const applyQuotes = (delta: { changed: Record<string, any>; removed: string[] }) => {
+    const dataMap = Object.fromEntries(stockData.value.map((s) => [s.code, s]))
+    Object.assign(dataMap, delta.changed)
+    for (const code of delta.removed) delete dataMap[code]
+    stockData.value = stockOrder.value.map((code) => dataMap[code]).filter(Boolean)
+
+    updateTray()
+    const focused = focusedStock.value ? delta.changed[focusedStock.value] : null
+    if (focused) updateTrayIcon(focused)
+  }
+
   const fetchData = async () => {
     try {
-      const res = await getStocks()
-      if (stockOrder.value.length === 0) {
-        stockOrder.value = res.stocks
-      }
-      const dataMap = res.data
-      stockData.value = stockOrder.value.map((code: string) => dataMap[code]).filter(Boolean)
-      alerts.value = res.alerts || {}
-      stockGroups.value = res.groups || {}
-      indexData.value = res.index_data || {}
-      focusedStock.value = res.focused_stock || (res.stocks.length > 0 ? res.stocks[0] : null)
-
-      const usedGroups = new Set(Object.values(stockGroups.value))
-      const backendGroups = res.group_list || []
-      const allGroups = new Set([...backendGroups, ...usedGroups])
-      groupList.value = Array.from(allGroups) as string[]
-
-      updateTray()
-      if (res.focused_data) updateTrayIcon(res.focused_data)
+      applyStocks(await getStocks())
     } catch (error) {
       console.error("获取数据失败:", error)
     }
@@ -256,17 +274,31 @@ export function useDashboard() {
     alerts.value[stockCode] = { ...alertForm }
   }
 
+  // 已提醒过的预警 ID（推送与轮询切换时同一预警可能两条通道都收到）
+  const seenAlertIds = new Set<number>()
+
+  const notifyAlerts = (triggered: any[]) => {
+    const fresh = (triggered || []).filter((alert) => alert.id == null || !seenAlertIds.has(alert.id))
+    if (!fresh.length) return
+    for (const alert of fresh) {
+      if (alert.id != null) seenAlertIds.add(alert.id)
+    }
+    if (seenAlertIds.size > 500) {
+      const ids = [...seenAlertIds]
+      ids.slice(0, ids.length - 200).forEach((id) => seenAlertIds.delete(id))
+    }
+    alertNotifications.value.push(...fresh)
+    for (const alert of fresh) {
+      const title = `📈 ${alert.name} 预警触发`
+      const body = alert.messages.join("\n") + `\n当前价: ${alert.price}`
+      window.ipcRendererApi.invoke("show-notification", { title, body })
+    }
+  }
+
   const checkAlerts = async () => {
     try {
       const res = await getTriggeredAlerts()
-      if (res.alerts?.length > 0) {
-        alertNotifications.value.push(...res.alerts)
-        for (const alert of res.alerts) {
-          const title = `📈 ${alert.name} 预警触发`
-          const body = alert.messages.join("\n") + `\n当前价: ${alert.price}`
-          window.ipcRendererApi.invoke("show-notification", { title, body })
-        }
-      }
+      notifyAlerts(res.alerts)
     } catch (e) {
       console.error("检查预警失败:", e)
     }
@@ -316,13 +348,42 @@ export function useDashboard() {
       console.error("加载设置失败:", e)
     }
     await fetchData()
+    startStream()
+  }
+
+  const startPolling = () => {
+    if (intervalId) return
     intervalId = setInterval(fetchData, refreshInterval.value * 1000)
     alertCheckId = setInterval(checkAlerts, 3000)
   }
 
-  const stopRefresh = () => {
+  const stopPolling = () => {
     if (intervalId) clearInterval(intervalId)
     if (alertCheckId) clearInterval(alertCheckId)
+    intervalId = null
+    alertCheckId = null
+  }
+
+  // 优先使用推送通道；连接断开期间回退到轮询，EventSource 自动重连成功后停止轮询
+  const startStream = () => {
+    if (typeof EventSource === "undefined") {
+      startPolling()
+      return
+    }
+    streamSource = subscribeStream({
+      snapshot: applyStocks,
+      quotes: applyQuotes,
+      index: (data) => (indexData.value = data),
+      alerts: notifyAlerts,
+    })
+    streamSource.onopen = stopPolling
+    streamSource.onerror = startPolling
+  }
+
+  const stopRefresh = () => {
+    stopPolling()
+    streamSource?.close()
+    streamSource = null
   }
 
   return {